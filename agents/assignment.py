@@ -0,0 +1,139 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# ⚖️ Assignment Settings
+# ------------------------------
+CANDIDATES_PER_SKU = 8          # sparse candidate set: best-valued buyers kept per SKU
+BLOCK_SKUS = 512                # SKUs solved together; blocks run most-urgent first
+URGENCY_WEIGHT = 20.0           # how strongly near-expiry SKUs are pulled towards close buyers
+_NO_EDGE = 1e9
+
+# ------------------------------
+# 🧮 Pair Values
+# ------------------------------
+# A SKU/buyer pair is worth the buyer's ranking score (distance, engagement,
+# recency, channel) plus an urgency bonus: the closer a SKU is to expiry, the
+# more a short trip to the buyer is worth.
+def urgency(days_left):
+    return 1.0 / (1.0 + np.maximum(days_left, 0))
+
+def proximity(buyer_distance_km):
+    return 1.0 / (1.0 + np.asarray(buyer_distance_km, dtype=float))
+
+def pair_values(sku_urgency, buyer_scores, buyer_proximity):
+    # SKUs × buyers; callers pass one block of SKUs at a time, never a whole zone
+    return np.asarray(buyer_scores, dtype=float)[None, :] + URGENCY_WEIGHT * sku_urgency[:, None] * buyer_proximity[None, :]
+
+def matched_values(sku_urgency, buyer_scores, buyer_proximity, chosen):
+    # Value of each SKU's own pair, for chosen buyer indices
+    return buyer_scores[chosen] + URGENCY_WEIGHT * sku_urgency * buyer_proximity[chosen]
+
+# ------------------------------
+# 🧩 Per-Zone Solver
+# ------------------------------
+# Values are built one block of SKUs at a time against the buyers with capacity
+# left, so memory is BLOCK_SKUS × buyers however many SKUs the zone holds.
+def _solve_zone(sku_urgency, scores, buyer_proximity, capacity):
+    from scipy.optimize import linear_sum_assignment
+
+    remaining = capacity.copy()
+    chosen = np.full(len(sku_urgency), -1)
+
+    for start in range(0, len(sku_urgency), BLOCK_SKUS):
+        block = np.arange(start, min(start + BLOCK_SKUS, len(sku_urgency)))
+
+        # Candidate sets are drawn from buyers with capacity left; when the favourites fill
+        # up, the still-unmatched SKUs of the block are re-solved against the next buyers
+        while len(block):
+            open_buyers = np.flatnonzero(remaining > 0)
+            if len(open_buyers) == 0:
+                break
+            block_values = pair_values(sku_urgency[block], scores[open_buyers], buyer_proximity[open_buyers])
+            k = min(CANDIDATES_PER_SKU, len(open_buyers))
+            candidates = np.argpartition(-block_values, k - 1, axis=1)[:, :k]
+            is_candidate = np.zeros(block_values.shape, dtype=bool)
+            np.put_along_axis(is_candidate, candidates, True, axis=1)
+
+            # Each candidate buyer becomes one identical column per unit of capacity it could fill
+            wanted = is_candidate.sum(axis=0)
+            used = np.flatnonzero(wanted)
+            slot_col = np.repeat(used, np.minimum(remaining[open_buyers[used]], wanted[used]))
+
+            cost = np.where(is_candidate[:, slot_col], -block_values[:, slot_col], _NO_EDGE)
+            rows, cols = linear_sum_assignment(cost)
+            real = cost[rows, cols] < _NO_EDGE
+            rows, buyer_idx = rows[real], open_buyers[slot_col[cols[real]]]
+            if len(rows) == 0:
+                break
+
+            chosen[block[rows]] = buyer_idx
+            np.subtract.at(remaining, buyer_idx, 1)
+            block = np.delete(block, rows)
+
+    return chosen
+
+def _greedy_zone(urgency_sorted, scores, buyer_proximity, capacity):
+    # Today's behaviour: every SKU goes to the zone's top-ranked buyer. Only the first
+    # capacity-many (most urgent) count towards the objective; the rest are overflow.
+    top_capacity = int(capacity[0])
+    counted = urgency_sorted[:top_capacity]
+    objective = float(matched_values(counted, scores, buyer_proximity, np.zeros(len(counted), dtype=np.int64)).sum())
+    overflow = max(0, len(urgency_sorted) - top_capacity)
+    return objective, overflow
+
+# ------------------------------
+# 🚀 Assignment Engine
+# ------------------------------
+def assign_buyers(redistribution_df, buyer_index, today=None):
+    today = pd.to_datetime(today if today is not None else datetime.today().date())
+    started = time.perf_counter()
+
+    frames = []
+    report = {"objective": 0.0, "greedy_objective": 0.0, "greedy_capacity_violations": 0,
+              "assigned": 0, "unassigned": 0, "zones": 0}
+
+    for zone, skus in redistribution_df.groupby("zone", sort=False, observed=True):
+        buyers = buyer_index.ranked(zone)
+        out = pd.DataFrame({"sku_id": skus["sku_id"].to_numpy(), "zone": zone,
+                            "buyer": "None", "channel": "None", "value": 0.0}, index=skus.index)
+        report["zones"] += 1
+        if not buyers:
+            report["unassigned"] += len(skus)
+            frames.append(out)
+            continue
+
+        days_left = (pd.to_datetime(skus["expiry"]) - today).dt.days.to_numpy()
+        sku_urgency = urgency(days_left)
+        capacity = np.array([b.capacity for b in buyers], dtype=np.int64)
+
+        scores = np.asarray(buyer_index.scores(zone), dtype=float)
+        buyer_proximity = proximity([b.distance_km for b in buyers])
+
+        # Most urgent SKUs get first pick of capacity
+        order = np.argsort(-sku_urgency, kind="stable")
+        chosen_sorted = _solve_zone(sku_urgency[order], scores, buyer_proximity, capacity)
+        chosen = np.empty_like(chosen_sorted)
+        chosen[order] = chosen_sorted
+
+        hit = chosen >= 0
+        names = np.array([b.name for b in buyers], dtype=object)
+        channels = np.array([b.channel for b in buyers], dtype=object)
+        out.loc[hit, "buyer"] = names[chosen[hit]]
+        out.loc[hit, "channel"] = channels[chosen[hit]]
+        out.loc[hit, "value"] = matched_values(sku_urgency[hit], scores, buyer_proximity, chosen[hit])
+        frames.append(out)
+
+        greedy_objective, overflow = _greedy_zone(sku_urgency[order], scores, buyer_proximity, capacity)
+        report["objective"] += float(out.loc[hit, "value"].sum())
+        report["greedy_objective"] += greedy_objective
+        report["greedy_capacity_violations"] += overflow
+        report["assigned"] += int(hit.sum())
+        report["unassigned"] += int((~hit).sum())
+
+    report["solve_time_s"] = round(time.perf_counter() - started, 4)
+    assignments = pd.concat(frames).loc[redistribution_df.index] if frames else pd.DataFrame()
+    return assignments, report
@@ -0,0 +1,129 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ------------------------------
+# 🌙 Headless Nightly Batch
+# ------------------------------
+# python -m agents.batch --inventory-dir data/hubs --out out/nightly --workers 8
+#
+# Every *.csv in the inventory directory is one hub. Each hub runs in its own
+# worker process: retry pass over the hub's durable queue, redistribution,
+# optional simulated outreach (unsold SKUs are queued for the next night) and
+# the expiry log. Nothing here imports streamlit or matplotlib.
+OUTPUT_FORMATS = ("csv", "parquet")
+
+def _write(df, path_base, fmt):
+    path = f"{path_base}.{fmt}"
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def _simulate_outreach(df, queue, rank_buyers_for_sku, seed):
+    from agents.outreach import SimulatedResponder, run_outreach
+    from agents.records import offers_from_frame, offers_to_frame
+
+    responder = SimulatedResponder(seed=seed, delay_range=(0.0, 0.0))
+    outcomes = run_outreach(offers_from_frame(df), lambda offer: rank_buyers_for_sku(offer.zone)[:3],
+                            responder=responder)
+    routed, unsold = [], []
+    for outcome in outcomes:
+        offer, buyer = outcome.offer, outcome.buyer
+        if buyer:
+            offer.buyer, offer.channel, offer.status = buyer.name, buyer.channel, "✅ Routed"
+            routed.append(offer)
+        else:
+            offer.buyer, offer.channel, offer.status = "—", "—", "❌ Unsold"
+            unsold.append(offer)
+    queue.push_many([offer.to_row() for offer in unsold])
+    return offers_to_frame(routed + unsold), len(routed), len(unsold)
+
+def process_hub(inventory_path, out_dir, fmt="csv", outreach=False, retry_batch_size=None, seed=42):
+    from agents import expiry_agent
+    from agents.retry_store import RetryQueue
+
+    hub = os.path.splitext(os.path.basename(inventory_path))[0]
+    hub_dir = os.path.join(out_dir, hub)
+    os.makedirs(hub_dir, exist_ok=True)
+    queue = RetryQueue(os.path.join(hub_dir, "retry_queue.db"))
+    started = time.perf_counter()
+    summary = {"hub": hub, "inventory": inventory_path}
+
+    retry_kwargs = {"queue": queue}
+    if retry_batch_size:
+        retry_kwargs["batch_size"] = retry_batch_size
+    retry_df, retry_saved = expiry_agent.rerun_retry_logic(**retry_kwargs)
+    _write(retry_df, os.path.join(hub_dir, "retry_routed"), fmt)
+    summary.update({"retry_routed": len(retry_df), "retry_stock_saved": int(retry_saved)})
+
+    redis_df, _ = expiry_agent.run_redistribution(inventory_path)
+    summary["flagged"] = len(redis_df)
+    if outreach and not redis_df.empty:
+        redis_df, routed, unsold = _simulate_outreach(redis_df, queue, expiry_agent.rank_buyers_for_sku, seed)
+        summary.update({"routed": routed, "queued_for_retry": unsold})
+    _write(redis_df, os.path.join(hub_dir, "redistribution"), fmt)
+
+    near_expiry, logs = expiry_agent.run_expiry_agent(inventory_path)
+    _write(near_expiry.assign(log=logs), os.path.join(hub_dir, "expiry_log"), fmt)
+
+    summary["wall_s"] = round(time.perf_counter() - started, 3)
+    return summary
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.batch",
+                                     description="Run redistribution, retries and expiry logs for every hub file.")
+    parser.add_argument("--inventory-dir", required=True, help="directory of per-hub inventory CSVs")
+    parser.add_argument("--out", required=True, help="output directory (one sub-directory per hub)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--outreach", action="store_true", help="simulate buyer outreach and queue unsold SKUs")
+    parser.add_argument("--retry-batch-size", type=int)
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet needs pyarrow installed")
+
+    paths = sorted(glob.glob(os.path.join(args.inventory_dir, args.pattern)))
+    if not paths:
+        parser.error(f"no files matching {args.pattern} in {args.inventory_dir}")
+    os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    summaries, failures = [], []
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(paths))) as pool:
+        futures = {
+            pool.submit(process_hub, path, args.out, args.format, args.outreach, args.retry_batch_size): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+                summaries.append(summary)
+                print(json.dumps(summary), flush=True)
+            except Exception as exc:
+                failures.append({"inventory": futures[future], "error": f"{type(exc).__name__}: {exc}"})
+                print(json.dumps(failures[-1]), file=sys.stderr, flush=True)
+
+    report = {"hubs": len(paths), "succeeded": len(summaries), "failed": failures,
+              "wall_s": round(time.perf_counter() - started, 3),
+              "summaries": sorted(summaries, key=lambda s: s["hub"])}
+    with open(os.path.join(args.out, "summary.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
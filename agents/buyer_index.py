@@ -0,0 +1,103 @@
+import itertools
+import threading
+from datetime import datetime
+
+from agents.records import Buyer
+
+# ------------------------------
+# 🧠 Buyer Scoring
+# ------------------------------
+CHANNEL_BONUS = {"WhatsApp": 5, "Email": 3, "SMS": 2, "Slack": 1}
+
+def score_buyer(buyer, today):
+    distance_score = -buyer.distance_km * 2
+    engagement = buyer.engagement_score * 3
+    last_engaged_days = (today - buyer.last_engaged).days
+    recency_score = max(0, 10 - last_engaged_days) * 1.5
+    return distance_score + engagement + recency_score + CHANNEL_BONUS.get(buyer.channel, 0)
+
+# ------------------------------
+# 🗂️ Zone → Ranked Buyers Index
+# ------------------------------
+class BuyerIndex:
+    # Buyers are grouped by zone and each zone's ranking is cached until one of its
+    # buyers changes. The recency term depends on today, so every cached ranking
+    # is dropped when the date rolls over and rebuilt lazily on the next lookup.
+
+    def __init__(self, buyers=(), today_fn=None):
+        self._today_fn = today_fn or (lambda: datetime.today().date())
+        self._lock = threading.Lock()
+        self._entries = {}   # name -> Buyer
+        self._order = {}     # name -> first-seen position, breaks score ties like a stable sort
+        self._counter = itertools.count()
+        self._zones = {}     # zone -> {name: None}
+        self._ranked = {}    # zone -> (buyers sorted by score, their scores) for _built_on
+        self._built_on = None
+        for buyer in buyers:
+            self.upsert(buyer)
+
+    def upsert(self, buyer):
+        buyer = Buyer.coerce(buyer)
+        name, zone = buyer.name, buyer.zone
+        with self._lock:
+            previous = self._entries.get(name)
+            if previous is not None and previous.zone != zone:
+                self._drop(name, previous.zone)
+            self._entries[name] = buyer
+            if name not in self._order:
+                self._order[name] = next(self._counter)
+            self._zones.setdefault(zone, {})[name] = None
+            self._ranked.pop(zone, None)
+
+    def remove(self, name):
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            self._order.pop(name, None)
+            if previous is not None:
+                self._drop(name, previous.zone)
+
+    def sync(self, buyers):
+        # Diff a full profile list against the index; only zones whose buyers changed are re-ranked
+        seen = set()
+        for buyer in buyers:
+            buyer = Buyer.coerce(buyer)
+            seen.add(buyer.name)
+            if self._entries.get(buyer.name) != buyer:
+                self.upsert(buyer)
+        for name in [n for n in self._entries if n not in seen]:
+            self.remove(name)
+
+    def zones(self):
+        return list(self._zones)
+
+    def ranked(self, zone):
+        return self._ranking(zone)[0]
+
+    def scores(self, zone):
+        # Parallel to ranked(zone)
+        return self._ranking(zone)[1]
+
+    def _ranking(self, zone):
+        today = self._today_fn()
+        with self._lock:
+            if today != self._built_on:
+                self._ranked.clear()
+                self._built_on = today
+
+            ranked = self._ranked.get(zone)
+            if ranked is None:
+                keyed = []
+                for name in self._zones.get(zone, ()):
+                    buyer = self._entries[name]
+                    keyed.append((-score_buyer(buyer, today), self._order[name], buyer))
+                keyed.sort(key=lambda item: item[:2])
+                ranked = self._ranked[zone] = ([buyer for _, _, buyer in keyed], [-score for score, _, _ in keyed])
+            return ranked
+
+    def _drop(self, name, zone):
+        members = self._zones.get(zone)
+        if members is not None:
+            members.pop(name, None)
+            if not members:
+                del self._zones[zone]
+        self._ranked.pop(zone, None)
@@ -0,0 +1,489 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from agents import perf
+from agents.inventory_cache import cache_dir_for, source_signature
+
+# ------------------------------
+# 📈 Demand Model
+# ------------------------------
+# One log-linear model per (SKU, region) series, fitted for all series at once:
+#   log1p(units) = level + weekday effect + yearly Fourier terms + Σ uplift[confidence] × event ramp
+# An event ramp climbs from 0 to 1 over the EVENT_LEAD_DAYS before an event the SKU is listed
+# for, in the series' own region or Pan India. Days are weighted by decay ** age, so the fit
+# tracks recent demand and is fully described by decayed sufficient statistics (XᵀWX, XᵀWy,
+# yᵀWy). The calendar columns are the same for every series, which makes their block shared;
+# only the few event columns are per series, so solving is a block elimination down to a
+# small per-series system. Uplifts are shrunk toward the uplift pooled over all series,
+# since one SKU sees too few events to estimate its own. New days are absorbed by decaying
+# the statistics and adding the new block's, which gives exactly what a refit would.
+SALES_PATH = "data/sales_history.csv"
+SALES_DTYPES = {"sku": "str", "region": "str", "units": "float64"}
+CONFIDENCE_LEVELS = ["High", "Medium", "Low"]
+NATIONWIDE = "Pan India"
+EVENT_LEAD_DAYS = 14
+DEFAULT_HORIZON = 90
+MODEL_VERSION = 1
+CHUNK_SERIES = 20_000       # series per matmul block, bounds the float64 copy of the sales matrix
+EPOCH_DAY = np.datetime64(0, "D")
+TAIL_CHECK_BYTES = 64 * 1024   # last block of the fitted bytes, re-checked before an append is absorbed
+
+@dataclass(frozen=True)
+class DemandConfig:
+    decay: float = 0.997                # per-day weight decay; half-life ≈ 230 days
+    fourier_order: int = 2              # yearly harmonics
+    lead_days: int = EVENT_LEAD_DAYS
+    seasonal_ridge: float = 5.0         # shrinks yearly terms when history is shorter than a year
+    uplift_prior: float = 5.0           # pull toward the pooled uplift, in units of one event's exposure
+
+def day_number(value):
+    return int((np.datetime64(value, "D") - EPOCH_DAY).astype(np.int64))
+
+def day_date(number):
+    return (EPOCH_DAY + np.timedelta64(int(number), "D")).astype(object)
+
+def calendar_features(days, config):
+    # (T, q): intercept, Tue..Sun dummies (1970-01-01 was a Thursday), yearly sin/cos pairs
+    days = np.asarray(days, dtype=np.int64)
+    weekday = (days + 3) % 7
+    columns = [np.ones(len(days))] + [(weekday == d).astype(np.float64) for d in range(1, 7)]
+    for k in range(1, config.fourier_order + 1):
+        angle = 2 * np.pi * k * days / 365.25
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+def _ridge(config):
+    q = 7 + 2 * config.fourier_order
+    ridge = np.zeros(q)
+    ridge[7:] = config.seasonal_ridge
+    return np.diag(ridge)
+
+def events_fingerprint(events):
+    payload = json.dumps([[e["event"], e["date"], e["region"], e["high_demand_skus"], e["confidence"]]
+                          for e in events], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+# ------------------------------
+# 🎉 Event Regressors (sparse)
+# ------------------------------
+def event_table(events):
+    # One row per (event, listed SKU): sku, region, event day, confidence column (unknown labels
+    # count as the least sure level)
+    levels = {level: i for i, level in enumerate(CONFIDENCE_LEVELS)}
+    rows = [(sku, e["region"], day_number(e["date"]), levels.get(e["confidence"].strip(), len(levels) - 1))
+            for e in events for sku in e["high_demand_skus"]]
+    return pd.DataFrame(rows, columns=["sku", "region", "day", "level"]).astype(
+        {"day": np.int64, "level": np.int64})
+
+def event_entries(keys, table, first_day, n_days, lead_days):
+    # -> (series, day offset, (n, levels) ramp values), one row per exposed (series, day)
+    m = len(CONFIDENCE_LEVELS)
+    empty = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, m)))
+    if table.empty or keys.empty:
+        return empty
+    series = keys[["sku", "region"]].assign(series=np.arange(len(keys)))
+    regional = table.merge(series, on=["sku", "region"])
+    nationwide = table[table["region"] == NATIONWIDE].drop(columns="region").merge(series, on="sku")
+    nationwide = nationwide[nationwide["region"] != NATIONWIDE]
+    pairs = pd.concat([regional, nationwide], ignore_index=True)
+    if pairs.empty:
+        return empty
+
+    span = lead_days + 1
+    steps = np.arange(span)
+    day = (pairs["day"].to_numpy()[:, None] - lead_days + steps).ravel() - first_day
+    value = np.tile((steps + 1) / span, len(pairs))
+    s = np.repeat(pairs["series"].to_numpy(), span)
+    level = np.repeat(pairs["level"].to_numpy(), span)
+    inside = (day >= 0) & (day < n_days)
+    s, day, level, value = s[inside], day[inside], level[inside], value[inside]
+    if not len(s):
+        return empty
+    # Overlapping events on the same (series, day) add up
+    cell, inverse = np.unique(s * n_days + day, return_inverse=True)
+    ramps = np.zeros((len(cell), m))
+    np.add.at(ramps, (inverse, level), value)
+    return cell // n_days, cell % n_days, ramps
+
+# ------------------------------
+# 📐 Sufficient Statistics
+# ------------------------------
+def _accumulate(log_units, first_day, keys, table, config):
+    # Decayed statistics of one block of days, weighted as of the block's last day
+    n_series, n_days = log_units.shape
+    days = first_day + np.arange(n_days)
+    weights = config.decay ** (n_days - 1 - np.arange(n_days))
+    a = calendar_features(days, config)
+    aw = a * weights[:, None]
+    q, m = a.shape[1], len(CONFIDENCE_LEVELS)
+
+    a_ty = np.empty((n_series, q))
+    y_ty = np.empty(n_series)
+    for lo in range(0, n_series, CHUNK_SERIES):
+        block = np.asarray(log_units[lo:lo + CHUNK_SERIES], dtype=np.float64)
+        a_ty[lo:lo + CHUNK_SERIES] = block @ aw
+        y_ty[lo:lo + CHUNK_SERIES] = (block * block) @ weights
+
+    a_te, e_te, e_ty = np.zeros((n_series, q, m)), np.zeros((n_series, m, m)), np.zeros((n_series, m))
+    s, d, ramps = event_entries(keys, table, first_day, n_days, config.lead_days)
+    if len(s):
+        np.add.at(a_te, s, aw[d][:, :, None] * ramps[:, None, :])
+        wr = ramps * weights[d][:, None]
+        np.add.at(e_te, s, wr[:, :, None] * ramps[:, None, :])
+        np.add.at(e_ty, s, wr * np.asarray(log_units[s, d], dtype=np.float64)[:, None])
+    return {"gram": aw.T @ a, "weight": weights.sum(), "a_ty": a_ty, "y_ty": y_ty,
+            "a_te": a_te, "e_te": e_te, "e_ty": e_ty}
+
+STAT_FIELDS = ["a_ty", "y_ty", "a_te", "e_te", "e_ty"]   # per series; gram and weight are shared
+
+class DemandModel:
+    def __init__(self, keys, events, config=None):
+        self.config = config or DemandConfig()
+        self.keys = keys[["sku", "region"]].reset_index(drop=True)
+        self.events = list(events)
+        self._table = event_table(self.events)
+        self._index = {key: i for i, key in enumerate(zip(self.keys["sku"], self.keys["region"]))}
+        self.first_day = self.last_day = None
+        self.stats = None
+        self._coef = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def end_date(self):
+        return None if self.last_day is None else day_date(self.last_day)
+
+    # ------------------------------
+    # 🏋️ Fit / Incremental Update
+    # ------------------------------
+    @classmethod
+    @perf.timed("demand_model_fit")
+    def fit(cls, keys, first_date, units, events=(), config=None):
+        # keys: frame of (sku, region) per row of units; units: (series, days) daily sales from first_date
+        model = cls(keys, events, config)
+        model.first_day = day_number(first_date)
+        model.last_day = model.first_day + units.shape[1] - 1
+        model.stats = _accumulate(np.log1p(units), model.first_day, model.keys, model._table, model.config)
+        model._solve()
+        return model
+
+    @classmethod
+    def from_sales(cls, sales, events=(), config=None):
+        keys, first_date, units = sales_matrix(sales)
+        return cls.fit(keys, first_date, units, events, config)
+
+    @perf.timed("demand_model_update")
+    def update(self, sales):
+        # Long-format sales dated after end_date; days without rows count as zero sales.
+        # Series seen for the first time join with no history before the update.
+        sales = sales[sales["date"] > pd.Timestamp(self.end_date)]
+        if sales.empty:
+            return 0
+        keys, first_date, units = sales_matrix(sales, start=day_date(self.last_day + 1))
+        with self._lock:
+            self._add_series(keys)
+            rows = np.array([self._index[key] for key in zip(keys["sku"], keys["region"])], dtype=np.int64)
+            full = np.zeros((len(self.keys), units.shape[1]), dtype=np.float32)
+            full[rows] = units
+            block = _accumulate(np.log1p(full), self.last_day + 1, self.keys, self._table, self.config)
+            carry = self.config.decay ** units.shape[1]
+            for field in ["gram", "weight"] + STAT_FIELDS:
+                self.stats[field] = carry * self.stats[field] + block[field]
+            self.last_day += units.shape[1]
+            self._solve()
+        return units.shape[1]
+
+    def _add_series(self, keys):
+        new = [key for key in zip(keys["sku"], keys["region"]) if key not in self._index]
+        if not new:
+            return
+        for key in new:
+            self._index[key] = len(self._index)
+        self.keys = pd.concat([self.keys, pd.DataFrame(new, columns=["sku", "region"])], ignore_index=True)
+        for field in STAT_FIELDS:
+            old = self.stats[field]
+            self.stats[field] = np.concatenate([old, np.zeros((len(new),) + old.shape[1:])])
+
+    def _solve(self):
+        st, config = self.stats, self.config
+        g_inv = np.linalg.inv(st["gram"] + _ridge(config))
+        a_te, e_te, a_ty, e_ty = st["a_te"], st["e_te"], st["a_ty"], st["e_ty"]
+        # Eliminate the shared calendar block: per-series Schur complement on the event columns
+        e_ta_g = np.matmul(a_te.transpose(0, 2, 1), g_inv)                  # (S, m, q)
+        schur = e_te - np.matmul(e_ta_g, a_te)
+        rhs = e_ty - np.einsum("smq,sq->sm", e_ta_g, a_ty)
+        m = schur.shape[1]
+        pooled = np.linalg.lstsq(schur.sum(axis=0) + 1e-9 * np.eye(m), rhs.sum(axis=0), rcond=None)[0]
+        prior = config.uplift_prior
+        uplift = np.linalg.solve(schur + prior * np.eye(m), (rhs + prior * pooled)[:, :, None])[:, :, 0]
+        base = (a_ty - np.einsum("sqm,sm->sq", a_te, uplift)) @ g_inv.T
+        # Residual variance (weighted), for the log-normal back-transform
+        rss = (st["y_ty"] - 2 * (np.einsum("sq,sq->s", base, a_ty) + np.einsum("sm,sm->s", uplift, e_ty))
+               + np.einsum("sq,qr,sr->s", base, st["gram"], base)
+               + 2 * np.einsum("sq,sqm,sm->s", base, a_te, uplift)
+               + np.einsum("sm,smn,sn->s", uplift, e_te, uplift))
+        self._coef = (base, uplift, np.clip(rss / max(st["weight"], 1e-9), 0.0, None), pooled)
+
+    @property
+    def pooled_uplift(self):
+        # Multiplier at the event day per confidence level, pooled over all series
+        return dict(zip(CONFIDENCE_LEVELS, np.exp(self._coef[3]).round(3).tolist()))
+
+    # ------------------------------
+    # 🔮 Forecasts
+    # ------------------------------
+    def predict(self, first_date, n_days, series=None):
+        # -> (len(series), n_days) float32 expected units per day from first_date
+        base, uplift, variance, _ = self._coef
+        series = np.arange(len(self.keys)) if series is None else np.asarray(series, dtype=np.int64)
+        first_day = day_number(first_date)
+        a = calendar_features(first_day + np.arange(n_days), self.config)
+        log_mean = base[series] @ a.T
+        s, d, ramps = event_entries(self.keys.iloc[series].reset_index(drop=True), self._table,
+                                    first_day, n_days, self.config.lead_days)
+        if len(s):
+            log_mean[s, d] += np.einsum("nm,nm->n", ramps, uplift[series[s]])
+        log_mean += variance[series, None] / 2
+        return np.maximum(np.expm1(log_mean), 0.0).astype(np.float32)
+
+    @perf.timed("demand_model_forecast")
+    def forecast(self, horizon=DEFAULT_HORIZON):
+        # Every series for the horizon days after end_date
+        return self.predict(day_date(self.last_day + 1), horizon)
+
+    def series_for(self, skus, regions):
+        # -> list of series positions per (sku, region); Pan India means every region the SKU sells in
+        by_sku = self.keys.groupby("sku").indices
+        return [list(by_sku.get(sku, [])) if region == NATIONWIDE
+                else [self._index[(sku, region)]] if (sku, region) in self._index else []
+                for sku, region in zip(skus, regions)]
+
+    def window_demand(self, skus, regions, end_dates, window=None):
+        # Expected units over the `window` days ending on each date; NaN where nothing was ever sold
+        window = window or self.config.lead_days + 1
+        matches = self.series_for(skus, regions)
+        demand = np.full(len(matches), np.nan)
+        flat = np.array(sorted({s for rows in matches for s in rows}), dtype=np.int64)
+        if not len(flat):
+            return demand
+        ends = np.array([day_number(d) for d in end_dates], dtype=np.int64)
+        first = int(ends.min()) - window + 1
+        daily = self.predict(day_date(first), int(ends.max()) - first + 1, flat)
+        # Running sums make every window total O(1)
+        cumulative = np.concatenate([np.zeros((len(flat), 1)), np.cumsum(daily, axis=1, dtype=np.float64)], axis=1)
+        position = {s: i for i, s in enumerate(flat.tolist())}
+        for i, (rows, end) in enumerate(zip(matches, ends - first)):
+            if rows:
+                at = [position[s] for s in rows]
+                demand[i] = (cumulative[at, end + 1] - cumulative[at, max(end + 1 - window, 0)]).sum()
+        return demand
+
+    # ------------------------------
+    # 💾 Disk Cache
+    # ------------------------------
+    def save(self, path, meta=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {"version": MODEL_VERSION, "config": asdict(self.config), "events": self.events,
+                  "first_day": self.first_day, "last_day": self.last_day, **(meta or {})}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, header=np.array(json.dumps(header)), sku=self.keys["sku"].to_numpy(dtype=str),
+                     region=self.keys["region"].to_numpy(dtype=str), gram=self.stats["gram"],
+                     weight=np.array(self.stats["weight"]), **{k: self.stats[k] for k in STAT_FIELDS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        # -> (model, header)
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            keys = pd.DataFrame({"sku": data["sku"].astype(object), "region": data["region"].astype(object)})
+            model = cls(keys, header["events"], DemandConfig(**header["config"]))
+            model.stats = {"gram": data["gram"], "weight": float(data["weight"]),
+                           **{k: data[k] for k in STAT_FIELDS}}
+        model.first_day, model.last_day = header["first_day"], header["last_day"]
+        model._solve()
+        return model, header
+
+# ------------------------------
+# 🧾 Sales History
+# ------------------------------
+def read_sales(path=SALES_PATH):
+    # Long format: date, sku, region, units (missing days are zero sales)
+    return pd.read_csv(path, dtype=SALES_DTYPES, parse_dates=["date"])
+
+def sales_matrix(sales, start=None):
+    # Long sales -> (keys frame, first date, (series, days) float32 units summed per day)
+    keys, codes = _factorize_keys(sales)
+    days = (sales["date"].to_numpy().astype("datetime64[D]") - EPOCH_DAY).astype(np.int64)
+    first = day_number(start) if start is not None else int(days.min())
+    n_days = int(days.max()) - first + 1
+    flat = np.bincount(codes * n_days + (days - first), weights=sales["units"].to_numpy(dtype=np.float64),
+                       minlength=len(keys) * n_days)
+    return keys, day_date(first), flat.reshape(len(keys), n_days).astype(np.float32)
+
+def _factorize_keys(sales):
+    codes, uniques = pd.MultiIndex.from_arrays([sales["sku"], sales["region"]]).factorize()
+    return pd.DataFrame(list(uniques), columns=["sku", "region"]), codes.astype(np.int64)
+
+def model_cache_path(sales_path):
+    return os.path.join(cache_dir_for(sales_path), "demand_model.npz")
+
+def _file_marks(path, size, block=TAIL_CHECK_BYTES):
+    # (header line, sha1 of the `block` bytes before `size`): a cheap check that the part of the
+    # file a fit has read is still there, without re-hashing all of it
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(size - block, 0))
+        tail = f.read(min(block, size))
+    return header.decode(errors="replace"), hashlib.sha1(tail).hexdigest()
+
+def _appended_rows(sales_path, header):
+    # -> (rows added after the cached fit, bytes consumed), or None when the file was edited rather
+    # than appended to: the fitted part must keep its header and last block (ending on a line
+    # break), and every new row must be dated after end_date, since update() only moves forward.
+    # Only the bytes past the cached size are parsed, as incremental.read_delta_rows does.
+    size = header.get("signature", {}).get("size")
+    if size is None or header.get("tail_sha1") is None or not size:
+        return None
+    if source_signature(sales_path)["size"] < size:
+        return None
+    if _file_marks(sales_path, size) != (header.get("header_line"), header["tail_sha1"]):
+        return None
+    with open(sales_path, "rb") as f:
+        first_line = f.readline()
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return None
+        data = f.read()
+    end = data.rfind(b"\n") + 1   # a line still being written is left for the next call
+    added = pd.read_csv(io.BytesIO(first_line + data[:end]), dtype=SALES_DTYPES, parse_dates=["date"])
+    added["date"] = pd.to_datetime(added["date"])   # a header-only read leaves it as object
+    if (added["date"] <= pd.Timestamp(day_date(header["last_day"]))).any():
+        return None
+    return added, size + end
+
+@perf.timed()
+def load_or_fit(sales_path=SALES_PATH, events=(), config=None):
+    # Fitted statistics are kept next to the sales file's other caches. An unchanged file reuses
+    # them as they are; a file that only had later days appended absorbs them incrementally;
+    # anything else (edited history, new events or settings) refits from scratch.
+    config = config or DemandConfig()
+    cache_path = model_cache_path(sales_path)
+    signature = source_signature(sales_path)
+    fingerprint = {"events": events_fingerprint(events), "config": asdict(config)}
+    if os.path.exists(cache_path):
+        model, header = DemandModel.load(cache_path)
+        if header.get("version") == MODEL_VERSION and header.get("fingerprint") == fingerprint:
+            if header.get("signature") == signature:
+                return model
+            appended = _appended_rows(sales_path, header)
+            if appended is not None:
+                added, consumed = appended
+                model.update(added)
+                _save_fitted(model, cache_path, sales_path, dict(signature, size=consumed), fingerprint)
+                return model
+    sales = read_sales(sales_path)
+    model = DemandModel.from_sales(sales, events, config)
+    _save_fitted(model, cache_path, sales_path, signature, fingerprint)
+    return model
+
+def _save_fitted(model, cache_path, sales_path, signature, fingerprint):
+    header_line, tail_sha1 = _file_marks(sales_path, signature["size"])
+    model.save(cache_path, {"signature": signature, "fingerprint": fingerprint,
+                            "header_line": header_line, "tail_sha1": tail_sha1})
+
+# ------------------------------
+# 🧪 Backtest
+# ------------------------------
+def _errors(forecast, actual):
+    total = max(float(actual.sum()), 1e-9)
+    return {
+        "wape": round(float(np.abs(forecast - actual).sum()) / total, 4),
+        "bias": round(float((forecast - actual).sum()) / total, 4),
+        "mae": round(float(np.abs(forecast - actual).mean()), 4),
+    }
+
+def backtest(keys, first_date, units, events=(), config=None, horizon=28, folds=3):
+    # Rolling origin: fold k fits on everything before its cutoff and forecasts the next `horizon`
+    # days; scored against a seasonal-naive baseline (the last observed week, repeated)
+    first_day = day_number(first_date)
+    n_days = units.shape[1]
+    results = []
+    for fold in range(folds, 0, -1):
+        cutoff = n_days - fold * horizon
+        if cutoff < 28:
+            continue
+        started = time.perf_counter()
+        model = DemandModel.fit(keys, first_date, units[:, :cutoff], events, config)
+        fit_s = time.perf_counter() - started
+        started = time.perf_counter()
+        predicted = model.forecast(horizon)
+        forecast_s = time.perf_counter() - started
+        actual = units[:, cutoff:cutoff + horizon]
+        naive = np.tile(units[:, cutoff - 7:cutoff], (1, -(-horizon // 7)))[:, :horizon]
+        exposed = np.zeros(actual.shape, dtype=bool)
+        s, d, _ = event_entries(model.keys, model._table, first_day + cutoff, horizon, model.config.lead_days)
+        exposed[s, d] = True
+        results.append({
+            "cutoff": day_date(first_day + cutoff).isoformat(),
+            "series": len(keys), "horizon": horizon,
+            "fit_s": round(fit_s, 3), "forecast_s": round(forecast_s, 3),
+            "model": _errors(predicted, actual),
+            "seasonal_naive": _errors(naive, actual),
+            "event_days": {"cells": int(exposed.sum()),
+                           "model": _errors(predicted[exposed], actual[exposed]) if exposed.any() else None,
+                           "seasonal_naive": _errors(naive[exposed], actual[exposed]) if exposed.any() else None},
+        })
+    return results
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.demand_model --sales data/sales_history.csv --events data/cultural_events.csv --horizon 90
+# python -m agents.demand_model --sales data/sales_history.csv --events data/cultural_events.csv --backtest
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.demand_model",
+                                     description="Fit (or refresh) the cached demand model and summarize a forecast.")
+    parser.add_argument("--sales", default=SALES_PATH)
+    parser.add_argument("--events", default="data/cultural_events.csv")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    parser.add_argument("--backtest", action="store_true", help="rolling-origin error report instead of a forecast")
+    parser.add_argument("--folds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from agents.forecasting import read_cultural_events
+    events = read_cultural_events(args.events) if os.path.exists(args.events) else []
+    if args.backtest:
+        keys, first_date, units = sales_matrix(read_sales(args.sales))
+        print(json.dumps(backtest(keys, first_date, units, events, horizon=args.horizon, folds=args.folds), indent=2))
+        return 0
+
+    started = time.perf_counter()
+    model = load_or_fit(args.sales, events)
+    fit_s = time.perf_counter() - started
+    started = time.perf_counter()
+    forecast = model.forecast(args.horizon)
+    print(json.dumps({
+        "series": len(model), "history_end": model.end_date.isoformat(), "horizon": args.horizon,
+        "load_or_fit_s": round(fit_s, 3), "forecast_s": round(time.perf_counter() - started, 3),
+        "forecast_units": round(float(forecast.sum()), 1),
+        "pooled_event_uplift": model.pooled_uplift,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from agents import perf
+from agents.expiry_agent import DISCOUNT_TIER_EDGES, DISCOUNT_TIER_RATES
+from agents.forecasting import build_sku_recommendations, explode_events, read_cultural_events
+from agents.monte_carlo import AcceptanceModel, acceptance_matrix, prepare_outreach
+from agents.records import rupees_to_paise
+
+# ------------------------------
+# 🌐 Digital Twin: Time-Stepped Hub Replay
+# ------------------------------
+# A virtual clock advances one day at a time over every inventory lot plus the
+# restock lots the event forecast will order. Each day applies, in order:
+#   restock arrivals → event-day sales → expiry (waste) → first outreach for
+#   lots entering the window at their get_discount_rate tier → retries at the
+#   flat retry discount with the next-ranked buyers.
+# Lot state lives in preallocated arrays sorted by each day key, so a step only
+# touches the lots that fall due that day; a year over 1M lots is a few seconds.
+OUTREACH_WINDOW_DAYS = 2
+TRANSITION_DAYS = (DISCOUNT_TIER_EDGES - 1).tolist()
+
+@dataclass(frozen=True)
+class TwinConfig:
+    days: int = 365
+    outreach_window_days: int = OUTREACH_WINDOW_DAYS
+    retry_discount: float = 0.5             # rerun_retry_logic's flat escalation
+    max_retries: int = 3
+    retry_backoff_days: int = 1             # doubles per attempt, like the retry queue
+    restock_lead_days: int = 3              # restocks land this long before the event
+    restock_shelf_life_days: int = 7
+    demand_noise: float = 0.25              # lognormal sigma of realized vs. forecast event demand
+    price_range_rupees: tuple = (30, 100)   # run_redistribution's price draw, for lots without a unit_price
+    seed: int = 42
+    acceptance: AcceptanceModel = field(default_factory=AcceptanceModel)
+
+DayKPIs = namedtuple("DayKPIs", [
+    "date", "live_lots", "live_stock", "restocked", "repriced",
+    "offers", "accepted", "retries", "retry_accepted", "stock_saved", "revenue_paise",
+    "event_sold", "event_revenue_paise", "waste_lots", "waste_units",
+])
+
+NO_DAY = np.iinfo(np.int32).max
+
+# ------------------------------
+# 🧱 Initial State
+# ------------------------------
+def _inventory_lots(columns, start):
+    # -> (zone names, zone codes, expiry day offsets, stock) straight from the mapped columns
+    expiry = columns.arrays["expiry_date"].astype("datetime64[D]")
+    offsets = (expiry - np.datetime64(start, "D")).astype(np.int64)
+    return (list(columns.categories["location"]), np.asarray(columns.arrays["location"], dtype=np.int32),
+            offsets, np.asarray(columns.arrays["stock"], dtype=np.int64))
+
+def _restock_lots(events, hubs, start, config, rng):
+    # Forecast-driven orders: each event's stock gap is split over the hubs in its region
+    from agents.transfers import NATIONWIDE_REGIONS
+    empty = pd.DataFrame({"hub": [], "arrival": [], "event_day": [], "stock": [], "event_cap": []})
+    if not events or hubs is None or hubs.empty:
+        return empty
+    recs = build_sku_recommendations(events)
+    recs["event_day"] = np.array([(pd.Timestamp(e["date"]).date() - start).days for e in events])[
+        explode_events(events)["event_idx"].to_numpy()]
+    recs = recs[(recs["stock_gap"] > 0) & (recs["event_day"] >= config.restock_lead_days)
+                & (recs["event_day"] < config.days)]
+
+    by_region = hubs.groupby("region")["hub"].apply(list).to_dict()
+    all_hubs = hubs["hub"].tolist()
+    targets = recs["region"].map(lambda r: all_hubs if r in NATIONWIDE_REGIONS else by_region.get(r, []))
+    lots = recs.assign(hub=targets, n_hubs=targets.str.len()).query("n_hubs > 0").explode("hub")
+    if lots.empty:
+        return empty
+    n = lots["n_hubs"].to_numpy()
+    # Whatever realized demand exceeds the stock already on the shelf is sold from the restock lot
+    realized = lots["expected_demand"].to_numpy() / n * rng.lognormal(0.0, config.demand_noise, len(lots))
+    return pd.DataFrame({
+        "hub": lots["hub"].to_numpy(),
+        "arrival": lots["event_day"].to_numpy() - config.restock_lead_days,
+        "event_day": lots["event_day"].to_numpy(),
+        "stock": -(-lots["stock_gap"].to_numpy() // n),
+        "event_cap": np.maximum(np.rint(realized - lots["current_stock"].to_numpy() / n), 0).astype(np.int64),
+    })
+
+def _acceptance_tables(zones, buyer_index, model, retry_discount):
+    # P(some candidate accepts) per (zone, discount tier), and per zone at the retry discount
+    rates = np.append(DISCOUNT_TIER_RATES, retry_discount)
+    grid = pd.DataFrame({
+        "zone": np.repeat(zones, len(rates)),
+        "old_price_paise": 10_000,
+        "new_price_paise": np.rint(10_000 * (1 - np.tile(rates, len(zones)))).astype(np.int64),
+        "stock": 1,
+    })
+    tables = []
+    for skip in (0, 1):
+        p, _ = acceptance_matrix(prepare_outreach(grid, buyer_index, skip=skip), model)
+        tables.append((1 - np.prod(1 - p, axis=1)).reshape(len(zones), len(rates)))
+    return tables[0][:, :-1], tables[1][:, -1]
+
+class _DayPointer:
+    # Lots sorted by one day key; take(day) returns the positions whose key is <= day, each once
+    def __init__(self, keys):
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted = keys[self.order]
+        self.cursor = 0
+
+    def take(self, day):
+        end = np.searchsorted(self.sorted, day, side="right")
+        picked = self.order[self.cursor:end]
+        self.cursor = max(self.cursor, end)
+        return picked
+
+    def count_at(self, day):
+        return int(np.searchsorted(self.sorted, day, side="right") - np.searchsorted(self.sorted, day, side="left"))
+
+# ------------------------------
+# 🔁 Simulator
+# ------------------------------
+class DigitalTwin:
+    def __init__(self, columns, start, config=None, events=(), hubs=None, buyer_index=None):
+        self.config = config = config or TwinConfig()
+        self.start = start
+        if buyer_index is None:
+            from agents.expiry_agent import buyer_index
+        setup_seed, outcome_seed = np.random.SeedSequence(config.seed).spawn(2)
+        rng = np.random.default_rng(setup_seed)
+        self._rng = np.random.default_rng(outcome_seed)
+
+        zones, zone_codes, expiry, stock = _inventory_lots(columns, start)
+        restock = _restock_lots(list(events), hubs, start, config, rng)
+        extra_zones = [z for z in pd.unique(restock["hub"]) if z not in set(zones)]
+        self.zones = zones = zones + extra_zones
+        zone_lookup = {z: i for i, z in enumerate(zones)}
+
+        # Preallocated lot state: inventory lots first, then restock lots
+        n_inv, n = len(stock), len(stock) + len(restock)
+        self.zone = np.empty(n, dtype=np.int32)
+        self.expiry = np.empty(n, dtype=np.int32)
+        self.stock = np.empty(n, dtype=np.int64)
+        self.arrival = np.full(n, -1, dtype=np.int32)
+        self.event_day = np.full(n, NO_DAY, dtype=np.int32)
+        self.event_cap = np.zeros(n, dtype=np.int64)
+        self.attempts = np.zeros(n, dtype=np.int8)
+        # Inventory unit_price where present; restock lots and unpriced rows keep the seeded draw
+        low, high = config.price_range_rupees
+        self.price_paise = rng.integers(low, high + 1, n).astype(np.int64) * 100
+        if "unit_price" in columns.arrays:
+            listed = np.asarray(columns.arrays["unit_price"], dtype=np.float64)
+            priced = np.flatnonzero(np.isfinite(listed))
+            self.price_paise[priced] = rupees_to_paise(listed[priced])
+
+        self.zone[:n_inv], self.expiry[:n_inv], self.stock[:n_inv] = zone_codes, np.clip(expiry, -NO_DAY, NO_DAY - 1), stock
+        if len(restock):
+            arrival = restock["arrival"].to_numpy(dtype=np.int32)
+            self.zone[n_inv:] = restock["hub"].map(zone_lookup).to_numpy()
+            self.arrival[n_inv:] = arrival
+            self.expiry[n_inv:] = arrival + config.restock_shelf_life_days
+            self.stock[n_inv:] = restock["stock"].to_numpy()
+            self.event_day[n_inv:] = restock["event_day"].to_numpy()
+            self.event_cap[n_inv:] = restock["event_cap"].to_numpy()
+
+        # Lots expired before day 0 count as waste on day 0; restock lots go live on arrival
+        first_offer = np.maximum(np.maximum(self.expiry.astype(np.int64) - config.outreach_window_days,
+                                            self.arrival), 0)
+        first_offer = np.where(self.event_day != NO_DAY, np.maximum(first_offer, self.event_day.astype(np.int64) + 1),
+                               first_offer)
+        self._arrivals = _DayPointer(np.where(self.arrival >= 0, self.arrival, -1))
+        self._arrivals.take(-1)   # inventory lots are live from the start
+        self._events = _DayPointer(self.event_day)
+        self._expiries = _DayPointer(self.expiry.astype(np.int64) + 1)
+        self._offers = _DayPointer(first_offer)
+        self._retries = {}        # day -> [positions]
+        self._first_p, self._retry_p = _acceptance_tables(zones, buyer_index, config.acceptance,
+                                                          config.retry_discount)
+        self._live_lots = n_inv
+        self._live_stock = int(stock.sum())
+
+    @classmethod
+    def from_paths(cls, inventory_path, start, config=None, events_path="data/cultural_events.csv",
+                   hubs_path=None, buyer_index=None):
+        from agents.inventory_io import inventory_columns
+        from agents.transfers import HUBS_PATH, load_hubs
+        events = read_cultural_events(events_path) if events_path else []
+        return cls(inventory_columns(inventory_path), start, config, events,
+                   load_hubs(hubs_path or HUBS_PATH), buyer_index)
+
+    # ------------------------------
+    # 🧮 Outreach Outcomes
+    # ------------------------------
+    def _sell(self, lots, p, discount):
+        won = self._rng.random(len(lots)) < p
+        sold = lots[won]
+        units = self.stock[sold]
+        offer_paise = np.rint(self.price_paise[sold] * (1 - np.broadcast_to(discount, lots.shape)[won]))
+        revenue = int((offer_paise.astype(np.int64) * units).sum())
+        self.stock[sold] = 0
+        self._live_lots -= len(sold)
+        self._live_stock -= int(units.sum())
+        return sold, lots[~won], int(units.sum()), revenue
+
+    def _schedule_retries(self, lots, day):
+        attempts = self.attempts[lots] = self.attempts[lots] + 1
+        keep = attempts <= self.config.max_retries
+        lots, attempts = lots[keep], attempts[keep]
+        due = day + self.config.retry_backoff_days * (1 << (attempts.astype(np.int64) - 1))
+        for when in np.unique(due):
+            self._retries.setdefault(int(when), []).append(lots[due == when])
+
+    # ------------------------------
+    # ⏭️ One Day
+    # ------------------------------
+    def step(self, day):
+        config = self.config
+
+        arrived = self._arrivals.take(day)
+        restocked = int(self.stock[arrived].sum())
+        self._live_lots += len(arrived)
+        self._live_stock += restocked
+
+        # Event day: realized demand above the shelf stock comes out of the restock lot at full price
+        selling = self._events.take(day)
+        event_units = np.minimum(self.stock[selling], self.event_cap[selling])
+        self.stock[selling] -= event_units
+        event_sold = int(event_units.sum())
+        self._live_stock -= event_sold
+        self._live_lots -= int(((self.stock[selling] == 0) & (event_units > 0)).sum())
+
+        # Past expiry: whatever is left is waste
+        expired = self._expiries.take(day)
+        expired = expired[self.stock[expired] > 0]
+        waste = int(self.stock[expired].sum())
+        self.stock[expired] = 0
+        self._live_lots -= len(expired)
+        self._live_stock -= waste
+
+        # Entering the outreach window: one offer round at the lot's current tier
+        offered = self._offers.take(day)
+        offered = offered[(self.stock[offered] > 0) & (self.expiry[offered] >= day)]
+        tier = np.digitize(self.expiry[offered] - day, DISCOUNT_TIER_EDGES)
+        accepted, declined, saved, revenue = self._sell(offered, self._first_p[self.zone[offered], tier],
+                                                         DISCOUNT_TIER_RATES[tier])
+        self._schedule_retries(declined, day)
+
+        # Retries due today, at the flat retry discount
+        due = self._retries.pop(day, [])
+        retrying = np.concatenate(due) if due else np.empty(0, dtype=np.int64)
+        retrying = retrying[(self.stock[retrying] > 0) & (self.expiry[retrying] >= day)]
+        retry_won, retry_lost, retry_saved, retry_revenue = self._sell(
+            retrying, self._retry_p[self.zone[retrying]], config.retry_discount)
+        self._schedule_retries(retry_lost, day)
+
+        return DayKPIs(
+            date=self.start + timedelta(days=day),
+            live_lots=self._live_lots,
+            live_stock=self._live_stock,
+            restocked=restocked,
+            # Lots whose days_left hits a tier boundary today, whether or not they are still on hand
+            repriced=sum(self._expiries.count_at(day + 1 + d) for d in TRANSITION_DAYS),
+            offers=len(offered),
+            accepted=len(accepted),
+            retries=len(retrying),
+            retry_accepted=len(retry_won),
+            stock_saved=saved + retry_saved,
+            revenue_paise=revenue + retry_revenue,
+            event_sold=event_sold,
+            event_revenue_paise=int((event_units * self.price_paise[selling]).sum()),
+            waste_lots=len(expired),
+            waste_units=waste,
+        )
+
+    @perf.timed("digital_twin_replay")
+    def run(self):
+        return pd.DataFrame(self, columns=DayKPIs._fields)
+
+    def __iter__(self):
+        # Streams one DayKPIs per simulated day
+        for day in range(self.config.days):
+            yield self.step(day)
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.digital_twin --inventory data/inventory.csv --start 2025-07-10 --days 60
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.digital_twin",
+                                     description="Replay the hubs day by day and stream per-day KPIs as JSON lines.")
+    parser.add_argument("--inventory", required=True)
+    parser.add_argument("--events", default="data/cultural_events.csv")
+    parser.add_argument("--hubs", help="hub/region table (default data/hubs.csv)")
+    parser.add_argument("--start", help="first simulated day, YYYY-MM-DD (default today)")
+    parser.add_argument("--days", type=int, default=TwinConfig.days)
+    parser.add_argument("--seed", type=int, default=TwinConfig.seed)
+    parser.add_argument("--summary-only", action="store_true", help="print only the totals")
+    args = parser.parse_args(argv)
+
+    start = pd.Timestamp(args.start).date() if args.start else datetime.today().date()
+    started = time.perf_counter()
+    twin = DigitalTwin.from_paths(args.inventory, start, TwinConfig(days=args.days, seed=args.seed),
+                                  args.events, args.hubs)
+    built = time.perf_counter()
+    totals = {}
+    for kpis in twin:
+        if not args.summary_only:
+            print(json.dumps({**kpis._asdict(), "date": kpis.date.isoformat()}), flush=True)
+        for name in ("restocked", "offers", "accepted", "retries", "retry_accepted", "stock_saved",
+                     "revenue_paise", "event_sold", "event_revenue_paise", "waste_lots", "waste_units"):
+            totals[name] = totals.get(name, 0) + getattr(kpis, name)
+    print(json.dumps({
+        "lots": len(twin.stock),
+        "days": args.days,
+        "setup_s": round(built - started, 3),
+        "replay_s": round(time.perf_counter() - built, 3),
+        "totals": totals,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import numpy as np
+
+from agents.forecasting import read_cultural_events
+
+# ------------------------------
+# 📅 Cultural Event Calendar
+# ------------------------------
+# Dates are parsed once into datetime64[D] and kept sorted, so a date window or
+# a single day is two searchsorted calls, globally or within one region. Events
+# are deduplicated by event_id (name|date|region, first listing wins) and
+# queries return positions in load order, which keeps the SKU ids derived from
+# an event's position stable.
+def event_id(event):
+    return f"{event['event']}|{event['date']}|{event['region']}"
+
+def _as_day(value):
+    return np.datetime64(value, "D")
+
+class EventCalendar:
+    def __init__(self, events=()):
+        self._events, seen = [], set()
+        for e in events:
+            key = event_id(e)
+            if key not in seen:
+                seen.add(key)
+                self._events.append(e)
+
+        dates = np.array([e["date"] for e in self._events], dtype="datetime64[D]")
+        self._order = np.argsort(dates, kind="stable")
+        self._sorted_dates = dates[self._order]
+
+        # region -> (sorted dates, load positions)
+        regions = np.array([e["region"] for e in self._events], dtype=object)[self._order]
+        self._partitions = {}
+        for region in dict.fromkeys(regions):
+            in_region = regions == region
+            self._partitions[region] = (self._sorted_dates[in_region], self._order[in_region])
+
+    @classmethod
+    def from_csv(cls, path="data/cultural_events.csv"):
+        return cls(read_cultural_events(path))
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def regions(self):
+        return list(self._partitions)
+
+    # ------------------------------
+    # 🔍 Queries (positions in load order)
+    # ------------------------------
+    def _sorted_run(self, region):
+        if region is None:
+            return self._sorted_dates, self._order
+        return self._partitions.get(region, (self._sorted_dates[:0], self._order[:0]))
+
+    def between(self, start=None, end=None, region=None):
+        dates, positions = self._sorted_run(region)
+        lo = 0 if start is None else np.searchsorted(dates, _as_day(start), side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _as_day(end), side="right")
+        return np.sort(positions[lo:hi])
+
+    def on(self, day, region=None):
+        return self.between(day, day, region)
+
+    def take(self, positions):
+        return [self._events[i] for i in positions]
+
+    def events_between(self, start=None, end=None, region=None):
+        return self.take(self.between(start, end, region))
+
+    def events_on(self, day, region=None):
+        return self.take(self.on(day, region))
@@ -1,44 +1,50 @@
+import numpy as np
 import pandas as pd
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime
+
+from agents import perf
+from agents.assignment import assign_buyers
+from agents.buyer_index import BuyerIndex
+from agents.inventory_io import load_expiring_items
+from agents.pricing import list_prices, optimal_markdown
+from agents.records import Buyer, Offer, offers_to_frame, rupees_to_paise
+from agents.retry_store import RETRY_DB_PATH, RetryQueue
 
 # ------------------------------
 # 🧠 Simulated Buyer Profiles
 # ------------------------------
 buyer_profiles = [
-    {"name": "Tandoori Express", "zone": "Zone A", "channel": "WhatsApp", "distance_km": 1, "engagement_score": 8, "last_engaged": "2025-07-09"},
-    {"name": "Green Leaf NGO", "zone": "Zone A", "channel": "Email", "distance_km": 3, "engagement_score": 5, "last_engaged": "2025-07-07"},
-    {"name": "Hostel Delight", "zone": "Zone B", "channel": "SMS", "distance_km": 2, "engagement_score": 6, "last_engaged": "2025-07-10"},
-    {"name": "Anna Daana NGO", "zone": "Zone B", "channel": "WhatsApp", "distance_km": 4, "engagement_score": 7, "last_engaged": "2025-07-08"},
-    {"name": "Kitchen 360", "zone": "Zone C", "channel": "Slack", "distance_km": 5, "engagement_score": 4, "last_engaged": "2025-07-05"},
-    {"name": "Feed Forward Foundation", "zone": "Zone C", "channel": "Email", "distance_km": 1, "engagement_score": 9, "last_engaged": "2025-07-10"}
+    Buyer("Tandoori Express", "Zone A", "WhatsApp", distance_km=1, engagement_score=8, last_engaged=date(2025, 7, 9), capacity=3),
+    Buyer("Green Leaf NGO", "Zone A", "Email", distance_km=3, engagement_score=5, last_engaged=date(2025, 7, 7), capacity=5),
+    Buyer("Hostel Delight", "Zone B", "SMS", distance_km=2, engagement_score=6, last_engaged=date(2025, 7, 10), capacity=4),
+    Buyer("Anna Daana NGO", "Zone B", "WhatsApp", distance_km=4, engagement_score=7, last_engaged=date(2025, 7, 8), capacity=4),
+    Buyer("Kitchen 360", "Zone C", "Slack", distance_km=5, engagement_score=4, last_engaged=date(2025, 7, 5), capacity=3),
+    Buyer("Feed Forward Foundation", "Zone C", "Email", distance_km=1, engagement_score=9, last_engaged=date(2025, 7, 10), capacity=6),
 ]
 
 # ------------------------------
 # 🔁 Retry Queue for Unsold SKUs
 # ------------------------------
-retry_queue = []
+# Durable, shared across sessions; see agents/retry_store.py
+retry_queue = RetryQueue(RETRY_DB_PATH)
+RETRY_BATCH_SIZE = 500
 
 # ------------------------------
 # 🧠 Buyer Ranking Function
 # ------------------------------
-def rank_buyers_for_sku(zone):
-    today = datetime.today().date()
-
-    def score(buyer):
-        distance_score = -buyer["distance_km"] * 2
-        engagement = buyer["engagement_score"] * 3
-        last_engaged_days = (today - datetime.strptime(buyer["last_engaged"], "%Y-%m-%d").date()).days
-        recency_score = max(0, 10 - last_engaged_days) * 1.5
-        channel_bonus = {"WhatsApp": 5, "Email": 3, "SMS": 2, "Slack": 1}
-        return distance_score + engagement + recency_score + channel_bonus.get(buyer["channel"], 0)
+# Pre-scored, per-zone rankings; call buyer_index.sync(buyer_profiles) after editing the list
+buyer_index = BuyerIndex(buyer_profiles)
 
-    zone_buyers = [b for b in buyer_profiles if b["zone"] == zone]
-    return sorted(zone_buyers, key=score, reverse=True)
+@perf.timed()
+def rank_buyers_for_sku(zone):
+    return list(buyer_index.ranked(zone))
 
 # ------------------------------
 # 🎯 Dynamic Discount Logic
 # ------------------------------
+# Fixed tiers, kept as the baseline markdown and for the tier-transition scheduler;
+# redistribution prices come from agents/pricing.py's optimizer by default
 def get_discount_rate(days_to_expiry):
     if days_to_expiry <= 1:
         return 0.50
@@ -51,98 +57,139 @@ def get_discount_rate(days_to_expiry):
     else:
         return 0.10
 
+# Same tiers as get_discount_rate, bucketed over a whole days_left column at once
+DISCOUNT_TIER_EDGES = np.array([2, 3, 4, 6])
+DISCOUNT_TIER_RATES = np.array([0.50, 0.40, 0.30, 0.20, 0.10])
+
+def get_discount_rates(days_to_expiry):
+    return DISCOUNT_TIER_RATES[np.digitize(days_to_expiry, DISCOUNT_TIER_EDGES)]
+
+def tier_markdown(days_left, prices_paise=None, categories=None):
+    return get_discount_rates(days_left)
+
+# ------------------------------
+# 🧮 Columnar Redistribution Engine
+# ------------------------------
+# original_prices are in rupees; the frame carries int paise (format with records.format_price_columns).
+# markdown(days_left, old_paise, categories) -> discount per row; tier_markdown gives the fixed tiers
+def build_redistribution_frame(expiring_items, today, original_prices, markdown=optimal_markdown):
+    days_left = (expiring_items['expiry_date'] - today).dt.days.to_numpy()
+    old_paise = rupees_to_paise(original_prices)
+    discount_rate = markdown(days_left, old_paise, expiring_items['category'])
+    new_paise = np.rint(old_paise * (1 - discount_rate)).astype(np.int64)
+
+    # Rank buyers once per zone instead of once per SKU
+    zones = expiring_items['location']
+    best_buyers = {}
+    for zone in zones.unique():
+        top_buyers = rank_buyers_for_sku(zone)
+        best_buyers[zone] = top_buyers[0] if top_buyers else None
+    buyer_names = {z: b.name if b else "None" for z, b in best_buyers.items()}
+    buyer_channels = {z: b.channel if b else "None" for z, b in best_buyers.items()}
+
+    return pd.DataFrame({
+        'sku_id': expiring_items['sku_id'].to_numpy(),
+        'product': expiring_items['product_name'].to_numpy(),
+        'expiry': expiring_items['expiry_date'].dt.date.to_numpy(),
+        'zone': zones.to_numpy(),
+        'category': expiring_items['category'].to_numpy(),
+        'buyer': zones.map(buyer_names).to_numpy(),
+        'channel': zones.map(buyer_channels).to_numpy(),
+        'old_price_paise': old_paise,
+        'new_price_paise': new_paise,
+        'stock': expiring_items['stock'].to_numpy(),
+        'status': 'Pending'  # Will be updated after outreach
+    })
+
 # ------------------------------
 # 🚀 Core Redistribution Agent
 # ------------------------------
-def run_redistribution(inventory_path):
+@perf.timed()
+def run_redistribution(inventory_path, memory_budget_mb=None):
     random.seed(42)
-    df = pd.read_csv(inventory_path, parse_dates=['expiry_date'])
     today = pd.to_datetime(datetime.today().date())
-    threshold = today + timedelta(days=2)
-
-    expiring_items = df[df['expiry_date'] <= threshold].copy()
-    results = []
+    expiring_items = load_expiring_items(inventory_path, end_days=2, today=today,
+                                         memory_budget_mb=memory_budget_mb)
     total_stock_saved = 0
 
-    for _, row in expiring_items.iterrows():
-        days_left = (row['expiry_date'] - today).days
-        discount_rate = get_discount_rate(days_left)
-
-        original_price = random.randint(30, 100)
-        new_price = round(original_price * (1 - discount_rate), 2)
-        zone = row['location']
+    if expiring_items.empty:
+        return pd.DataFrame([]), total_stock_saved
 
-        top_buyers = rank_buyers_for_sku(zone)
-        best_buyer = top_buyers[0] if top_buyers else None
+    # Inventory unit_price where present; otherwise the seeded per-row draw, in row order
+    original_prices = list_prices(expiring_items, lambda items: [random.randint(30, 100) for _ in range(len(items))])
+    return build_redistribution_frame(expiring_items, today, original_prices), total_stock_saved
 
-        results.append({
-            'sku_id': row['sku_id'],
-            'product': row['product_name'],
-            'expiry': row['expiry_date'].date(),
-            'zone': zone,
-            'buyer': best_buyer["name"] if best_buyer else "None",
-            'channel': best_buyer["channel"] if best_buyer else "None",
-            'old_price': f"₹{original_price}",
-            'new_price': f"₹{new_price}",
-            'stock': row['stock'],
-            'status': 'Pending'  # Will be updated after outreach
-        })
+# ------------------------------
+# ⚖️ Capacity-Aware Redistribution
+# ------------------------------
+@perf.timed()
+def run_optimized_redistribution(inventory_path, memory_budget_mb=None):
+    # Same rows as run_redistribution, with buyers chosen by the global assignment solver
+    df, total_stock_saved = run_redistribution(inventory_path, memory_budget_mb)
+    if df.empty:
+        return df, total_stock_saved, {}
 
-    return pd.DataFrame(results), total_stock_saved
+    assignments, report = assign_buyers(df, buyer_index)
+    df = df.assign(buyer=assignments["buyer"].to_numpy(), channel=assignments["channel"].to_numpy())
+    return df, total_stock_saved, report
 
 # ------------------------------
 # 🔁 Retry Tracking
 # ------------------------------
 def update_retry_queue(sku_data):
-    retry_queue.append(sku_data)
+    retry_queue.push(sku_data)
 
 def get_retry_queue():
-    return retry_queue
+    return retry_queue.items()
 
 # ------------------------------
 # 🔁 Retry Attempt Logic
 # ------------------------------
-def rerun_retry_logic():
+@perf.timed()
+def rerun_retry_logic(batch_size=RETRY_BATCH_SIZE, queue=None):
+    queue = queue or retry_queue
     results = []
     new_queue = []
     total_stock_saved = 0
 
-    for item in retry_queue:
-        original_price = float(item['old_price'].replace("₹", ""))
+    # Claims left in flight by a crashed worker or an interrupted rerun go back to the queue first
+    queue.release_stale()
+
+    # Only the highest-priority SKUs whose backoff has elapsed are claimed
+    for offer in map(Offer.from_row, queue.dequeue_batch(batch_size)):
         # Escalate discount
-        discounted_price = round(original_price * 0.5, 2)  # Escalate to flat 50%
-        top_buyers = rank_buyers_for_sku(item['zone'])[1:]  # Skip previously tried
+        discounted_paise = round(offer.old_price_paise * 0.5)  # Escalate to flat 50%
+        top_buyers = rank_buyers_for_sku(offer.zone)[1:]  # Skip previously tried
 
         matched_buyer = top_buyers[0] if top_buyers else None
         if matched_buyer:
-            item['buyer'] = matched_buyer['name']
-            item['channel'] = matched_buyer['channel']
-            item['new_price'] = f"₹{discounted_price}"
-            item['status'] = '✅ Routed (Retry)'
-            total_stock_saved += item['stock']
-            results.append(item)
+            offer.buyer = matched_buyer.name
+            offer.channel = matched_buyer.channel
+            offer.new_price_paise = discounted_paise
+            offer.status = '✅ Routed (Retry)'
+            total_stock_saved += offer.stock
+            results.append(offer)
         else:
-            item['status'] = '❌ Retry Failed'
-            new_queue.append(item)
+            offer.status = '❌ Retry Failed'
+            new_queue.append(offer)
 
-    retry_queue.clear()
-    retry_queue.extend(new_queue)  # Retain unresolved ones
+    queue.complete([offer.to_row() for offer in results])
+    queue.fail([offer.to_row() for offer in new_queue])  # Retain unresolved ones, rescheduled with backoff
 
-    return pd.DataFrame(results), total_stock_saved
+    return offers_to_frame(results), total_stock_saved
 
 # ------------------------------
 # 📜 Legacy Agent Logs (For 🧠 Tab)
 # ------------------------------
-def run_expiry_agent(inventory_path):
-    df = pd.read_csv(inventory_path, parse_dates=['expiry_date'])
-    today = pd.to_datetime(datetime.today().date())
-    threshold = today + timedelta(days=2)
-
-    near_expiry = df[df['expiry_date'] <= threshold]
-
-    logs = []
-    for _, row in near_expiry.iterrows():
-        log = f"[{datetime.now().strftime('%H:%M:%S')}] SKU {row['sku_id']} ({row['product_name']}) is expiring on {row['expiry_date'].date()} → Candidate for redistribution from {row['location']}"
-        logs.append(log)
-
-    return near_expiry, logs
+def format_expiry_logs(near_expiry):
+    stamp = datetime.now().strftime('%H:%M:%S')
+    return [
+        f"[{stamp}] SKU {sku_id} ({product}) is expiring on {expiry.date()} → Candidate for redistribution from {location}"
+        for sku_id, product, expiry, location in zip(
+            near_expiry['sku_id'], near_expiry['product_name'], near_expiry['expiry_date'], near_expiry['location'])
+    ]
+
+@perf.timed()
+def run_expiry_agent(inventory_path, memory_budget_mb=None):
+    near_expiry = load_expiring_items(inventory_path, end_days=2, memory_budget_mb=memory_budget_mb)
+    return near_expiry, format_expiry_logs(near_expiry)
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+from agents import inventory_cache
+
+# ------------------------------
+# 🗓️ Expiry-Sorted Inventory Index
+# ------------------------------
+# Row ids are kept sorted by expiry date, so "expiring in [a, b]" is two
+# searchsorted calls and a slice, globally or within one location. Inserts go
+# to a small pending buffer that is merged into the sorted arrays once it grows
+# past MERGE_THRESHOLD; stock updates overwrite a per-row array in place.
+MERGE_THRESHOLD = 4_096
+
+def _as_datetime64(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value), "ns")
+
+def _stitch(base_take, base_rows, extra_take, positions):
+    # Fetch base and inserted rows separately, then restore the requested order
+    is_base = positions < base_rows
+    if is_base.all():
+        return base_take(positions)
+    frame = pd.concat([base_take(positions[is_base]), extra_take(positions[~is_base] - base_rows)])
+    order = np.argsort(np.concatenate([np.flatnonzero(is_base), np.flatnonzero(~is_base)]), kind="stable")
+    return frame.iloc[order]
+
+class ExpiryIndex:
+    def __init__(self, dates, location_codes, locations, stock, sku_ids, take):
+        self._take = take                 # positions -> DataFrame rows of the base inventory
+        self._base_rows = len(dates)
+        self._dates_by_row = np.asarray(dates, dtype="datetime64[ns]")
+        self._loc_by_row = np.asarray(location_codes, dtype=np.int32)
+        self._locations = list(locations)
+        self._stock = np.array(stock)
+        self._sku_ids = sku_ids
+        self._sku_lookup = None
+
+        self._order = np.argsort(self._dates_by_row, kind="stable")
+        self._sorted_dates = self._dates_by_row[self._order]
+        self._partitions = None
+
+        self._pending = []                # inserted rows as dicts, ids continue after the base rows
+
+    @classmethod
+    def from_frame(cls, df):
+        location = df["location"].astype("category")
+        return cls(
+            df["expiry_date"].to_numpy(dtype="datetime64[ns]"),
+            location.cat.codes.to_numpy(),
+            location.cat.categories,
+            df["stock"].to_numpy(),
+            df["sku_id"].to_numpy(),
+            lambda positions: df.iloc[positions],
+        )
+
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(
+            columns.arrays["expiry_date"],
+            columns.arrays["location"],
+            columns.categories["location"],
+            columns.arrays["stock"],
+            columns.arrays["sku_id"],
+            lambda positions: inventory_cache.frame_from_columns(columns, positions),
+        )
+
+    def __len__(self):
+        return len(self._order) + len(self._pending)
+
+    # ------------------------------
+    # 🔍 Queries
+    # ------------------------------
+    def positions(self, start=None, end=None, location=None):
+        dates, rows = self._sorted_run(location)
+        lo = 0 if start is None else np.searchsorted(dates, _as_datetime64(start), side="left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _as_datetime64(end), side="right")
+        return rows[lo:hi]
+
+    def count(self, start=None, end=None, location=None):
+        return len(self.positions(start, end, location)) + len(self._pending_hits(start, end, location))
+
+    def window(self, start=None, end=None, location=None, offset=0, limit=None, order="expiry"):
+        rows = self.positions(start, end, location)
+        pending = self._pending_hits(start, end, location)
+
+        if pending:
+            # Only the first offset+limit base rows can land on the requested page
+            if limit is not None:
+                rows = rows[:offset + limit]
+            pending_dates = np.array([self._pending[i]["expiry_date"] for i in pending], dtype="datetime64[ns]")
+            pending_rows = np.asarray(pending, dtype=np.int64) + self._base_rows
+            merged_dates = np.concatenate([self._dates_by_row[rows], pending_dates])
+            rows = np.concatenate([rows, pending_rows])[np.argsort(merged_dates, kind="stable")]
+
+        rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+        if order == "source":
+            rows = np.sort(rows)
+        return self._materialize(rows)
+
+    # ------------------------------
+    # ✏️ Updates
+    # ------------------------------
+    def insert(self, rows):
+        for record in rows.to_dict("records") if isinstance(rows, pd.DataFrame) else rows:
+            record = dict(record)
+            record["expiry_date"] = pd.Timestamp(record["expiry_date"])
+            self._pending.append(record)
+        if len(self._pending) > MERGE_THRESHOLD:
+            self._merge_pending()
+
+    def update_stock(self, sku_id, stock):
+        for row in self._rows_for_sku(sku_id):
+            self._stock[row] = stock
+        for record in self._pending:
+            if record["sku_id"] == sku_id:
+                record["stock"] = stock
+
+    # ------------------------------
+    # 🔧 Internals
+    # ------------------------------
+    def _sorted_run(self, location):
+        if location is None:
+            return self._sorted_dates, self._order
+        if self._partitions is None:
+            # One stable sort by location over the expiry order keeps each partition date-sorted
+            loc_in_order = self._loc_by_row[self._order]
+            grouped = np.argsort(loc_in_order, kind="stable")
+            bounds = np.searchsorted(loc_in_order[grouped], np.arange(len(self._locations) + 1))
+            self._partitions = {}
+            for code, name in enumerate(self._locations):
+                rows = self._order[grouped[bounds[code]:bounds[code + 1]]]
+                self._partitions[name] = (self._dates_by_row[rows], rows)
+        empty = np.empty(0, dtype=np.int64)
+        return self._partitions.get(location, (empty.astype("datetime64[ns]"), empty))
+
+    def _pending_hits(self, start, end, location):
+        start, end = _as_datetime64(start), _as_datetime64(end)
+        hits = []
+        for i, record in enumerate(self._pending):
+            expiry = np.datetime64(record["expiry_date"], "ns")
+            if start is not None and expiry < start:
+                continue
+            if end is not None and expiry > end:
+                continue
+            if location is not None and record["location"] != location:
+                continue
+            hits.append(i)
+        return hits
+
+    def _rows_for_sku(self, sku_id):
+        if self._sku_lookup is None:
+            self._sku_lookup = pd.Index(np.asarray(self._sku_ids, dtype=object))
+        rows = self._sku_lookup.get_indexer_for([sku_id])
+        return rows[rows >= 0]
+
+    def _materialize(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        base_rows = self._base_rows
+        frame = _stitch(
+            self._take, base_rows,
+            lambda idx: pd.DataFrame([self._pending[i] for i in idx], index=idx + base_rows),
+            rows,
+        )
+        # Stock lives in the index so updates never touch the underlying inventory
+        is_base = rows < base_rows
+        stock = frame["stock"].to_numpy().copy()
+        stock[is_base] = self._stock[rows[is_base]]
+        return frame.assign(stock=stock)
+
+    def _merge_pending(self):
+        pending = pd.DataFrame(self._pending)
+        base_take = self._take
+        base_rows = self._base_rows
+        stock = self._stock
+
+        def take(positions):
+            return _stitch(
+                base_take, base_rows,
+                lambda idx: pending.iloc[idx].set_axis(idx + base_rows),
+                np.asarray(positions, dtype=np.int64),
+            )
+
+        new_names = [name for name in pending["location"].unique() if name not in self._locations]
+        self._locations.extend(new_names)
+        location = pd.Categorical(pending["location"], categories=self._locations)
+
+        self._take = take
+        self._base_rows = base_rows + len(pending)
+        self._dates_by_row = np.concatenate([self._dates_by_row, pending["expiry_date"].to_numpy(dtype="datetime64[ns]")])
+        self._loc_by_row = np.concatenate([self._loc_by_row, location.codes.astype(np.int32)])
+        self._stock = np.concatenate([stock, pending["stock"].to_numpy(dtype=np.int64)])
+        self._sku_ids = np.concatenate([np.asarray(self._sku_ids, dtype=object), pending["sku_id"].to_numpy(dtype=object)])
+        self._sku_lookup = None
+
+        # Both runs are already sorted, so the stable sort is a linear merge
+        new_rows = np.arange(base_rows, self._base_rows)
+        new_rows = new_rows[np.argsort(self._dates_by_row[new_rows], kind="stable")]
+        self._order = np.concatenate([self._order, new_rows])
+        self._order = self._order[np.argsort(self._dates_by_row[self._order], kind="stable")]
+        self._sorted_dates = self._dates_by_row[self._order]
+        self._partitions = None
+        self._pending = []
@@ -0,0 +1,319 @@
+import argparse
+import heapq
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+from collections import deque, namedtuple
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from agents.expiry_agent import DISCOUNT_TIER_EDGES, get_discount_rate
+
+# ------------------------------
+# ⏰ Event-Driven Expiry Scheduler
+# ------------------------------
+# Each tracked lot has exactly one pending heap entry: the next midnight at
+# which its days_to_expiry crosses a get_discount_rate boundary (5, 3, 2, 1
+# days left) or the day after it expires. The scheduler sleeps until the
+# earliest entry is due, emits events for the lots that crossed, and schedules
+# their next boundary, so the work done is proportional to tier transitions,
+# not to inventory size × poll rate. Lots are keyed like incremental.LOT_KEY,
+# (sku_id, product_name, expiry_date), since one sku_id can label several lots.
+# Re-tracking an unchanged lot is a no-op. A removed lot (a changed expiry is
+# a new lot) leaves its heap entry behind, skipped when it surfaces, and the
+# heap is rebuilt from the live lots once stale entries outnumber them.
+TRANSITION_DAYS = sorted((DISCOUNT_TIER_EDGES - 1).tolist(), reverse=True)   # [5, 3, 2, 1]
+OUTREACH_WINDOW_DAYS = 2    # run_redistribution's window: entering it triggers outreach
+AUDIT_EVENTS = 10_000
+
+REPRICE, OUTREACH, EXPIRED = "reprice", "outreach", "expired"
+
+ExpiryEvent = namedtuple("ExpiryEvent", ["kind", "sku_id", "days_left", "discount_rate",
+                                         "scheduled_for", "emitted_at", "payload"])
+
+def _midnight(day):
+    return datetime.combine(day, time.min)
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else pd.Timestamp(value).date()
+
+def lot_key(sku_id, product_name, expiry):
+    # Hashable (sku_id, product, expiry date) for an incremental.LOT_KEY row; missing values are None
+    return (sku_id, None if pd.isna(product_name) else product_name, None if pd.isna(expiry) else _as_date(expiry))
+
+def _frame_lots(inventory):
+    products = inventory["product_name"].astype(object)
+    expiry = inventory["expiry_date"].dt.date.astype(object)
+    return list(zip(inventory["sku_id"].tolist(), products.where(products.notna(), None).tolist(),
+                    expiry.where(expiry.notna(), None).tolist()))
+
+def next_transition(expiry, today):
+    # First boundary strictly after today: (fire at, days_left then); the expiry+1 day closes the SKU
+    days_left = (expiry - today).days
+    for days in TRANSITION_DAYS:
+        if days < days_left:
+            return _midnight(expiry - timedelta(days=days)), days
+    return _midnight(expiry + timedelta(days=1)), -1
+
+class ExpiryScheduler:
+    def __init__(self, now_fn=None, audit_path=None, queue_events=True):
+        self._now_fn = now_fn or datetime.now
+        self._cond = threading.Condition()
+        self._heap = []          # (fire_at, seq, lot, version)
+        self._seq = itertools.count()
+        self._skus = {}          # lot -> [version, expiry date, payload, last emitted days_left or None, fire_at]
+        self.events = queue.Queue() if queue_events else None
+        self.audit = deque(maxlen=AUDIT_EVENTS)
+        self.audit_path = audit_path
+        self._thread = None
+        self._stopped = False
+
+    @classmethod
+    def from_inventory(cls, inventory_path, now_fn=None, audit_path=None):
+        from agents.inventory_io import read_inventory
+        scheduler = cls(now_fn, audit_path)
+        scheduler.track_frame(read_inventory(inventory_path))
+        return scheduler
+
+    def __len__(self):
+        return len(self._skus)
+
+    # ------------------------------
+    # ✏️ Tracking
+    # ------------------------------
+    def upsert(self, sku_id, expiry, **payload):
+        lot = lot_key(sku_id, payload.get("product_name"), expiry)
+        self._track([(lot, lot[2], payload)])
+
+    def remove(self, lot):
+        with self._cond:
+            if self._skus.pop(lot, None) is not None:   # its heap entry goes stale
+                self._compact_if_stale()
+
+    def track_frame(self, inventory, payload_columns=("product_name", "location")):
+        # Inventory rows (sku_id, product_name, expiry_date, ...); a repeated lot keeps its last row
+        self._track_lots(inventory, _frame_lots(inventory), payload_columns)
+
+    def _track_lots(self, inventory, lots, payload_columns=("product_name", "location")):
+        payloads = inventory[list(payload_columns)].astype(object).to_dict("records") if payload_columns else None
+        # Rows without an expiry date have no tier to track
+        self._track((lot, lot[2], payload)
+                    for lot, payload in zip(lots, payloads if payloads is not None else itertools.repeat({}))
+                    if lot[2] is not None)
+
+    def apply_changes(self, upserts, deleted=()):
+        # Same change feed as IncrementalRedistribution.apply_changes: deleted holds lot keys, and
+        # one without a product or expiry removes every lot of its sku_id
+        whole = set()
+        for lot in deleted:
+            lot = lot_key(*lot)
+            if lot[1] is None or lot[2] is None:
+                whole.add(lot[0])
+            else:
+                self.remove(lot)
+        if whole:
+            with self._cond:
+                lots = [lot for lot in self._skus if lot[0] in whole]
+            for lot in lots:
+                self.remove(lot)
+        if len(upserts):
+            self.track_frame(upserts)
+
+    def sync_frame(self, inventory):
+        # Make the tracked set match a fresh inventory snapshot; unchanged lots keep their tier state
+        lots = _frame_lots(inventory)
+        with self._cond:
+            gone = self._skus.keys() - set(lots)
+        for lot in gone:
+            self.remove(lot)
+        self._track_lots(inventory, lots)
+
+    def _track(self, rows):
+        today = self._now_fn().date()
+        with self._cond:
+            earliest = self._heap[0][0] if self._heap else None
+            added = []
+            for lot, expiry, payload in rows:
+                previous = self._skus.get(lot)
+                if previous is not None and previous[1] == expiry:
+                    # Same expiry: the pending entry stays valid, only the payload may change
+                    previous[2] = payload
+                    continue
+                version = previous[0] + 1 if previous else 0
+                days_left = (expiry - today).days
+                if days_left <= TRANSITION_DAYS[0]:
+                    fire_at = _midnight(today)   # already inside a discount tier: announce it now
+                else:
+                    fire_at = next_transition(expiry, today)[0]
+                # An expiry change re-announces the lot's tier
+                self._skus[lot] = [version, expiry, payload, None, fire_at]
+                added.append((fire_at, next(self._seq), lot, version))
+            if not added:
+                return
+            if len(added) > len(self._heap):
+                self._heap.extend(added)
+                heapq.heapify(self._heap)
+            else:
+                for entry in added:
+                    heapq.heappush(self._heap, entry)
+            self._compact_if_stale()
+            if self._heap and (earliest is None or self._heap[0][0] < earliest):
+                self._cond.notify()
+
+    def _compact_if_stale(self):
+        # Called with the lock held: rebuild from the live lots once stale entries outnumber them
+        if len(self._heap) <= 2 * len(self._skus) + 64:
+            return
+        self._heap = [(state[4], next(self._seq), lot, state[0])
+                      for lot, state in self._skus.items() if state[4] is not None]
+        heapq.heapify(self._heap)
+
+    # ------------------------------
+    # 🔔 Firing
+    # ------------------------------
+    def next_wakeup(self):
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            _, _, lot, version = self._heap[0]
+            state = self._skus.get(lot)
+            if state is not None and state[0] == version:
+                return
+            heapq.heappop(self._heap)
+
+    def run_due(self, now=None):
+        # Emit events for every lot whose transition is due; several missed boundaries collapse into one
+        now = now or self._now_fn()
+        today = now.date()
+        emitted = []
+        with self._cond:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                fire_at, _, lot, version = heapq.heappop(self._heap)
+                state = self._skus[lot]
+                emitted.extend(self._fire(lot[0], state, fire_at, now, today))
+                if state[4] is not None:
+                    state[4] = next_transition(state[1], today)[0]
+                    heapq.heappush(self._heap, (state[4], next(self._seq), lot, version))
+        if self.events is not None:
+            for event in emitted:
+                self.events.put(event)
+        self._write_audit(emitted)
+        return emitted
+
+    def _fire(self, sku_id, state, fire_at, now, today):
+        _, expiry, payload, previous_days, _ = state
+        days_left = (expiry - today).days
+        if days_left < 0:
+            # Kept (with no pending entry) until it leaves the inventory, so a re-sync doesn't re-expire it
+            state[3], state[4] = days_left, None
+            return [ExpiryEvent(EXPIRED, sku_id, days_left, None, fire_at, now, payload)]
+        state[3] = days_left
+        rate = get_discount_rate(days_left)
+        events = []
+        if previous_days is None or get_discount_rate(previous_days) != rate:
+            events.append(ExpiryEvent(REPRICE, sku_id, days_left, rate, fire_at, now, payload))
+        if days_left <= OUTREACH_WINDOW_DAYS and (previous_days is None or previous_days > OUTREACH_WINDOW_DAYS):
+            events.append(ExpiryEvent(OUTREACH, sku_id, days_left, rate, fire_at, now, payload))
+        return events
+
+    def _write_audit(self, events):
+        self.audit.extend(events)
+        if not self.audit_path or not events:
+            return
+        directory = os.path.dirname(self.audit_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.audit_path, "a") as f:
+            f.writelines(json.dumps(event_to_dict(e)) + "\n" for e in events)
+
+    def drain(self):
+        drained = []
+        while self.events is not None:
+            try:
+                drained.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return drained
+
+    # ------------------------------
+    # 🧵 Background Thread
+    # ------------------------------
+    def start(self):
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="expiry-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while True:
+            self.run_due()
+            with self._cond:
+                if self._stopped:
+                    return
+                self._drop_stale()
+                timeout = None
+                if self._heap:
+                    timeout = max((self._heap[0][0] - self._now_fn()).total_seconds(), 0)
+                # Woken early by stop() or by a SKU whose transition comes before the current head
+                self._cond.wait(timeout)
+                if self._stopped:
+                    return
+
+def event_to_dict(event):
+    record = event._asdict()
+    record["scheduled_for"] = event.scheduled_for.isoformat()
+    record["emitted_at"] = event.emitted_at.isoformat()
+    record["payload"] = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in event.payload.items()}
+    return record
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.expiry_scheduler --inventory data/inventory.csv --audit data/.cache/expiry_audit.jsonl
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.expiry_scheduler",
+                                     description="Emit repricing/outreach events as SKUs cross discount tiers.")
+    parser.add_argument("--inventory", required=True)
+    parser.add_argument("--audit", help="append every emitted event here as JSON lines")
+    parser.add_argument("--once", action="store_true", help="emit what is due now and exit")
+    args = parser.parse_args(argv)
+
+    scheduler = ExpiryScheduler.from_inventory(args.inventory, audit_path=args.audit)
+    if args.once:
+        for event in scheduler.run_due():
+            print(json.dumps(event_to_dict(event)), flush=True)
+        return 0
+
+    scheduler.start()
+    try:
+        while True:
+            print(json.dumps(event_to_dict(scheduler.events.get())), flush=True)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
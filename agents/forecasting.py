@@ -0,0 +1,102 @@
+import csv
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from agents import perf
+
+# ----------------------------
+# Load Events from CSV
+# ----------------------------
+@perf.timed()
+def read_cultural_events(path="data/cultural_events.csv"):
+    events = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            events.append({
+                "event": row["event"],
+                "date": row["date"],
+                "region": row["region"],
+                "high_demand_skus": [sku.strip() for sku in row["high_demand_skus"].split(";")],
+                "confidence": row["confidence"]
+            })
+    return events
+
+
+# ----------------------------
+# Deterministic SKU-based Stock Generation
+# ----------------------------
+# Placeholder figures: stock always, demand only for SKUs without sales history
+# (see agents/demand_model.py)
+def deterministic_hash(sku_name):
+    return int(hashlib.md5(sku_name.encode()).hexdigest(), 16)
+
+@lru_cache(maxsize=1 << 16)
+def generate_stock_and_demand(sku_name):
+    hash_val = deterministic_hash(sku_name)
+    current_stock = 80 + (hash_val % 71)  # Range: 80–150
+    expected_demand = 120 + (hash_val % 101)  # Range: 120–220
+    return current_stock, expected_demand
+
+
+# ----------------------------
+# Events × SKUs → Columnar Frame
+# ----------------------------
+RECOMMENDATION_COLUMNS = [
+    "sku_id", "product_name", "event", "region", "confidence",
+    "current_stock", "expected_demand", "stock_gap", "action",
+]
+TREND_SPIKE = 1.3
+
+def explode_events(events):
+    # One row per (event, SKU); event_idx is the event's position in the list
+    counts = np.fromiter((len(e["high_demand_skus"]) for e in events), dtype=np.int64, count=len(events))
+    event_idx = np.repeat(np.arange(len(events)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    frame = pd.DataFrame({
+        "event_idx": event_idx,
+        "position": np.arange(len(event_idx)) - starts,
+        "product_name": [sku for e in events for sku in e["high_demand_skus"]],
+    })
+    for field in ("event", "region", "confidence"):
+        frame[field] = np.asarray([e[field] for e in events], dtype=object)[event_idx]
+    return frame
+
+@perf.timed()
+def build_sku_recommendations(events, simulate_trend_spike=False, event_offset=0, demand_model=None):
+    # event_offset: position of events[0] in the full list, so a slice keeps the full list's SKU ids;
+    # demand_model: a fitted demand_model.DemandModel, whose forecast over each event's lead-up
+    # replaces the placeholder demand wherever the SKU has sales history in the event's region
+    if not events:
+        return pd.DataFrame(columns=RECOMMENDATION_COLUMNS)
+    frame = explode_events(events)
+
+    # A SKU listed twice in one event keeps the position of its first listing
+    first_position = frame.groupby(["event_idx", "product_name"], sort=False)["position"].transform("min").to_numpy()
+    prefixes = np.array([f"SKU{900 + event_offset + idx}" for idx in range(len(events))], dtype=object)
+    suffixes = np.array([str(pos) for pos in range(first_position.max() + 1)], dtype=object)
+    frame["sku_id"] = prefixes[frame["event_idx"].to_numpy()] + suffixes[first_position]
+
+    # Hash each distinct SKU once, then gather
+    codes, uniques = pd.factorize(frame["product_name"])
+    stock_demand = np.array([generate_stock_and_demand(sku) for sku in uniques], dtype=np.int64).reshape(-1, 2)
+    frame["current_stock"] = stock_demand[codes, 0]
+    expected = stock_demand[codes, 1]
+    if demand_model is not None:
+        dates = np.asarray([e["date"] for e in events], dtype=object)[frame["event_idx"].to_numpy()]
+        forecast = demand_model.window_demand(frame["product_name"], frame["region"], dates)
+        expected = np.where(np.isnan(forecast), expected, np.rint(forecast)).astype(np.int64)
+    if simulate_trend_spike:
+        expected = (expected * TREND_SPIKE).astype(np.int64)
+    frame["expected_demand"] = expected
+
+    frame["stock_gap"] = frame["expected_demand"] - frame["current_stock"]
+    frame["action"] = np.select(
+        [frame["stock_gap"] > 0, frame["stock_gap"] < 0],
+        ["⚠️ Restock Needed", "✅ Overstocked"],
+        default="✔️ Just In Time",
+    )
+    return frame[RECOMMENDATION_COLUMNS]
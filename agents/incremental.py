@@ -0,0 +1,284 @@
+import argparse
+import io
+import json
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from agents.expiry_agent import build_redistribution_frame, format_expiry_logs
+from agents.inventory_io import DATE_COLUMNS, read_inventory
+from agents.pricing import list_prices
+
+# ------------------------------
+# ♻️ Incremental Redistribution State
+# ------------------------------
+# Keeps the inventory, its redistribution candidates and expiry window
+# materialized by lot, and applies a change feed (an append-only delta CSV
+# or a diff against a new snapshot) by recomputing only the touched lots.
+# A lot is (sku_id, product_name, expiry_date): one sku_id can label several
+# products or batches, so a changed product or expiry is a new lot and the old
+# one has to be deleted (diff_snapshot does this on its own).
+# Discount tiers depend on the date, so the first change seen on a new day
+# triggers one full recompute. Prices come from the inventory's unit_price;
+# rows without one get a price derived from the sku_id, not from
+# run_redistribution's seeded per-row draw, so a SKU keeps its price from one
+# delta to the next.
+INVENTORY_FIELDS = ["sku_id", "product_name", "expiry_date", "location", "category", "stock", "unit_price"]
+LOT_KEY = ["sku_id", "product_name", "expiry_date"]
+DELTA_DTYPES = {"sku_id": "object", "product_name": "object", "location": "object",
+                "category": "object", "stock": "int32", "unit_price": "float64", "op": "object"}
+DELETE_OP = "delete"
+COMPACT_THRESHOLD = 50_000
+
+# flagged: recomputed candidate rows; unflagged: lots that left the candidate list
+DeltaResult = namedtuple("DeltaResult", ["flagged", "unflagged", "logs", "full_refresh"])
+
+def _today():
+    return pd.to_datetime(datetime.today().date())
+
+def sku_prices(sku_ids):
+    # Stable ₹30–100 list price per SKU (pandas' hash is seeded with a fixed key)
+    hashed = pd.util.hash_pandas_object(pd.Series(sku_ids, dtype=object), index=False).to_numpy()
+    return (30 + hashed % 71).astype(np.int64)
+
+def lot_index(lots=()):
+    # Lot keys as a MultiIndex; accepts a frame with the key columns or (sku_id, product, expiry) tuples
+    if isinstance(lots, pd.MultiIndex):
+        return lots
+    if isinstance(lots, pd.DataFrame):
+        return pd.MultiIndex.from_frame(lots[LOT_KEY])
+    return pd.MultiIndex.from_tuples(list(lots), names=LOT_KEY)
+
+def _by_lot(frame):
+    # The lot is the change-feed key; a repeated lot keeps its last row (files without unit_price get NaN)
+    frame = frame.reindex(columns=INVENTORY_FIELDS)
+    return frame.drop_duplicates(LOT_KEY, keep="last").set_index(LOT_KEY, drop=False)
+
+# ------------------------------
+# 📥 Change Feeds
+# ------------------------------
+def read_delta_rows(path, offset=0):
+    # Only complete lines past `offset` are parsed; returns (rows, new offset)
+    with open(path, "rb") as f:
+        header = f.readline()
+        if offset < len(header) or offset > os.fstat(f.fileno()).st_size:
+            offset = len(header)  # first read, or the file was truncated and restarted
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    rows = pd.read_csv(io.BytesIO(header + data[:end]), dtype=DELTA_DTYPES, parse_dates=DATE_COLUMNS)
+    # A header-only read leaves expiry_date as object
+    rows["expiry_date"] = pd.to_datetime(rows["expiry_date"])
+    return rows, offset + end
+
+def split_delta(rows):
+    # Last operation per lot wins; rows without an op column are upserts. A delete row that leaves
+    # product_name or expiry_date empty removes every lot of its sku_id.
+    rows = rows.drop_duplicates(LOT_KEY, keep="last")
+    deleted = rows["op"].str.lower().eq(DELETE_OP) if "op" in rows else pd.Series(False, index=rows.index)
+    return _by_lot(rows[~deleted]), lot_index(rows[deleted])
+
+def diff_snapshot(previous, snapshot):
+    # -> (upserts, deleted lots) turning `previous` into `snapshot`, both indexed by lot
+    deleted = previous.index.difference(snapshot.index)
+    common = snapshot.index.intersection(previous.index)
+    before, after = previous.loc[common], snapshot.loc[common]
+    changed = np.zeros(len(common), dtype=bool)
+    for col in INVENTORY_FIELDS[1:]:
+        # Categorical columns carry per-file category sets, so compare their values
+        b, a = before[col], after[col]
+        if isinstance(b.dtype, pd.CategoricalDtype) or isinstance(a.dtype, pd.CategoricalDtype):
+            b, a = b.astype(object), a.astype(object)
+        changed |= ~(b.to_numpy() == a.to_numpy()) & ~(b.isna().to_numpy() & a.isna().to_numpy())
+    touched = snapshot.index.difference(previous.index).append(common[changed])
+    return snapshot.loc[touched], deleted
+
+# ------------------------------
+# 🧮 Materialized State
+# ------------------------------
+class IncrementalRedistribution:
+    def __init__(self, inventory, end_days=2, today_fn=None):
+        self.end_days = end_days
+        self._today_fn = today_fn or _today
+        self._base = _by_lot(inventory)
+        self._overlay = self._base.iloc[:0]   # upserts not yet merged into _base
+        self._deleted = lot_index()           # base lots removed since the last compaction
+        self._today = None
+        self.redistribution = pd.DataFrame()  # indexed by lot
+        self.near_expiry = self._base.iloc[:0]
+        self.delta_offsets = {}
+
+    @classmethod
+    def from_inventory(cls, inventory_path, end_days=2, today_fn=None):
+        state = cls(read_inventory(inventory_path), end_days, today_fn)
+        state.refresh()
+        return state
+
+    # ------------------------------
+    # 📦 Inventory
+    # ------------------------------
+    def inventory(self):
+        self._compact()
+        return self._base
+
+    def _compact(self):
+        if self._overlay.empty and self._deleted.empty:
+            return
+        kept = self._base[~self._base.index.isin(self._overlay.index.append(self._deleted))]
+        merged = pd.concat([kept, self._overlay])
+        for col in ("location", "category"):
+            merged[col] = merged[col].astype("category")
+        self._base, self._overlay, self._deleted = merged, merged.iloc[:0], lot_index()
+
+    def _expand_deleted(self, deleted):
+        # Deletes without a product or expiry name a whole sku_id: resolve them to its current lots
+        partial = (deleted.get_level_values("product_name").isna()
+                   | deleted.get_level_values("expiry_date").isna())
+        if not partial.any():
+            return deleted
+        ids = deleted.get_level_values("sku_id")[partial]
+        live = self._base.index[~self._base.index.isin(self._deleted)].append(self._overlay.index)
+        return deleted[~partial].append(live[live.get_level_values("sku_id").isin(ids)]).unique()
+
+    def _record(self, upserts, deleted):
+        # Membership is probed against the large indexes (hash tables built once), never scanned
+        self._overlay = pd.concat([self._overlay.drop(upserts.index.append(deleted), errors="ignore"), upserts])
+        self._deleted = self._deleted.append(deleted[self._base.index.get_indexer(deleted) >= 0]).unique()
+        if len(self._overlay) + len(self._deleted) > COMPACT_THRESHOLD:
+            self._compact()
+
+    # ------------------------------
+    # 🔄 Recompute
+    # ------------------------------
+    def _window_end(self, today):
+        return today + timedelta(days=self.end_days)
+
+    def _candidates(self, rows, today):
+        in_window = rows[rows["expiry_date"] <= self._window_end(today)]
+        if in_window.empty:
+            return in_window, self.redistribution.iloc[:0]
+        prices = list_prices(in_window, lambda items: sku_prices(items["sku_id"]))
+        frame = build_redistribution_frame(in_window, today, prices)
+        return in_window, frame.set_index(in_window.index)
+
+    def _result(self, previously_flagged, near_expiry, redistribution, unflagged, full_refresh):
+        # near_expiry/redistribution: rows recomputed in this pass; only first-time candidates are logged
+        first_time = previously_flagged.get_indexer(redistribution.index) < 0
+        return DeltaResult(redistribution, unflagged, format_expiry_logs(near_expiry[first_time]), full_refresh)
+
+    def refresh(self):
+        today = self._today_fn()
+        previously_flagged = self.redistribution.index
+        self._today = today
+        self.near_expiry, self.redistribution = self._candidates(self.inventory(), today)
+        unflagged = previously_flagged.difference(self.redistribution.index)
+        return self._result(previously_flagged, self.near_expiry, self.redistribution, unflagged, True)
+
+    def apply_changes(self, upserts, deleted=()):
+        upserts = _by_lot(upserts) if list(upserts.index.names) != LOT_KEY else upserts
+        deleted = self._expand_deleted(lot_index(deleted)).difference(upserts.index)
+        self._record(upserts, deleted)
+        if self._today_fn() != self._today:
+            return self.refresh()
+
+        # near_expiry and redistribution share one lot index, so one mask drops touched rows from both
+        previously_flagged = self.redistribution.index
+        touched = upserts.index.append(deleted)
+        hits = previously_flagged.get_indexer(touched)
+        keep = np.ones(len(previously_flagged), dtype=bool)
+        keep[hits[hits >= 0]] = False
+
+        near_expiry, redistribution = self._candidates(upserts, self._today)
+        self.near_expiry = pd.concat([self.near_expiry[keep], near_expiry])
+        self.redistribution = pd.concat([self.redistribution[keep], redistribution]) if keep.any() else redistribution
+        unflagged = touched[hits >= 0].difference(redistribution.index)
+        return self._result(previously_flagged, near_expiry, redistribution, unflagged, False)
+
+    def apply_delta_file(self, delta_path):
+        key = os.path.abspath(delta_path)
+        rows, self.delta_offsets[key] = read_delta_rows(delta_path, self.delta_offsets.get(key, 0))
+        return self.apply_changes(*split_delta(rows))
+
+    def apply_snapshot(self, snapshot):
+        if isinstance(snapshot, str):
+            snapshot = read_inventory(snapshot)
+        upserts, deleted = diff_snapshot(self.inventory(), _by_lot(snapshot))
+        return self.apply_changes(upserts, deleted)
+
+    # ------------------------------
+    # 💾 Persist Between Runs
+    # ------------------------------
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        pd.to_pickle({
+            "end_days": self.end_days, "today": self._today, "inventory": self.inventory(),
+            "redistribution": self.redistribution, "near_expiry": self.near_expiry,
+            "delta_offsets": self.delta_offsets,
+        }, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, today_fn=None):
+        saved = pd.read_pickle(path)
+        state = cls(saved["inventory"], saved["end_days"], today_fn)
+        state.delta_offsets = saved["delta_offsets"]
+        # States saved before lots were the key leave _today unset, so the next change refreshes them
+        if list(saved["near_expiry"].index.names) == LOT_KEY:
+            state._today = saved["today"]
+            state.redistribution = saved["redistribution"]
+            state.near_expiry = saved["near_expiry"]
+        return state
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.incremental --inventory data/inventory.csv --state data/.cache/incremental.pkl \
+#     --delta data/inventory_delta.csv --out out/hub
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.incremental",
+                                     description="Apply inventory changes to a saved redistribution state.")
+    parser.add_argument("--inventory", required=True, help="base inventory CSV, used when no state exists yet")
+    parser.add_argument("--state", required=True, help="pickled state carried between runs")
+    feed = parser.add_mutually_exclusive_group()
+    feed.add_argument("--delta", help="append-only delta CSV (inventory columns plus an optional op column)")
+    feed.add_argument("--snapshot", help="full inventory snapshot to diff against the state")
+    parser.add_argument("--out", help="write redistribution.csv and append expiry_log.txt here")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.state):
+        state = IncrementalRedistribution.load(args.state)
+        if args.delta:
+            result = state.apply_delta_file(args.delta)
+        elif args.snapshot:
+            result = state.apply_snapshot(args.snapshot)
+        else:
+            result = state.refresh()
+    else:
+        state = IncrementalRedistribution(read_inventory(args.inventory))
+        result = state.refresh()
+        if args.delta:
+            # Rows already in the delta file are assumed to be reflected in the base inventory
+            state.delta_offsets[os.path.abspath(args.delta)] = os.path.getsize(args.delta)
+    state.save(args.state)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        state.redistribution.to_csv(os.path.join(args.out, "redistribution.csv"), index=False)
+        with open(os.path.join(args.out, "expiry_log.txt"), "a") as f:
+            f.writelines(log + "\n" for log in result.logs)
+
+    print(json.dumps({"flagged": len(result.flagged), "unflagged": len(result.unflagged),
+                      "new_logs": len(result.logs), "full_refresh": result.full_refresh,
+                      "candidates": len(state.redistribution)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# 🗄️ Columnar Inventory Cache
+# ------------------------------
+# inventory.csv is converted once into one .npy file per column under
+# data/.cache/<csv name>/ and memory-mapped on every later read. meta.json holds
+# the source file's mtime/size; the cache is rebuilt as soon as either changes.
+# Text columns are fixed-width, so missing values are kept in a separate
+# <column>.missing.npy mask rather than folded into empty strings.
+CACHE_VERSION = 2
+
+# missing: column -> bool mask of missing values, only for text columns that have any
+InventoryColumns = namedtuple("InventoryColumns", ["rows", "order", "kinds", "arrays", "categories", "missing"],
+                              defaults=(None,))
+
+_opened = {}  # cache dir -> (source signature, InventoryColumns)
+
+def cache_dir_for(source_path):
+    source_path = os.path.abspath(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(os.path.dirname(source_path), ".cache", stem)
+
+def source_signature(source_path):
+    stat = os.stat(source_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def _column_kind(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    return "str"
+
+def _atomic_save(path, array):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+# ------------------------------
+# 🏗️ Build (one streaming pass over the CSV)
+# ------------------------------
+# Each chunk is written to its own part file as soon as it is parsed, and the parts are
+# copied into the final memory-mapped .npy files once the row count and string widths are
+# known, so building never holds more than one chunk in memory.
+def _chunk_arrays(chunk, order, kinds, lookups):
+    arrays = {}
+    for col in order:
+        values = chunk[col]
+        if kinds[col] == "str":
+            arrays[f"{col}.missing"] = values.isna().to_numpy()
+            arrays[col] = values.fillna("").to_numpy(dtype=str)
+        elif kinds[col] == "datetime":
+            arrays[col] = values.to_numpy(dtype="datetime64[ns]")
+        elif kinds[col] == "category":
+            # Chunks have their own category sets; remap onto one global code table
+            lookup = lookups[col]
+            values = values.astype("category")
+            remap = [lookup.setdefault(v, len(lookup)) for v in values.cat.categories] + [-1]
+            arrays[col] = np.asarray(remap, dtype=np.int32)[values.cat.codes.to_numpy()]
+        else:
+            arrays[col] = values.to_numpy()
+    return arrays
+
+def _merge_parts(path, part_paths, dtype, rows):
+    # Header for the full length, then each part appended: one chunk in memory at a time
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.lib.format.write_array_header_1_0(
+            f, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows,)})
+        for part_path in part_paths:
+            f.write(np.load(part_path).astype(dtype, copy=False).tobytes())
+    os.replace(tmp_path, path)
+
+def write_cache(source_path, chunks):
+    cache_dir = cache_dir_for(source_path)
+    # Taken before reading: if the CSV changes mid-build the next lookup sees a new signature
+    signature = source_signature(source_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    order, kinds, lookups = None, {}, {}
+    parts, dtypes, sizes, missing = {}, {}, [], set()
+    prefix = os.path.join(cache_dir, f"build.{os.getpid()}.{threading.get_ident()}")
+    try:
+        for i, chunk in enumerate(chunks):
+            if order is None:
+                order = list(chunk.columns)
+                kinds = {col: _column_kind(chunk[col]) for col in order}
+                lookups = {col: {} for col in order if kinds[col] == "category"}
+            for name, array in _chunk_arrays(chunk, order, kinds, lookups).items():
+                part_path = f"{prefix}.{name}.{i}.npy"
+                np.save(part_path, array)
+                parts.setdefault(name, []).append(part_path)
+                # Widest string / widest numeric type over all chunks, as np.concatenate would pick
+                dtypes[name] = array.dtype if name not in dtypes else np.result_type(dtypes[name], array.dtype)
+                if name.endswith(".missing") and array.any():
+                    missing.add(name[:-len(".missing")])
+            sizes.append(len(chunk))
+
+        if order is None:
+            return None
+        rows = sum(sizes)
+        missing = [col for col in order if col in missing]
+        for name in order + [f"{col}.missing" for col in missing]:
+            _merge_parts(os.path.join(cache_dir, f"{name}.npy"), parts[name], dtypes[name], rows)
+    finally:
+        for part_path in (p for paths in parts.values() for p in paths):
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": signature,
+        "rows": rows,
+        "order": order,
+        "kinds": kinds,
+        "categories": {col: [str(v) for v in lookup] for col, lookup in lookups.items()},
+        "missing": missing,
+    }
+    tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta, meta_path)
+    return meta
+
+# ------------------------------
+# 📂 Open (memory-mapped)
+# ------------------------------
+def load_columns(source_path):
+    cache_dir = cache_dir_for(source_path)
+    signature = source_signature(source_path)
+    opened = _opened.get(cache_dir)
+    if opened is not None and opened[0] == signature:
+        return opened[1]
+
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION or meta.get("source") != signature:
+        return None
+
+    # Zero-length arrays can't be mapped
+    mmap_mode = "r" if meta["rows"] else None
+    arrays = {col: np.load(os.path.join(cache_dir, f"{col}.npy"), mmap_mode=mmap_mode) for col in meta["order"]}
+    missing = {col: np.load(os.path.join(cache_dir, f"{col}.missing.npy"), mmap_mode=mmap_mode)
+               for col in meta["missing"]}
+    columns = InventoryColumns(meta["rows"], meta["order"], meta["kinds"], arrays, meta["categories"], missing)
+    _opened[cache_dir] = (signature, columns)
+    return columns
+
+def get_columns(source_path, build_chunks):
+    columns = load_columns(source_path)
+    if columns is not None:
+        return columns
+    try:
+        if write_cache(source_path, build_chunks()) is None:
+            return None
+    except OSError:
+        # Read-only data dir etc. — callers fall back to parsing the CSV
+        return None
+    return load_columns(source_path)
+
+# ------------------------------
+# 🧱 Columns → DataFrame
+# ------------------------------
+def frame_from_columns(columns, positions=None):
+    data = {}
+    for col in columns.order:
+        array = columns.arrays[col]
+        values = array[positions] if positions is not None else np.asarray(array)
+        kind = columns.kinds[col]
+        if kind == "str":
+            values = values.astype(object)
+            mask = (columns.missing or {}).get(col)
+            if mask is not None:
+                values[mask[positions] if positions is not None else np.asarray(mask)] = np.nan
+        elif kind == "category":
+            values = pd.Categorical.from_codes(values, categories=columns.categories[col])
+        data[col] = values
+    index = pd.Index(positions) if positions is not None else pd.RangeIndex(columns.rows)
+    return pd.DataFrame(data, index=index)
+
+def columns_from_frame(df):
+    # In-memory InventoryColumns for callers that need the column layout without a cache on disk
+    arrays, kinds, categories, missing = {}, {}, {}, {}
+    for col in df.columns:
+        values = df[col]
+        kinds[col] = _column_kind(values)
+        if kinds[col] == "str":
+            arrays[col] = values.fillna("").to_numpy(dtype=str)
+            if values.isna().any():
+                missing[col] = values.isna().to_numpy()
+        elif kinds[col] == "datetime":
+            arrays[col] = values.to_numpy(dtype="datetime64[ns]")
+        elif kinds[col] == "category":
+            values = values.astype("category")
+            arrays[col] = values.cat.codes.to_numpy().astype(np.int32)
+            categories[col] = [str(v) for v in values.cat.categories]
+        else:
+            arrays[col] = values.to_numpy()
+    return InventoryColumns(len(df), list(df.columns), kinds, arrays, categories, missing)
@@ -0,0 +1,245 @@
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from agents import inventory_cache, perf
+from agents.expiry_index import ExpiryIndex
+
+# ------------------------------
+# 📄 Inventory Schema
+# ------------------------------
+INVENTORY_DTYPES = {
+    "sku_id": "object",
+    "product_name": "object",
+    "location": "category",
+    "category": "category",
+    "stock": "int32",
+    "unit_price": "float64",    # list price in rupees; optional, older files are priced by the agents
+}
+DATE_COLUMNS = ["expiry_date"]
+CATEGORICAL_COLUMNS = ["location", "category"]
+
+DEFAULT_CHUNK_ROWS = 250_000
+MAPPED_SLICE_ROWS = 4_000_000
+MIN_CHUNK_ROWS = 1_000
+DEFAULT_PAGE_ROWS = 100
+# Parser buffers, the typed chunk and its filtered copy live at the same time
+PARSE_OVERHEAD = 4
+
+_expiry_indexes = {}  # abs path -> (InventoryColumns, ExpiryIndex)
+
+InventoryScan = namedtuple("InventoryScan", ["window", "category_summary", "total_rows", "preview"])
+InventoryOverview = namedtuple("InventoryOverview", ["total_rows", "category_summary", "window_rows"])
+
+# ------------------------------
+# 📏 Memory Budget → Chunk Size
+# ------------------------------
+def estimate_row_bytes(path, sample_rows=1_000):
+    sample = pd.read_csv(path, nrows=sample_rows, dtype=INVENTORY_DTYPES, parse_dates=DATE_COLUMNS)
+    if sample.empty:
+        return 1
+    return sample.memory_usage(deep=True).sum() / len(sample)
+
+def chunk_rows_for_budget(path, memory_budget_mb):
+    row_bytes = estimate_row_bytes(path) * PARSE_OVERHEAD
+    return max(MIN_CHUNK_ROWS, int(memory_budget_mb * 1024 ** 2 / row_bytes))
+
+# ------------------------------
+# 🚚 Chunked Reader
+# ------------------------------
+def _iter_csv_chunks(path, chunk_rows):
+    with pd.read_csv(path, dtype=INVENTORY_DTYPES, parse_dates=DATE_COLUMNS, chunksize=chunk_rows) as reader:
+        yield from reader
+
+@perf.timed()
+def inventory_columns(path, use_cache=True, memory_budget_mb=None):
+    # Memory-mapped typed columns, built from the CSV on first use; None means parse the CSV.
+    # The build streams chunk by chunk, sized to memory_budget_mb when one is given.
+    if not use_cache:
+        return None
+    return inventory_cache.get_columns(path, lambda: _iter_csv_chunks(
+        path, chunk_rows_for_budget(path, memory_budget_mb) if memory_budget_mb else DEFAULT_CHUNK_ROWS))
+
+def iter_inventory_chunks(path, chunk_rows=None, memory_budget_mb=None, use_cache=True):
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for_budget(path, memory_budget_mb) if memory_budget_mb else DEFAULT_CHUNK_ROWS
+
+    columns = inventory_columns(path, use_cache, memory_budget_mb)
+    if columns is None:
+        yield from _iter_csv_chunks(path, chunk_rows)
+        return
+    for start in range(0, columns.rows, chunk_rows):
+        yield inventory_cache.frame_from_columns(columns, np.arange(start, min(start + chunk_rows, columns.rows)))
+
+def inventory_expiry_index(path):
+    # Sorted once per cached inventory version; later window queries are searchsorted slices
+    columns = inventory_columns(path)
+    if columns is None:
+        return None
+    key = os.path.abspath(path)
+    cached = _expiry_indexes.get(key)
+    if cached is None or cached[0] is not columns:
+        cached = _expiry_indexes[key] = (columns, ExpiryIndex.from_columns(columns))
+    return cached[1]
+
+def read_inventory(path, use_cache=True):
+    columns = inventory_columns(path, use_cache)
+    if columns is None:
+        return _concat_chunks(list(_iter_csv_chunks(path, DEFAULT_CHUNK_ROWS)), path)
+    return inventory_cache.frame_from_columns(columns)
+
+def _empty_inventory(path):
+    return pd.read_csv(path, nrows=0, dtype=INVENTORY_DTYPES, parse_dates=DATE_COLUMNS)
+
+def _concat_chunks(parts, path):
+    if not parts:
+        return _empty_inventory(path)
+    df = pd.concat(parts)
+    # Chunks carry their own category sets, so concat falls back to object
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+def _expiry_bounds(today, start_days, end_days):
+    today = today if today is not None else pd.to_datetime(datetime.today().date())
+    start = today + timedelta(days=start_days) if start_days is not None else None
+    end = today + timedelta(days=end_days) if end_days is not None else None
+    return start, end
+
+def _window_mask(expiry, start, end):
+    mask = pd.Series(True, index=expiry.index)
+    if start is not None:
+        mask &= expiry >= start
+    if end is not None:
+        mask &= expiry <= end
+    return mask
+
+def _window_frame(path, columns, start, end, memory_budget_mb):
+    # The index holds ~20 bytes per row in memory, so a caller-set budget scans the mapped column instead
+    if memory_budget_mb is None:
+        index = inventory_expiry_index(path)
+        return index.window(start, end, order="source")
+    positions = _window_positions(columns, start, end, _mapped_slice_rows(memory_budget_mb))
+    return inventory_cache.frame_from_columns(columns, positions)
+
+def _window_positions(columns, start, end, slice_rows):
+    # Filter on the mapped expiry column only; rows are materialized afterwards
+    expiry = columns.arrays["expiry_date"]
+    start = np.datetime64(start, "ns") if start is not None else None
+    end = np.datetime64(end, "ns") if end is not None else None
+    hits = []
+    for offset in range(0, columns.rows, slice_rows):
+        block = expiry[offset:offset + slice_rows]
+        mask = np.ones(len(block), dtype=bool)
+        if start is not None:
+            mask &= block >= start
+        if end is not None:
+            mask &= block <= end
+        hits.append(np.flatnonzero(mask) + offset)
+    return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+def _mapped_slice_rows(memory_budget_mb):
+    # datetime64 block plus its boolean mask
+    return max(MIN_CHUNK_ROWS, int(memory_budget_mb * 1024 ** 2 / 9)) if memory_budget_mb else MAPPED_SLICE_ROWS
+
+def _mapped_category_summary(columns):
+    # Shift codes by one so missing categories (-1) land in a bucket that is dropped
+    shifted = np.asarray(columns.arrays["category"]) + 1
+    stock = np.asarray(columns.arrays["stock"])
+    categories = columns.categories["category"]
+    totals = np.bincount(shifted, weights=stock, minlength=len(categories) + 1)[1:]
+    present = np.bincount(shifted, minlength=len(categories) + 1)[1:] > 0
+    return pd.Series(
+        totals[present].astype("int64"), index=pd.Index(np.asarray(categories, dtype=object)[present], name="category"),
+        name="stock",
+    ).sort_index()
+
+# ------------------------------
+# 🔍 Expiry Window + Category Summary in one pass
+# ------------------------------
+@perf.timed()
+def scan_inventory(path, end_days=2, start_days=None, today=None, preview_rows=0,
+                   chunk_rows=None, memory_budget_mb=None, use_cache=True):
+    start, end = _expiry_bounds(today, start_days, end_days)
+
+    columns = inventory_columns(path, use_cache)
+    if columns is not None:
+        return InventoryScan(
+            window=_window_frame(path, columns, start, end, memory_budget_mb),
+            category_summary=_mapped_category_summary(columns),
+            total_rows=columns.rows,
+            preview=inventory_cache.frame_from_columns(columns, np.arange(min(preview_rows, columns.rows))),
+        )
+
+    window_parts, preview_parts = [], []
+    totals = {}
+    total_rows = 0
+
+    for chunk in iter_inventory_chunks(path, chunk_rows, memory_budget_mb, use_cache=False):
+        mask = _window_mask(chunk["expiry_date"], start, end)
+        if mask.any():
+            window_parts.append(chunk[mask])
+
+        for category, stock in chunk.groupby("category", observed=True)["stock"].sum().items():
+            totals[category] = totals.get(category, 0) + int(stock)
+
+        if total_rows < preview_rows:
+            preview_parts.append(chunk.iloc[:preview_rows - total_rows])
+        total_rows += len(chunk)
+
+    category_summary = pd.Series(totals, name="stock", dtype="int64").rename_axis("category").sort_index()
+    return InventoryScan(
+        window=_concat_chunks(window_parts, path),
+        category_summary=category_summary,
+        total_rows=total_rows,
+        preview=_concat_chunks(preview_parts, path),
+    )
+
+@perf.timed()
+def load_expiring_items(path, end_days=2, start_days=None, today=None,
+                        chunk_rows=None, memory_budget_mb=None, use_cache=True):
+    start, end = _expiry_bounds(today, start_days, end_days)
+
+    columns = inventory_columns(path, use_cache, memory_budget_mb)
+    if columns is not None:
+        return _window_frame(path, columns, start, end, memory_budget_mb)
+
+    parts = []
+    for chunk in iter_inventory_chunks(path, chunk_rows, memory_budget_mb, use_cache=False):
+        mask = _window_mask(chunk["expiry_date"], start, end)
+        if mask.any():
+            parts.append(chunk[mask])
+    return _concat_chunks(parts, path)
+
+# ------------------------------
+# 📑 Aggregates and Pages (no full-table materialization)
+# ------------------------------
+@perf.timed()
+def inventory_overview(path, end_days=2, start_days=None, today=None, memory_budget_mb=None):
+    columns = inventory_columns(path)
+    if columns is not None and memory_budget_mb is None:
+        start, end = _expiry_bounds(today, start_days, end_days)
+        return InventoryOverview(columns.rows, _mapped_category_summary(columns),
+                                 inventory_expiry_index(path).count(start, end))
+    scan = scan_inventory(path, end_days, start_days, today, memory_budget_mb=memory_budget_mb)
+    return InventoryOverview(scan.total_rows, scan.category_summary, len(scan.window))
+
+def inventory_page(path, offset=0, limit=DEFAULT_PAGE_ROWS):
+    columns = inventory_columns(path)
+    if columns is None:
+        page = pd.read_csv(path, dtype=INVENTORY_DTYPES, parse_dates=DATE_COLUMNS,
+                           skiprows=range(1, offset + 1), nrows=limit)
+        return page.set_axis(pd.RangeIndex(offset, offset + len(page)))
+    return inventory_cache.frame_from_columns(columns, np.arange(offset, min(offset + limit, columns.rows)))
+
+def expiring_page(path, offset=0, limit=DEFAULT_PAGE_ROWS, end_days=2, start_days=None, today=None):
+    # One page of the expiry window, soonest first
+    index = inventory_expiry_index(path)
+    if index is None:
+        window = load_expiring_items(path, end_days, start_days, today, use_cache=False)
+        return window.sort_values("expiry_date", kind="stable").iloc[offset:offset + limit]
+    start, end = _expiry_bounds(today, start_days, end_days)
+    return index.window(start, end, offset=offset, limit=limit)
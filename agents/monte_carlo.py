@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from agents import perf
+from agents.outreach import MAX_BUYERS_PER_SKU
+
+# ------------------------------
+# 🎲 Monte Carlo Outreach Simulation
+# ------------------------------
+# Each trial replays outreach for every flagged SKU at once: the SKU's top
+# ranked buyers are contacted together, the best-ranked acceptance wins (as in
+# agents/outreach.py); with enforce_capacity a buyer also takes at most
+# `capacity` SKUs per trial, as the assignment solver assumes.
+# Trials run in fixed-size chunks, each with its own child of one SeedSequence,
+# so results depend only on the seed — not on how many processes ran them.
+# Worker processes receive the arrays once, through the pool initializer, and
+# each task carries only (scenario, trials, seed).
+CHUNK_DRAWS = 4_000_000     # uniforms per chunk (trials × SKUs × buyers), bounds memory
+DEFAULT_TRIALS = 10_000
+CONFIDENCE = 0.95
+INTERVAL = (5, 95)          # percentile band reported for each outcome
+
+@dataclass(frozen=True)
+class AcceptanceModel:
+    # P(accept) = channel reply rate × sigmoid(logit(buyer rate) + elasticity × (discount − reference))
+    base_rate: float = 0.3                                  # SimulatedResponder's accept rate
+    buyer_rates: dict = field(default_factory=dict)         # buyer name -> acceptance at the reference discount
+    channel_rates: dict = field(default_factory=dict)       # channel -> chance a reply arrives before the timeout
+    elasticity: float = 4.0                                 # logit change per unit of discount
+    reference_discount: float = 0.3
+    enforce_capacity: bool = False                          # outreach.py itself does not cap buyers
+
+Scenario = namedtuple("Scenario", ["name", "model", "discount_scale"])
+OutreachArrays = namedtuple("OutreachArrays", ["stock", "old_price_paise", "price_paise", "discount",
+                                               "candidates", "buyers"])
+MonteCarloResult = namedtuple("MonteCarloResult", ["trials", "summary"])
+
+OUTCOMES = ["sold", "unsold", "stock_saved", "revenue_paise"]
+
+# ------------------------------
+# 🧱 Inputs
+# ------------------------------
+def prepare_outreach(redistribution_df, buyer_index, max_buyers=MAX_BUYERS_PER_SKU, skip=0):
+    # Redistribution frame -> per-SKU arrays plus an (S, k) matrix of candidate buyer ids (-1 = no buyer);
+    # skip passes over each zone's top buyers, as rerun_retry_logic does for retries
+    buyers, ids, zone_rows = [], {}, {}
+    for zone in redistribution_df["zone"].unique():
+        row = []
+        for buyer in buyer_index.ranked(zone)[skip:skip + max_buyers]:
+            if buyer.name not in ids:
+                ids[buyer.name] = len(buyers)
+                buyers.append(buyer)
+            row.append(ids[buyer.name])
+        zone_rows[zone] = row + [-1] * (max_buyers - len(row))
+    zone_codes, zones = pd.factorize(redistribution_df["zone"])
+    table = np.array([zone_rows[z] for z in zones], dtype=np.int64).reshape(len(zones), max_buyers)
+
+    old = redistribution_df["old_price_paise"].to_numpy(dtype=np.float64)
+    new = redistribution_df["new_price_paise"].to_numpy(dtype=np.int64)
+    return OutreachArrays(
+        stock=redistribution_df["stock"].to_numpy(dtype=np.int64),
+        old_price_paise=old.astype(np.int64),
+        price_paise=new,
+        discount=np.divide(old - new, old, out=np.zeros_like(old), where=old > 0),
+        candidates=table[zone_codes] if len(zone_codes) else np.empty((0, max_buyers), dtype=np.int64),
+        buyers=buyers,
+    )
+
+def acceptance_matrix(arrays, model, discount_scale=1.0):
+    # (S, k) acceptance probabilities; 0 where a SKU has no k-th candidate
+    buyers = arrays.buyers
+    rates = np.array([model.buyer_rates.get(b.name, model.base_rate) for b in buyers] or [model.base_rate])
+    reply = np.array([model.channel_rates.get(b.channel, 1.0) for b in buyers] or [1.0])
+    rates = np.clip(rates, 1e-6, 1 - 1e-6)
+    discount = np.clip(arrays.discount * discount_scale, 0.0, 1.0)
+    ids = np.maximum(arrays.candidates, 0)
+    logit = np.log(rates / (1 - rates))[ids] + model.elasticity * (discount - model.reference_discount)[:, None]
+    p = reply[ids] / (1 + np.exp(-logit))
+    return np.where(arrays.candidates >= 0, p, 0.0), discount
+
+# ------------------------------
+# 🎰 Trials
+# ------------------------------
+def _simulate_chunk(arrays, accept_p, enforce_capacity, n_trials, seed):
+    rng = np.random.Generator(np.random.PCG64(seed))
+    n_skus, k = accept_p.shape
+    accepted = rng.random((n_trials, n_skus, k)) < accept_p
+    # Best-ranked acceptance wins; argmax finds the first True along the buyer axis
+    any_accept = accepted.any(axis=2)
+    rank = accepted.argmax(axis=2)
+    winner = np.where(any_accept, arrays.candidates[np.arange(n_skus), rank], -1)
+
+    if enforce_capacity and arrays.buyers:
+        # Within a trial, SKUs claim a buyer's capacity in frame order; the rest go unsold
+        capacity = np.array([b.capacity for b in arrays.buyers], dtype=np.int64)
+        n_buyers = len(capacity)
+        keys = (np.arange(n_trials)[:, None] * (n_buyers + 1) + winner + 1).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        position = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+        claim = np.empty_like(position)
+        claim[order] = position
+        claim = claim.reshape(winner.shape)
+        any_accept &= (winner < 0) | (claim < capacity[np.maximum(winner, 0)])
+
+    sold = any_accept.sum(axis=1)
+    return np.column_stack([
+        sold,
+        n_skus - sold,
+        any_accept @ arrays.stock,
+        any_accept @ (arrays.price_paise * arrays.stock),
+    ])
+
+_worker = {}  # "arrays" for this worker process, set once by the pool initializer
+
+def _init_worker(arrays):
+    _worker["arrays"] = arrays
+
+def _run_chunk(task, arrays=None):
+    scenario, n_trials, seed = task
+    arrays = arrays if arrays is not None else _worker["arrays"]
+    accept_p, discount = acceptance_matrix(arrays, scenario.model, scenario.discount_scale)
+    if scenario.discount_scale != 1.0:
+        # Scaled discounts reprice the offer off the original price
+        arrays = arrays._replace(price_paise=np.rint(arrays.old_price_paise * (1 - discount)).astype(np.int64))
+    return _simulate_chunk(arrays, accept_p, scenario.model.enforce_capacity, n_trials, seed)
+
+def _chunks(arrays, trials, seed):
+    per_chunk = max(1, CHUNK_DRAWS // max(arrays.candidates.size, 1))
+    sizes = [per_chunk] * (trials // per_chunk) + ([trials % per_chunk] if trials % per_chunk else [])
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+# ------------------------------
+# 📊 Summaries
+# ------------------------------
+def summarize(trials, confidence=CONFIDENCE, interval=INTERVAL):
+    from statistics import NormalDist
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    n = len(trials)
+    summary = {"trials": n}
+    for outcome in OUTCOMES:
+        values = trials[outcome].to_numpy(dtype=np.float64)
+        mean = float(values.mean()) if n else 0.0
+        std = float(values.std(ddof=1)) if n > 1 else 0.0
+        half = z * std / n ** 0.5 if n else 0.0
+        low, median, high = np.percentile(values, [interval[0], 50, interval[1]]).tolist() if n else (0.0, 0.0, 0.0)
+        summary[outcome] = {
+            "mean": round(mean, 3), "std": round(std, 3),
+            "mean_ci": [round(mean - half, 3), round(mean + half, 3)],
+            f"p{interval[0]}": round(low, 3), "p50": round(median, 3), f"p{interval[1]}": round(high, 3),
+        }
+    return summary
+
+# ------------------------------
+# 🚀 Runs and Sweeps
+# ------------------------------
+@perf.timed()
+def sweep(arrays, scenarios, trials=DEFAULT_TRIALS, seed=42, workers=1):
+    # -> {scenario name: MonteCarloResult}; every scenario reuses the same seed (common random numbers)
+    chunks = _chunks(arrays, trials, seed)
+    tasks = [(scenario, n, child) for scenario in scenarios for n, child in chunks]
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init_worker, initargs=(arrays,)) as pool:
+            parts = list(pool.map(_run_chunk, tasks))
+    else:
+        parts = [_run_chunk(task, arrays) for task in tasks]
+
+    results = {}
+    for i, scenario in enumerate(scenarios):
+        block = parts[i * len(chunks):(i + 1) * len(chunks)]
+        frame = pd.DataFrame(np.vstack(block) if block else np.empty((0, len(OUTCOMES)), dtype=np.int64),
+                             columns=OUTCOMES)
+        results[scenario.name] = MonteCarloResult(frame, summarize(frame))
+    return results
+
+def simulate_outreach(redistribution_df, buyer_index, model=None, trials=DEFAULT_TRIALS, seed=42, workers=1):
+    arrays = prepare_outreach(redistribution_df, buyer_index)
+    return sweep(arrays, [Scenario("base", model or AcceptanceModel(), 1.0)], trials, seed, workers)["base"]
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.monte_carlo --inventory data/inventory.csv --trials 20000 --elasticity 0,2,4,6 --workers 4
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.monte_carlo",
+                                     description="Distribution of outreach outcomes over many simulated trials.")
+    parser.add_argument("--inventory", required=True)
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--base-rate", type=float, default=AcceptanceModel.base_rate)
+    parser.add_argument("--elasticity", default=str(AcceptanceModel.elasticity),
+                        help="comma-separated values; more than one runs a sweep")
+    parser.add_argument("--discount-scale", default="1.0", help="comma-separated multipliers on today's discounts")
+    parser.add_argument("--channel-rates", default="{}", help='JSON, e.g. {"Email": 0.6}')
+    args = parser.parse_args(argv)
+
+    from agents.expiry_agent import buyer_index, run_redistribution
+    df, _ = run_redistribution(args.inventory)
+    arrays = prepare_outreach(df, buyer_index) if not df.empty else None
+    if arrays is None:
+        print(json.dumps({"skus": 0}))
+        return 0
+
+    base = AcceptanceModel(base_rate=args.base_rate, channel_rates=json.loads(args.channel_rates))
+    scenarios = [
+        Scenario(f"elasticity={e:g},discount_x{s:g}", replace(base, elasticity=e), s)
+        for e in map(float, args.elasticity.split(",")) for s in map(float, args.discount_scale.split(","))
+    ]
+    results = sweep(arrays, scenarios, args.trials, args.seed, args.workers)
+    print(json.dumps({"skus": len(df), "buyers": len(arrays.buyers),
+                      "scenarios": {name: r.summary for name, r in results.items()}}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+import time
+from collections import defaultdict, namedtuple
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from agents import perf
+from agents.outreach import MAX_BUYERS_PER_SKU
+
+# ------------------------------
+# 📨 Notification Gateway Settings
+# ------------------------------
+# Offers are coalesced per buyer into digest messages, digests are grouped
+# into one API call per batch, and each channel keeps a small pool of
+# keep-alive connections behind a token-bucket rate limit. Limits are in
+# messages (digests) per second, the unit the providers meter.
+CHANNEL_RATE_LIMITS = {"WhatsApp": 80, "Email": 200, "SMS": 100, "Slack": 50}
+CHANNEL_BATCH_SIZES = {"WhatsApp": 50, "Email": 100, "SMS": 100, "Slack": 20}
+DEFAULT_RATE_LIMIT = 50
+DEFAULT_BATCH_SIZE = 20
+POOL_SIZE = 4                   # keep-alive connections per channel
+DIGEST_MAX_OFFERS = 50          # a buyer with more offers gets several digests
+MAX_ATTEMPTS = 4                # per batch, for errors and 5xx answers
+MAX_THROTTLED = 20              # per batch, for 429 answers (throttling is not a failure)
+RETRY_BASE_S = 0.05
+REQUEST_TIMEOUT_S = 10.0
+SEND_PATH = "/send"
+
+Digest = namedtuple("Digest", ["buyer", "channel", "offers"])
+
+# ------------------------------
+# 🧾 Digests
+# ------------------------------
+def build_digests(offers, buyers_for, max_buyers=MAX_BUYERS_PER_SKU, max_offers=DIGEST_MAX_OFFERS):
+    # One entry per (buyer, up to max_offers offers) instead of one message per (buyer, offer)
+    by_buyer, buyers = defaultdict(list), {}
+    for offer in offers:
+        for buyer in list(buyers_for(offer))[:max_buyers]:
+            by_buyer[buyer.name].append(offer)
+            buyers[buyer.name] = buyer
+    return [
+        Digest(buyers[name], buyers[name].channel, queued[start:start + max_offers])
+        for name, queued in by_buyer.items()
+        for start in range(0, len(queued), max_offers)
+    ]
+
+def digest_payload(digest):
+    zones = sorted({o.zone for o in digest.offers})
+    return {
+        "to": digest.buyer.name,
+        "subject": f"{len(digest.offers)} discounted near-expiry SKUs in {', '.join(zones)}",
+        "offers": [
+            {"sku_id": o.sku_id, "product": o.product, "expiry": o.expiry.isoformat(), "zone": o.zone,
+             "price_paise": o.new_price_paise, "stock": o.stock}
+            for o in digest.offers
+        ],
+    }
+
+# ------------------------------
+# 🪣 Rate Limit
+# ------------------------------
+class TokenBucket:
+    # rate tokens/s, up to one second's worth banked; a request larger than the bank waits it out
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.capacity = max(float(rate), 1.0)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= n
+            if self._tokens < 0:
+                await asyncio.sleep(-self._tokens / self.rate)
+
+    def pause(self, seconds):
+        # A 429 holds back every sender on the channel, not just the one that was refused
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+# ------------------------------
+# 🔌 Keep-Alive Connection Pool
+# ------------------------------
+# Just enough HTTP/1.1 for JSON APIs that answer with a Content-Length
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    async def post(self, host, path, body, headers):
+        head = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        self.writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n{head}\r\n".encode() + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        length, keep_alive, retry_after = 0, True, None
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value.lower() != "close"
+            elif name == "retry-after":
+                retry_after = float(value)
+        payload = await self.reader.readexactly(length)
+        return status, payload, keep_alive, retry_after
+
+    def close(self):
+        self.writer.close()
+
+class _ChannelPool:
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.path = parts.path or SEND_PATH
+        self.size = size
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def post(self, body, headers):
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+                conn = _Connection(reader, writer)
+                self.opened += 1
+            try:
+                status, payload, keep_alive, retry_after = await conn.post(self.host, self.path, body, headers)
+            except BaseException:
+                conn.close()
+                raise
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn.close()
+            return status, payload, retry_after
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+# ------------------------------
+# 📊 Delivery Metrics
+# ------------------------------
+@dataclass(slots=True)
+class DeliveryMetrics:
+    channel: str
+    messages: int = 0           # digests delivered
+    offers: int = 0             # offers inside delivered digests
+    failed: int = 0             # digests given up on after MAX_ATTEMPTS
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0          # 429 answers
+    bytes_sent: int = 0
+    connections_opened: int = 0
+    latencies_s: list = field(default_factory=list)
+    started: float = 0.0
+    finished: float = 0.0
+
+    def as_dict(self):
+        wall = max(self.finished - self.started, 1e-9)
+        lat = np.array(self.latencies_s) if self.latencies_s else np.zeros(1)
+        return {
+            "channel": self.channel, "messages": self.messages, "offers": self.offers, "failed": self.failed,
+            "requests": self.requests, "retries": self.retries, "throttled": self.throttled,
+            "bytes_sent": self.bytes_sent, "connections_opened": self.connections_opened,
+            "wall_s": round(wall, 4), "messages_per_s": round(self.messages / wall, 1),
+            "p50_ms": round(float(np.percentile(lat, 50)) * 1000, 2),
+            "p95_ms": round(float(np.percentile(lat, 95)) * 1000, 2),
+        }
+
+# ------------------------------
+# 🚀 Gateway
+# ------------------------------
+class NotificationGateway:
+    # endpoints: channel -> URL receiving {"messages": [...]} batches
+    def __init__(self, endpoints, rate_limits=None, batch_sizes=None, pool_size=POOL_SIZE, headers=None):
+        self.endpoints = dict(endpoints)
+        self.rate_limits = {**CHANNEL_RATE_LIMITS, **(rate_limits or {})}
+        self.batch_sizes = {**CHANNEL_BATCH_SIZES, **(batch_sizes or {})}
+        self.pool_size = pool_size
+        self.headers = {"Connection": "keep-alive", **(headers or {})}
+        self.metrics = {}
+
+    async def _send_batch(self, pool, bucket, batch, metrics):
+        body = json.dumps({"messages": [digest_payload(d) for d in batch]}).encode()
+        errors = throttled = 0
+        while errors < MAX_ATTEMPTS and throttled < MAX_THROTTLED:
+            await bucket.acquire(len(batch))
+            started = time.perf_counter()
+            metrics.requests += 1
+            metrics.bytes_sent += len(body)
+            try:
+                status, _, retry_after = await asyncio.wait_for(pool.post(body, self.headers), REQUEST_TIMEOUT_S)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+                status, retry_after = None, None
+            metrics.latencies_s.append(time.perf_counter() - started)
+            if status is not None and 200 <= status < 300:
+                metrics.messages += len(batch)
+                metrics.offers += sum(len(d.offers) for d in batch)
+                return
+            if status == 429:
+                throttled += 1
+                metrics.throttled += 1
+                bucket.pause(retry_after if retry_after is not None else RETRY_BASE_S * 2 ** min(throttled, 6))
+            else:
+                errors += 1
+                if errors < MAX_ATTEMPTS:
+                    await asyncio.sleep(RETRY_BASE_S * 2 ** errors)
+            if errors < MAX_ATTEMPTS and throttled < MAX_THROTTLED:
+                metrics.retries += 1
+        metrics.failed += len(batch)
+
+    async def _send_channel(self, channel, digests):
+        metrics = self.metrics[channel] = DeliveryMetrics(channel, started=time.perf_counter())
+        url = self.endpoints.get(channel)
+        if url is None:
+            metrics.failed = len(digests)
+            metrics.finished = time.perf_counter()
+            return
+        pool = _ChannelPool(url, self.pool_size)
+        bucket = TokenBucket(self.rate_limits.get(channel, DEFAULT_RATE_LIMIT))
+        size = self.batch_sizes.get(channel, DEFAULT_BATCH_SIZE)
+        batches = [digests[i:i + size] for i in range(0, len(digests), size)]
+        queue = asyncio.Queue()
+        for batch in batches:
+            queue.put_nowait(batch)
+
+        async def worker():
+            while not queue.empty():
+                await self._send_batch(pool, bucket, queue.get_nowait(), metrics)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.pool_size, len(batches)))))
+        finally:
+            pool.close()
+            metrics.connections_opened = pool.opened
+            metrics.finished = time.perf_counter()
+
+    async def send_async(self, digests):
+        by_channel = defaultdict(list)
+        for digest in digests:
+            by_channel[digest.channel].append(digest)
+        await asyncio.gather(*(self._send_channel(c, d) for c, d in by_channel.items()))
+        return self.report()
+
+    @perf.timed("notification_gateway_send")
+    def send(self, digests):
+        # Blocking wrapper, like outreach.run_outreach
+        return asyncio.run(self.send_async(digests))
+
+    def report(self):
+        return {channel: m.as_dict() for channel, m in self.metrics.items()}
+
+def notify_offers(offers, buyers_for, gateway, max_buyers=MAX_BUYERS_PER_SKU):
+    # Offers -> per-buyer digests -> batched sends; returns per-channel delivery metrics
+    return gateway.send(build_digests(offers, buyers_for, max_buyers))
+
+# ------------------------------
+# 🧪 Local Channel Stubs
+# ------------------------------
+# One keep-alive HTTP server per channel: POST /send counts the batch's messages
+# (answering 429 with Retry-After when a server-side limit is exceeded), GET /stats
+# reports the totals. For offline load tests; nothing leaves the machine.
+class _StubState:
+    def __init__(self, rate_limit, latency_s):
+        self.bucket_rate = rate_limit
+        self.tokens = float(rate_limit or 0)
+        self.stamp = time.monotonic()
+        self.latency_s = latency_s
+        self.messages = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def admit(self, n):
+        if not self.bucket_rate:
+            return True
+        now = time.monotonic()
+        # Allow a little burst on top of the client's own bucket so clock skew isn't punished
+        self.tokens = min(self.bucket_rate * 1.5, self.tokens + (now - self.stamp) * self.bucket_rate)
+        self.stamp = now
+        if self.tokens < n:
+            return False
+        self.tokens -= n
+        return True
+
+def _response(status, payload, extra=""):
+    body = json.dumps(payload).encode()
+    reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}.get(status, "OK")
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n{extra}\r\n").encode() + body
+
+def _stub_handler(state):
+    async def handle(reader, writer):
+        try:
+            while request_line := await reader.readline():
+                method, path = request_line.decode("latin-1").split()[:2]
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+                if method == "GET" and path == "/stats":
+                    writer.write(_response(200, {"messages": state.messages, "requests": state.requests,
+                                                 "throttled": state.throttled}))
+                elif method == "POST":
+                    n = len(json.loads(body)["messages"])
+                    state.requests += 1
+                    if state.latency_s:
+                        await asyncio.sleep(state.latency_s)
+                    if state.admit(n):
+                        state.messages += n
+                        writer.write(_response(200, {"accepted": n}))
+                    else:
+                        state.throttled += 1
+                        writer.write(_response(429, {"error": "rate limited"},
+                                               f"Retry-After: {n / state.bucket_rate:.3f}\r\n"))
+                else:
+                    writer.write(_response(404, {"error": "not found"}))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+async def start_stub_servers(channels, host="127.0.0.1", rate_limits=None, latency_s=0.0, ports=None):
+    # -> ({channel: send URL}, [servers]); port 0 picks a free port
+    endpoints, servers = {}, []
+    for i, channel in enumerate(channels):
+        state = _StubState((rate_limits or {}).get(channel), latency_s)
+        server = await asyncio.start_server(_stub_handler(state), host, (ports or {}).get(channel, 0))
+        servers.append(server)
+        endpoints[channel] = f"http://{host}:{server.sockets[0].getsockname()[1]}{SEND_PATH}"
+    return endpoints, servers
+
+def run_stub_servers(channels, host="127.0.0.1", rate_limits=None, latency_s=0.0, ports=None, on_ready=None):
+    # Blocking: serve until cancelled; on_ready(endpoints) fires once every port is bound
+    async def serve():
+        endpoints, servers = await start_stub_servers(channels, host, rate_limits, latency_s, ports)
+        if on_ready:
+            on_ready(endpoints)
+        await asyncio.gather(*(s.serve_forever() for s in servers))
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.notifications --port-base 8701          (one stub per channel, 8701..8704)
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.notifications",
+                                     description="Serve local HTTP stubs for each outreach channel.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port-base", type=int, default=0, help="first port; 0 picks free ports")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added per request")
+    parser.add_argument("--enforce-limits", action="store_true", help="answer 429 above CHANNEL_RATE_LIMITS")
+    args = parser.parse_args(argv)
+
+    channels = list(CHANNEL_RATE_LIMITS)
+    ports = {c: args.port_base + i for i, c in enumerate(channels)} if args.port_base else None
+    run_stub_servers(channels, args.host, CHANNEL_RATE_LIMITS if args.enforce_limits else None,
+                     args.latency_ms / 1000, ports,
+                     on_ready=lambda endpoints: print(json.dumps(endpoints), flush=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import asyncio
+import random
+
+from agents import perf
+from agents.records import Outcome
+
+# ------------------------------
+# 📡 Outreach Settings
+# ------------------------------
+# Offers in flight per channel at any moment
+CHANNEL_LIMITS = {"WhatsApp": 20, "Email": 50, "SMS": 20, "Slack": 10}
+DEFAULT_CHANNEL_LIMIT = 10
+OFFER_TIMEOUT_S = 5.0
+MAX_BUYERS_PER_SKU = 3
+
+# ------------------------------
+# 🧪 Local Buyer Stub
+# ------------------------------
+class SimulatedResponder:
+    # Stands in for a real buyer: replies after a random delay and accepts with a fixed probability.
+    # Any async callable (Buyer, Offer) -> bool can be passed to the dispatcher instead.
+    def __init__(self, accept_rate=0.3, delay_range=(0.8, 1.8), seed=None):
+        self.accept_rate = accept_rate
+        self.delay_range = delay_range
+        self._rng = random.Random(seed)
+
+    async def __call__(self, buyer, offer):
+        await asyncio.sleep(self._rng.uniform(*self.delay_range))
+        return self._rng.random() < self.accept_rate
+
+# ------------------------------
+# 📨 Per-SKU Outreach (first acceptance wins)
+# ------------------------------
+async def _send_offer(buyer, offer, responder, semaphores, timeout):
+    async with semaphores[buyer.channel]:
+        return await asyncio.wait_for(responder(buyer, offer), timeout)
+
+async def _outreach_sku(offer, buyers, responder, semaphores, timeout):
+    tasks = {
+        asyncio.create_task(_send_offer(buyer, offer, responder, semaphores, timeout)): rank
+        for rank, buyer in enumerate(buyers)
+    }
+    statuses = ["pending"] * len(buyers)
+    accepted_rank = None
+    pending = set(tasks)
+
+    while pending and accepted_rank is None:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            rank = tasks[task]
+            try:
+                statuses[rank] = "accepted" if task.result() else "declined"
+            except asyncio.TimeoutError:
+                statuses[rank] = "timeout"
+            except Exception:
+                statuses[rank] = "error"
+        # Several replies can land together; the best-ranked acceptance wins
+        accepted = [tasks[t] for t in done if statuses[tasks[t]] == "accepted"]
+        if accepted:
+            accepted_rank = min(accepted)
+            for rank in accepted:
+                if rank != accepted_rank:
+                    statuses[rank] = "superseded"
+
+    for task in pending:
+        task.cancel()
+        statuses[tasks[task]] = "cancelled"
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return Outcome(
+        offer,
+        buyers[accepted_rank] if accepted_rank is not None else None,
+        list(zip(buyers, statuses)),
+    )
+
+# ------------------------------
+# 🚀 Dispatcher
+# ------------------------------
+async def dispatch_offers(offers, buyers_for, responder=None, channel_limits=None,
+                          timeout=OFFER_TIMEOUT_S, max_buyers=MAX_BUYERS_PER_SKU):
+    # Async generator: yields one outcome per offer in completion order
+    responder = responder or SimulatedResponder()
+    limits = {**CHANNEL_LIMITS, **(channel_limits or {})}
+    semaphores = _ChannelSemaphores(limits)
+
+    tasks = [
+        asyncio.create_task(_outreach_sku(offer, list(buyers_for(offer))[:max_buyers], responder, semaphores, timeout))
+        for offer in offers
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@perf.timed()
+def run_outreach(offers, buyers_for, on_result=None, **kwargs):
+    # Blocking wrapper for Streamlit/CLI callers; on_result fires as each SKU settles
+    async def _collect():
+        outcomes = []
+        async for outcome in dispatch_offers(offers, buyers_for, **kwargs):
+            outcomes.append(outcome)
+            if on_result:
+                on_result(outcome)
+        return outcomes
+
+    return asyncio.run(_collect())
+
+class _ChannelSemaphores(dict):
+    def __init__(self, limits):
+        super().__init__()
+        self._limits = limits
+
+    def __missing__(self, channel):
+        semaphore = self[channel] = asyncio.Semaphore(self._limits.get(channel, DEFAULT_CHANNEL_LIMIT))
+        return semaphore
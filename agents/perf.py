@@ -0,0 +1,280 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# ------------------------------
+# ⏱️ Hot-Path Instrumentation
+# ------------------------------
+# Functions marked @timed and blocks wrapped in span() are timed only while
+# instrumentation is on; when it is off a call costs one flag check. Spans
+# nest per thread and are aggregated by path ("page/run_redistribution/
+# rank_buyers_for_sku") inside a run. Only run() publishes: spans opened with
+# no run active go into a per-thread aggregate (see unscoped_spans) that is
+# never profiled or written out. Finished runs are appended as JSON lines to
+# PERF_LOG_PATH and kept in memory for the Performance page.
+#
+# ECOTWIN_PERF=1 turns timers on; ECOTWIN_PERF=cprofile or =sampling also
+# profiles every run.
+PERF_LOG_PATH = "data/.cache/perf_runs.jsonl"
+PROFILE_MODES = ("cprofile", "sampling")
+SAMPLE_INTERVAL_S = 0.005
+PROFILE_TOP = 25
+RECENT_RUNS = 200
+UNSCOPED_LABEL = "unscoped"
+
+class _State:
+    enabled = False
+    profile = None          # None, "cprofile" or "sampling"
+    log_path = PERF_LOG_PATH
+
+_state = _State()
+_local = threading.local()  # .run: the active run on this thread; .unscoped: spans outside any run
+_recent = deque(maxlen=RECENT_RUNS)
+_log_lock = threading.Lock()
+
+_UNSET = object()
+
+def configure(enabled=None, profile=_UNSET, log_path=None):
+    if profile is not _UNSET:
+        if profile not in (None,) + PROFILE_MODES:
+            raise ValueError(f"profile must be one of {PROFILE_MODES} or None")
+        _state.profile = profile
+    if enabled is not None:
+        _state.enabled = enabled
+    if log_path is not None:
+        _state.log_path = log_path
+
+def configure_from_env(value=None):
+    value = (value if value is not None else os.environ.get("ECOTWIN_PERF", "")).strip().lower()
+    if value in ("", "0", "off", "false"):
+        configure(enabled=False)
+    else:
+        configure(enabled=True, profile=value if value in PROFILE_MODES else None)
+
+def enabled():
+    return _state.enabled
+
+def profile_mode():
+    return _state.profile
+
+# ------------------------------
+# 🔬 Profilers (one per run, opt-in)
+# ------------------------------
+class _CProfiler:
+    def __init__(self):
+        import cProfile
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        import pstats
+        self._profile.disable()
+        stats = pstats.Stats(self._profile).stats
+        top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+        return {"mode": "cprofile", "top": [
+            {"function": f"{os.path.basename(file)}:{line}({name})", "calls": calls,
+             "self_s": round(self_s, 6), "total_s": round(total_s, 6)}
+            for (file, line, name), (_, calls, self_s, total_s, _) in top
+        ]}
+
+class _Sampler:
+    # Samples the run's thread from a helper thread; self = leaf frame, total = anywhere on the stack
+    def __init__(self, interval_s=SAMPLE_INTERVAL_S):
+        self._interval_s = interval_s
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._self, self._total = Counter(), Counter()
+        self._samples = 0
+        self._thread = threading.Thread(target=self._loop, name="perf-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self._interval_s):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self._samples += 1
+            seen = set()
+            leaf = True
+            while frame is not None:
+                code = frame.f_code
+                key = f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+                if leaf:
+                    self._self[key] += 1
+                    leaf = False
+                if key not in seen:
+                    seen.add(key)
+                    self._total[key] += 1
+                frame = frame.f_back
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return {"mode": "sampling", "interval_s": self._interval_s, "samples": self._samples, "top": [
+            {"function": key, "self": self._self[key], "total": total}
+            for key, total in self._total.most_common(PROFILE_TOP)
+        ]}
+
+# ------------------------------
+# 📏 Runs and Spans
+# ------------------------------
+class Run:
+    def __init__(self, label, profile=None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.spans = {}       # path -> [calls, total_s, max_s]
+        self.stack = [label]
+        self._started = time.perf_counter()
+        self._profiler = None
+        self._profile_error = None
+        if profile:
+            try:
+                self._profiler = _CProfiler() if profile == "cprofile" else _Sampler()
+                self._profiler.start()
+            except ValueError as exc:
+                # Only one cProfile can be active per process on newer Pythons
+                self._profiler, self._profile_error = None, {"mode": profile, "skipped": str(exc)}
+
+    def record(self, path, elapsed):
+        entry = self.spans.get(path)
+        if entry is None:
+            self.spans[path] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def finish(self):
+        report = {
+            "run_id": self.run_id, "label": self.label, "started_at": self.started_at,
+            "wall_s": round(time.perf_counter() - self._started, 6),
+            "spans": [{"path": path, "calls": calls, "total_s": round(total, 6), "max_s": round(longest, 6)}
+                      for path, (calls, total, longest) in self.spans.items()],
+        }
+        if self._profiler is not None:
+            report["profile"] = self._profiler.stop()
+        elif self._profile_error is not None:
+            report["profile"] = self._profile_error
+        return report
+
+@contextmanager
+def _run_scope(label):
+    run = _local.run = Run(label, _state.profile)
+    try:
+        yield run
+    finally:
+        _local.run = None
+        _publish(run.finish())
+
+def run(label):
+    # Groups everything below it into one report (a Streamlit page render, a CLI invocation)
+    if not _state.enabled or getattr(_local, "run", None) is not None:
+        return nullcontext()
+    return _run_scope(label)
+
+def _unscoped():
+    aggregate = getattr(_local, "unscoped", None)
+    if aggregate is None:
+        aggregate = _local.unscoped = Run(UNSCOPED_LABEL)
+    return aggregate
+
+def unscoped_spans():
+    # This thread's spans recorded outside any run, shaped like a report's "spans"
+    aggregate = getattr(_local, "unscoped", None)
+    return aggregate.finish()["spans"] if aggregate is not None else []
+
+@contextmanager
+def _span_scope(name):
+    current = getattr(_local, "run", None) or _unscoped()
+    current.stack.append(name)
+    path = "/".join(current.stack)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.record(path, time.perf_counter() - started)
+        current.stack.pop()
+
+def span(name):
+    if not _state.enabled:
+        return nullcontext()
+    return _span_scope(name)
+
+def timed(name=None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with _span_scope(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ------------------------------
+# 💾 Reports
+# ------------------------------
+def _publish(report):
+    _recent.append(report)
+    path = _state.log_path
+    if not path:
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _log_lock, open(path, "a") as f:
+            f.write(json.dumps(report) + "\n")
+    except OSError:
+        pass  # read-only data dir: reports stay in memory
+
+def recent_runs():
+    return list(_recent)
+
+def load_runs(path=None, limit=RECENT_RUNS):
+    # Latest `limit` runs from the JSONL log, oldest first; falls back to this process's runs
+    path = path or _state.log_path
+    try:
+        with open(path) as f:
+            lines = deque(f, maxlen=limit)
+    except OSError:
+        return recent_runs()[-limit:]
+    runs = []
+    for line in lines:
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            continue  # a line cut short by a concurrent writer
+    return runs
+
+def span_percentiles(runs, percentiles=(50, 95)):
+    # path -> {"runs": n, "p50_s": ..., "p95_s": ...} over each run's total time in that span
+    import numpy as np
+
+    totals = {}
+    for report in runs:
+        totals.setdefault(report["label"], []).append(report["wall_s"])
+        for entry in report["spans"]:
+            totals.setdefault(entry["path"], []).append(entry["total_s"])
+    summary = {}
+    for path, values in totals.items():
+        values = np.asarray(values)
+        summary[path] = {"runs": len(values), **{f"p{p}_s": round(float(np.percentile(values, p)), 6)
+                                                 for p in percentiles}}
+    return summary
+
+configure_from_env()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from agents import perf
+
+# ------------------------------
+# 🏷️ Markdown Price Optimizer
+# ------------------------------
+# Each SKU's discount maximizes expected recovered value per unit:
+#   P(accept | d) × (price × (1 − d) − handling) + (1 − P(accept | d)) × residual(days_left) × price
+# P follows the category's logistic acceptance curve (as in monte_carlo.AcceptanceModel) and
+# residual is what the lot can still fetch if nobody takes it now: it shrinks to nothing as
+# expiry nears, which is what pushes discounts deeper at 1–2 days left. The grid is swept
+# one level at a time over all SKUs at once, keeping the best level per SKU, so memory
+# stays O(SKUs) and a million SKUs reprice in well under a second.
+DISCOUNT_GRID = np.round(np.arange(0.05, 0.90 + 1e-9, 0.05), 2)
+MAX_DISCOUNT = 0.90             # the UI's historical retry cap
+
+# category -> (acceptance at the reference discount, elasticity: logit change per unit of discount)
+CATEGORY_CURVES = {
+    "Bakery": (0.30, 5.0),
+    "Dairy": (0.30, 4.5),
+    "Fruit": (0.25, 5.5),
+    "Meat and Seafood": (0.20, 4.0),
+    "Beverage": (0.35, 3.0),
+    "Snack": (0.35, 3.0),
+    "Condiment": (0.40, 2.5),
+}
+DEFAULT_CURVE = (0.30, 4.0)     # monte_carlo.AcceptanceModel's defaults
+
+@dataclass(frozen=True)
+class PricingModel:
+    curves: dict = field(default_factory=lambda: dict(CATEGORY_CURVES))
+    default_curve: tuple = DEFAULT_CURVE
+    reference_discount: float = 0.3
+    handling_paise: int = 500                  # per-unit pickup/delivery cost of a routed deal
+    residual_per_day: float = 0.12             # share of list price still recoverable per extra day on the shelf
+    max_residual: float = 0.6
+    retry_logit_penalty: float = 0.5           # each declined round makes the next buyer less likely to bite
+    grid: np.ndarray = field(default_factory=lambda: DISCOUNT_GRID.copy())
+
+MarkdownPlan = namedtuple("MarkdownPlan", ["discount", "new_price_paise", "accept_p", "expected_paise"])
+
+# ------------------------------
+# 💰 List Prices
+# ------------------------------
+def list_prices(items, fallback):
+    # Rupee list prices: the inventory's unit_price where present, fallback(items) for the rest
+    if "unit_price" in items:
+        prices = items["unit_price"].to_numpy(dtype=np.float64)
+        missing = np.isnan(prices)
+        if not missing.any():
+            return prices
+        prices = prices.copy()
+        prices[missing] = np.asarray(fallback(items[missing]), dtype=np.float64)
+        return prices
+    return np.asarray(fallback(items), dtype=np.float64)
+
+# ------------------------------
+# 🧮 Grid Search
+# ------------------------------
+def _curve_arrays(categories, model, n):
+    if categories is None:
+        return np.full(n, model.default_curve[0]), np.full(n, model.default_curve[1])
+    # Inventory categories are categorical, so their codes are reused rather than re-hashed
+    if isinstance(getattr(categories, "dtype", None), pd.CategoricalDtype):
+        codes, uniques = np.asarray(categories.cat.codes if hasattr(categories, "cat") else categories.codes), \
+            categories.dtype.categories
+    else:
+        codes, uniques = pd.factorize(np.asarray(categories, dtype=object))
+    # One extra row for missing categories (code -1)
+    table = np.array([model.curves.get(c, model.default_curve) for c in uniques] + [model.default_curve],
+                     dtype=np.float64).reshape(-1, 2)
+    return table[codes, 0], table[codes, 1]
+
+@perf.timed()
+def optimize_markdowns(prices_paise, days_left, categories=None, model=None, min_discount=None, attempts=0):
+    # Arrays over SKUs -> MarkdownPlan; min_discount (scalar or per SKU) forbids cheaper offers than already tried
+    model = model or PricingModel()
+    price = np.asarray(prices_paise, dtype=np.float64)
+    if not np.isfinite(price).all():
+        raise ValueError("prices_paise must be finite; fill missing list prices first (see list_prices)")
+    n = len(price)
+    base, elasticity = _curve_arrays(categories, model, n)
+    base = np.clip(base, 1e-6, 1 - 1e-6)
+    intercept = np.log(base / (1 - base)) - elasticity * model.reference_discount \
+        - model.retry_logit_penalty * np.asarray(attempts, dtype=np.float64)
+    residual = np.clip(model.residual_per_day * (np.asarray(days_left, dtype=np.float64) - 1), 0.0, model.max_residual)
+    fallback_value = residual * price
+    floor = None if min_discount is None else np.broadcast_to(np.asarray(min_discount, dtype=np.float64), (n,))
+
+    # The fallback term is the same at every level, so the sweep ranks P × (margin at d − fallback);
+    # float32 scratch buffers halve the memory traffic of the 18 passes
+    margin0 = (price - model.handling_paise - fallback_value).astype(np.float32)
+    neg_intercept, neg_elasticity = (-intercept).astype(np.float32), (-elasticity).astype(np.float32)
+    price32 = price.astype(np.float32)
+    best_gain = np.full(n, -np.inf, dtype=np.float32)
+    best = np.full(n, model.grid[-1])
+    inv_p, gain = np.empty(n, dtype=np.float32), np.empty(n, dtype=np.float32)
+    better = np.empty(n, dtype=bool)
+    for d in model.grid:
+        # 1 / P(accept) = 1 + exp(−(intercept + elasticity × d))
+        np.multiply(neg_elasticity, np.float32(d), out=inv_p)
+        inv_p += neg_intercept
+        np.exp(inv_p, out=inv_p)
+        inv_p += 1
+        np.multiply(price32, np.float32(-d), out=gain)
+        gain += margin0
+        np.divide(gain, inv_p, out=gain)
+        if floor is not None:
+            gain[d < floor - 1e-9] = -np.inf
+        np.greater(gain, best_gain, out=better)
+        np.copyto(best_gain, gain, where=better)
+        np.copyto(best, d, where=better)
+
+    # Nothing on the grid is allowed (floor above the cap) or every level scored NaN: offer at the cap
+    capped = ~np.isfinite(best_gain)
+    if capped.any():
+        cap = model.grid[-1] if floor is None else np.maximum(floor[capped], model.grid[-1])
+        best[capped] = np.clip(cap, None, MAX_DISCOUNT)
+    best_p = 1 / (1 + np.exp(-(intercept + elasticity * best)))
+    expected = best_p * (price * (1 - best) - model.handling_paise - fallback_value) + fallback_value
+    return MarkdownPlan(best, np.rint(price * (1 - best)).astype(np.int64), best_p, expected)
+
+def optimal_markdown(days_left, prices_paise, categories=None):
+    # markdown hook for expiry_agent.build_redistribution_frame
+    return optimize_markdowns(prices_paise, days_left, categories).discount
+
+def reprice_offers(offers, today, categories=None, model=None):
+    # Retry round: every unsold offer gets a fresh optimum no cheaper than the one that was declined
+    if not offers:
+        return []
+    old = np.array([o.old_price_paise for o in offers], dtype=np.int64)
+    days_left = np.array([(o.expiry - today).days for o in offers])
+    tried = np.array([1 - o.new_price_paise / o.old_price_paise if o.old_price_paise else 0.0 for o in offers])
+    # Paise rounding leaves a declined grid discount up to half a paise off its level; snap it back
+    # so the floor lands on the next level instead of skipping one
+    grid = (model or PricingModel()).grid
+    nearest = grid[np.abs(grid - tried[:, None]).argmin(axis=1)]
+    tried = np.where(np.abs(nearest - tried) <= 0.5 / np.maximum(old, 1) + 1e-12, nearest, tried)
+    cats = [categories.get(o.sku_id) for o in offers] if categories else None
+    plan = optimize_markdowns(old, days_left, cats, model, min_discount=tried + 0.05, attempts=1)
+    for offer, new_paise in zip(offers, plan.new_price_paise.tolist()):
+        offer.new_price_paise = new_paise
+    return plan
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+# python -m agents.pricing --inventory data/inventory.csv
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.pricing",
+                                     description="Optimal markdowns for every SKU in an inventory file (JSON summary).")
+    parser.add_argument("--inventory", required=True)
+    parser.add_argument("--today", help="YYYY-MM-DD (default today)")
+    args = parser.parse_args(argv)
+
+    from agents.incremental import sku_prices
+    from agents.inventory_io import read_inventory
+    from agents.records import rupees_to_paise
+
+    inventory = read_inventory(args.inventory)
+    today = pd.Timestamp(args.today) if args.today else pd.Timestamp.today().normalize()
+    days_left = (inventory["expiry_date"] - today).dt.days.to_numpy()
+    prices = rupees_to_paise(list_prices(inventory, lambda items: sku_prices(items["sku_id"])))
+    started = time.perf_counter()
+    plan = optimize_markdowns(prices, days_left, inventory["category"].to_numpy())
+    elapsed = time.perf_counter() - started
+
+    by_days = pd.DataFrame({"days_left": np.clip(days_left, -1, 8), "discount": plan.discount})
+    print(json.dumps({
+        "skus": len(inventory),
+        "optimize_s": round(elapsed, 4),
+        "mean_discount_by_days_left": by_days.groupby("days_left")["discount"].mean().round(3).to_dict(),
+        "expected_recovery_paise": int(np.maximum(plan.expected_paise, 0) @ inventory["stock"].to_numpy()),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import dataclasses
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# 💰 Prices in Integer Paise
+# ------------------------------
+# Prices travel as int paise (₹1 = 100 paise) through the agents, the retry
+# queue and outreach; "₹" strings are produced only when something is shown.
+def rupees_to_paise(rupees):
+    return np.rint(np.asarray(rupees, dtype=float) * 100).astype(np.int64)
+
+def format_paise(paise):
+    return f"₹{paise / 100:.2f}"
+
+def format_paise_column(paise):
+    # Prices repeat heavily, so format each distinct value once and gather
+    uniques, inverse = np.unique(np.asarray(paise, dtype=np.int64), return_inverse=True)
+    labels = np.array([format_paise(p) for p in uniques.tolist()], dtype=object)
+    return labels[inverse.reshape(-1)]
+
+def format_price_columns(df):
+    # Render-time view: *_price_paise columns become old_price/new_price strings in place
+    return df.assign(
+        old_price_paise=format_paise_column(df["old_price_paise"]),
+        new_price_paise=format_paise_column(df["new_price_paise"]),
+    ).rename(columns={"old_price_paise": "old_price", "new_price_paise": "new_price"})
+
+def price_paise(row, field):
+    # Rows queued before prices were numeric carry "₹45.5"-style strings under the old key
+    paise = row.get(f"{field}_paise")
+    if paise is not None:
+        return int(paise)
+    legacy = row.get(field)
+    if legacy in (None, ""):
+        return 0
+    return int(round(float(str(legacy).replace("₹", "")) * 100))
+
+# ------------------------------
+# 🧑‍🍳 Buyer
+# ------------------------------
+DEFAULT_BUYER_CAPACITY = 25     # SKUs a buyer can take per run when the profile has no "capacity"
+
+def parse_engaged_date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, "%Y-%m-%d").date()
+
+@dataclass(slots=True)
+class Buyer:
+    name: str
+    zone: str
+    channel: str
+    distance_km: float
+    engagement_score: float
+    last_engaged: date
+    capacity: int = DEFAULT_BUYER_CAPACITY
+
+    @classmethod
+    def from_dict(cls, profile):
+        return cls(
+            profile["name"], profile["zone"], profile["channel"], profile["distance_km"],
+            profile["engagement_score"], parse_engaged_date(profile["last_engaged"]),
+            profile.get("capacity", DEFAULT_BUYER_CAPACITY),
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        # Always a private copy, so later edits to the caller's object are seen as changes
+        return dataclasses.replace(value) if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        profile = dataclasses.asdict(self)
+        profile["last_engaged"] = self.last_engaged.isoformat()
+        return profile
+
+# ------------------------------
+# 📦 Offer
+# ------------------------------
+OFFER_FIELDS = ["sku_id", "product", "expiry", "zone", "buyer", "channel",
+                "old_price_paise", "new_price_paise", "stock", "status"]
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+@dataclass(slots=True)
+class Offer:
+    sku_id: str
+    product: str
+    expiry: date
+    zone: str
+    buyer: str
+    channel: str
+    old_price_paise: int
+    new_price_paise: int
+    stock: int
+    status: str = "Pending"
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            row["sku_id"], row["product"], _as_date(row["expiry"]), row["zone"],
+            row.get("buyer", "None"), row.get("channel", "None"),
+            price_paise(row, "old_price"), price_paise(row, "new_price"),
+            int(row["stock"]), row.get("status", "Pending"),
+        )
+
+    def to_row(self):
+        return {field: getattr(self, field) for field in OFFER_FIELDS}
+
+    @property
+    def discount_pct(self):
+        if not self.old_price_paise:
+            return 0
+        return round((1 - self.new_price_paise / self.old_price_paise) * 100)
+
+def offers_from_frame(df):
+    columns = [df[field].tolist() for field in OFFER_FIELDS]
+    return [Offer(*values) for values in zip(*columns)]
+
+def offers_to_frame(offers):
+    return pd.DataFrame({field: [getattr(o, field) for o in offers] for field in OFFER_FIELDS})
+
+# ------------------------------
+# 📬 Outreach Outcome
+# ------------------------------
+@dataclass(slots=True)
+class Outcome:
+    offer: Offer
+    buyer: Buyer | None          # accepted buyer, None when nobody accepted
+    attempts: list               # [(Buyer, status)] in ranking order
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from agents.records import price_paise
+
+# ------------------------------
+# 🗃️ Durable Retry Queue (SQLite WAL)
+# ------------------------------
+# Unsold SKUs survive restarts and are shared safely between Streamlit sessions
+# and batch workers. Items come out in priority order (earliest expiry, then the
+# largest stock value), are claimed atomically in batches, and a failed retry is
+# pushed back with exponential backoff before it becomes eligible again.
+RETRY_DB_PATH = "data/retry_queue.db"
+BACKOFF_BASE_S = 60
+BACKOFF_MAX_S = 6 * 60 * 60
+
+PENDING, IN_FLIGHT, ROUTED = "pending", "in_flight", "routed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS retry_queue (
+    item_key        TEXT PRIMARY KEY,
+    expiry          TEXT NOT NULL,
+    stock_value     REAL NOT NULL,
+    status          TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    payload         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS retry_queue_priority ON retry_queue (status, expiry, stock_value DESC);
+"""
+
+def retry_key(item):
+    # sku_id alone is not unique across lots (the same SKU can expire on several dates)
+    return f"{item['sku_id']}|{item.get('product', '')}|{item.get('expiry', '')}"
+
+def _stock_value(item):
+    # Rupees of stock at the current offer price; only used to order the queue
+    paise = price_paise(item, "new_price") or price_paise(item, "old_price")
+    return float(item.get("stock", 0)) * paise / 100
+
+def _json_default(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+class RetryQueue:
+    def __init__(self, path=RETRY_DB_PATH, backoff_base_s=BACKOFF_BASE_S, backoff_max_s=BACKOFF_MAX_S):
+        self.path = path
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._local = threading.local()
+
+    # One connection per thread; nothing touches disk until the queue is first used
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    # ------------------------------
+    # ➕ Enqueue
+    # ------------------------------
+    def push(self, item):
+        self.push_many([item])
+
+    def push_many(self, items):
+        now = time.time()
+        rows = [
+            (retry_key(item), str(item.get("expiry", "")), _stock_value(item), PENDING, now, now,
+             json.dumps(item, default=_json_default))
+            for item in items
+        ]
+        # Re-pushing a SKU refreshes its payload but keeps its attempt count and backoff. A claimed
+        # (in_flight) row keeps its status and claim time, so no other worker can take it and
+        # release_stale still sees how old the claim is; a routed row is final and stays as it is.
+        self._transaction(lambda conn: conn.executemany(
+            f"""INSERT INTO retry_queue (item_key, expiry, stock_value, status, next_attempt_at, updated_at, payload)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(item_key) DO UPDATE SET
+                   expiry = excluded.expiry, stock_value = excluded.stock_value, payload = excluded.payload,
+                   status = CASE WHEN retry_queue.status = '{IN_FLIGHT}' THEN retry_queue.status
+                                 ELSE excluded.status END,
+                   updated_at = CASE WHEN retry_queue.status = '{IN_FLIGHT}' THEN retry_queue.updated_at
+                                     ELSE excluded.updated_at END
+               WHERE retry_queue.status != '{ROUTED}'""",
+            rows,
+        ))
+
+    # ------------------------------
+    # 📤 Batched Claim
+    # ------------------------------
+    def dequeue_batch(self, limit, now=None):
+        now = time.time() if now is None else now
+
+        def claim(conn):
+            rows = conn.execute(
+                """SELECT item_key, payload FROM retry_queue
+                   WHERE status = ? AND next_attempt_at <= ?
+                   ORDER BY expiry, stock_value DESC LIMIT ?""",
+                (PENDING, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE retry_queue SET status = ?, updated_at = ? WHERE item_key = ?",
+                [(IN_FLIGHT, now, key) for key, _ in rows],
+            )
+            return [json.loads(payload) for _, payload in rows]
+
+        return self._transaction(claim)
+
+    # ------------------------------
+    # ✅ / 🔁 Outcomes
+    # ------------------------------
+    def complete(self, items, status=ROUTED):
+        now = time.time()
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE retry_queue SET status = ?, updated_at = ?, payload = ? WHERE item_key = ?",
+            [(status, now, json.dumps(item, default=_json_default), retry_key(item)) for item in items],
+        ))
+
+    def fail(self, items, now=None):
+        now = time.time() if now is None else now
+        # Backoff doubles per attempt: base, 2×base, 4×base … capped at backoff_max_s
+        self._transaction(lambda conn: conn.executemany(
+            """UPDATE retry_queue SET
+                   status = ?, attempts = attempts + 1, updated_at = ?, payload = ?,
+                   next_attempt_at = ? + MIN(?, ? * (1 << MIN(attempts, 30)))
+               WHERE item_key = ?""",
+            [(PENDING, now, json.dumps(item, default=_json_default), now,
+              self.backoff_max_s, self.backoff_base_s, retry_key(item)) for item in items],
+        ))
+
+    def release_stale(self, older_than_s=15 * 60):
+        # Hand claims from crashed workers back to the queue
+        cutoff = time.time() - older_than_s
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE retry_queue SET status = ? WHERE status = ? AND updated_at < ?",
+            (PENDING, IN_FLIGHT, cutoff),
+        ).rowcount)
+
+    # ------------------------------
+    # 🔍 Inspection
+    # ------------------------------
+    def items(self, status=PENDING, limit=None):
+        query = "SELECT payload FROM retry_queue WHERE status = ? ORDER BY expiry, stock_value DESC"
+        params = [status]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(payload) for (payload,) in self._conn().execute(query, params)]
+
+    def count(self, status=PENDING):
+        return self._conn().execute("SELECT COUNT(*) FROM retry_queue WHERE status = ?", (status,)).fetchone()[0]
+
+    def clear(self):
+        self._transaction(lambda conn: conn.execute("DELETE FROM retry_queue"))
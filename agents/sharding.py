@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from multiprocessing import shared_memory, util
+
+import numpy as np
+import pandas as pd
+
+from agents import inventory_cache
+from agents.inventory_io import inventory_columns, read_inventory
+from agents.pricing import list_prices
+from agents.records import Buyer
+
+# ------------------------------
+# 🧩 Multi-Hub Sharded Execution
+# ------------------------------
+# python -m agents.sharding --inventory data/inventory.csv --events data/cultural_events.csv \
+#     --workers 8 --out out/sharded
+#
+# Each location in the inventory is a hub. Hubs are packed into shards of
+# roughly equal row counts and every shard runs redistribution, the expiry log
+# and its slice of the forecasting events in a worker process. The inventory
+# columns plus a hub-grouped row order are copied once into shared memory;
+# workers attach to them by name, so a task only pickles its row ranges, its
+# hubs' buyers and its events. Rows without a unit_price are priced by
+# incremental.sku_prices (stable per sku_id) since run_redistribution's seeded
+# per-row draw depends on the order of the whole file.
+ORDER_KEY = "__hub_order__"
+SHARDS_PER_WORKER = 4   # more shards than workers evens out hubs of different sizes
+
+ShardTask = namedtuple("ShardTask", ["shard", "zones", "ranges", "buyers", "events", "event_offset"])
+ShardedRun = namedtuple("ShardedRun", ["redistribution", "near_expiry", "logs", "recommendations", "shards"])
+
+# ------------------------------
+# 🗺️ Shard Planning
+# ------------------------------
+def group_rows_by_hub(location_codes):
+    # -> (row order grouped by hub, bounds): hub code c owns order[bounds[c + 1]:bounds[c + 2]],
+    # missing locations (-1) own order[bounds[0]:bounds[1]]; rows keep source order within a hub
+    shifted = np.asarray(location_codes) + 1
+    order = np.argsort(shifted, kind="stable")
+    n_codes = int(shifted.max()) + 1 if len(shifted) else 1
+    return order, np.searchsorted(shifted[order], np.arange(n_codes + 1))
+
+def plan_shards(bounds, n_shards):
+    # Largest hubs first, each onto the lightest shard; -> [[shifted hub code, ...], ...]
+    sizes = np.diff(bounds)
+    hubs = [code for code in np.argsort(-sizes, kind="stable").tolist() if sizes[code]]
+    shards = [[] for _ in range(max(1, min(n_shards, len(hubs))))]
+    load = np.zeros(len(shards), dtype=np.int64)
+    for code in hubs:
+        lightest = int(np.argmin(load))
+        shards[lightest].append(code)
+        load[lightest] += sizes[code]
+    return [sorted(codes) for codes in shards if codes]
+
+def split_events(events, n_slices):
+    # Contiguous slices, so each keeps its SKU ids via build_sku_recommendations(event_offset=...)
+    bounds = np.linspace(0, len(events), max(1, n_slices) + 1).astype(int)
+    return [(int(lo), events[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+# ------------------------------
+# 🧠 Shared Inventory (parent side)
+# ------------------------------
+class SharedInventory:
+    # Owns one shared memory block per column; spec is the picklable handle workers attach to
+    def __init__(self, columns, order):
+        self._blocks = []
+        arrays = {col: self._share(np.asarray(columns.arrays[col])) for col in columns.order}
+        arrays[ORDER_KEY] = self._share(np.asarray(order, dtype=np.int64))
+        missing = {col: self._share(np.asarray(mask)) for col, mask in (columns.missing or {}).items()}
+        self.spec = {"rows": columns.rows, "order": columns.order, "kinds": columns.kinds,
+                     "categories": columns.categories, "arrays": arrays, "missing": missing}
+
+    def _share(self, array):
+        # Zero-byte blocks are not allowed
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        return block.name, array.dtype.str, array.shape
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ------------------------------
+# 🔗 Shared Inventory (worker side)
+# ------------------------------
+_attached = {}  # "columns", "order", "blocks" for this worker process
+
+def _attach(spec):
+    blocks = []
+
+    def view(name, dtype, shape):
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    arrays = {col: view(*handle) for col, handle in spec["arrays"].items()}
+    missing = {col: view(*handle) for col, handle in spec["missing"].items()}
+    order = arrays.pop(ORDER_KEY)
+    _attached.update(
+        columns=inventory_cache.InventoryColumns(spec["rows"], spec["order"], spec["kinds"], arrays,
+                                                 spec["categories"], missing),
+        order=order, blocks=blocks,
+    )
+    # Views must be dropped before the blocks close, so detach explicitly when the worker exits
+    util.Finalize(None, _detach, exitpriority=10)
+
+def _detach():
+    blocks = _attached.pop("blocks", [])
+    _attached.clear()
+    for block in blocks:
+        block.close()
+
+def _run_shard(task, today, end_days, simulate_trend_spike):
+    from agents import expiry_agent
+    from agents.forecasting import build_sku_recommendations
+    from agents.incremental import sku_prices
+
+    started = time.perf_counter()
+    columns, order = _attached["columns"], _attached["order"]
+    expiry_agent.buyer_profiles[:] = task.buyers
+    expiry_agent.buyer_index.sync(task.buyers)
+
+    positions = np.concatenate([order[lo:hi] for lo, hi in task.ranges]) if task.ranges else order[:0]
+    in_window = columns.arrays["expiry_date"][positions] <= np.datetime64(today + timedelta(days=end_days), "ns")
+    near_expiry = inventory_cache.frame_from_columns(columns, positions[in_window])
+
+    if near_expiry.empty:
+        redistribution = pd.DataFrame()
+    else:
+        redistribution = expiry_agent.build_redistribution_frame(
+            near_expiry, today, list_prices(near_expiry, lambda items: sku_prices(items["sku_id"]))
+        ).set_index(near_expiry.index)
+    logs = pd.Series(expiry_agent.format_expiry_logs(near_expiry), index=near_expiry.index, dtype=object)
+    recommendations = build_sku_recommendations(task.events, simulate_trend_spike, task.event_offset)
+
+    stats = {"shard": task.shard, "zones": task.zones, "rows": len(positions), "flagged": len(redistribution),
+             "events": len(task.events), "pid": os.getpid(), "wall_s": round(time.perf_counter() - started, 4)}
+    return redistribution, near_expiry, logs, recommendations, stats
+
+# ------------------------------
+# 🚀 Sharded Run
+# ------------------------------
+def _hub_columns(inventory_path):
+    # The memory-mapped cache when it can be built, otherwise the parsed CSV
+    columns = inventory_columns(inventory_path)
+    return columns if columns is not None else inventory_cache.columns_from_frame(read_inventory(inventory_path))
+
+def _merge(parts):
+    # Per-shard rows are indexed by source position; restore file order
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return None
+    return pd.concat(parts).sort_index()
+
+def run_sharded(inventory_path, buyers=None, events=(), workers=None, n_shards=None,
+                end_days=2, today=None, simulate_trend_spike=False):
+    from agents import expiry_agent
+
+    today = pd.to_datetime(today if today is not None else datetime.today().date())
+    workers = workers or os.cpu_count() or 1
+    n_shards = n_shards or workers * SHARDS_PER_WORKER
+    buyers = [Buyer.coerce(b) for b in (buyers if buyers is not None else expiry_agent.buyer_profiles)]
+    events = list(events)
+
+    columns = _hub_columns(inventory_path)
+    order, bounds = group_rows_by_hub(columns.arrays["location"])
+    hub_names = ["<missing>"] + list(columns.categories["location"])
+    shards = plan_shards(bounds, n_shards)
+
+    buyers_by_zone = {}
+    for buyer in buyers:
+        buyers_by_zone.setdefault(buyer.zone, []).append(buyer)
+    event_slices = split_events(events, len(shards))
+    tasks = [
+        ShardTask(
+            shard=i,
+            zones=[hub_names[code] for code in codes],
+            ranges=[(int(bounds[code]), int(bounds[code + 1])) for code in codes],
+            buyers=[b for code in codes for b in buyers_by_zone.get(hub_names[code], [])],
+            events=event_slices[i][1] if i < len(event_slices) else [],
+            event_offset=event_slices[i][0] if i < len(event_slices) else 0,
+        )
+        for i, codes in enumerate(shards)
+    ]
+    if not tasks:
+        # Empty inventory: one task still builds the forecasting recommendations
+        tasks = [ShardTask(0, [], [], [], events, 0)]
+
+    with SharedInventory(columns, order) as shared:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_attach, initargs=(shared.spec,)) as pool:
+            results = list(pool.map(partial(_run_shard, today=today, end_days=end_days,
+                                            simulate_trend_spike=simulate_trend_spike), tasks))
+
+    redistribution = _merge([r[0] for r in results])
+    near_expiry = _merge([r[1] for r in results])
+    logs = _merge([r[2] for r in results])
+    return ShardedRun(
+        redistribution=redistribution.reset_index(drop=True) if redistribution is not None else pd.DataFrame([]),
+        near_expiry=near_expiry if near_expiry is not None else results[0][1],
+        logs=logs.tolist() if logs is not None else [],
+        recommendations=pd.concat([r[3] for r in results], ignore_index=True),
+        shards=[r[4] for r in results],
+    )
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agents.sharding",
+                                     description="Run redistribution, expiry logs and forecasting per hub shard.")
+    parser.add_argument("--inventory", required=True, help="inventory CSV covering every hub (location column)")
+    parser.add_argument("--buyers", help="JSON list of buyer profiles (default: the built-in profiles)")
+    parser.add_argument("--events", help="cultural events CSV for the forecasting pass")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shards", type=int, help=f"default: {SHARDS_PER_WORKER} per worker")
+    parser.add_argument("--end-days", type=int, default=2)
+    parser.add_argument("--trend-spike", action="store_true")
+    parser.add_argument("--out", help="write redistribution.csv, expiry_log.csv and recommendations.csv here")
+    args = parser.parse_args(argv)
+
+    buyers = None
+    if args.buyers:
+        with open(args.buyers) as f:
+            buyers = [Buyer.from_dict(profile) for profile in json.load(f)]
+    events = ()
+    if args.events:
+        from agents.forecasting import read_cultural_events
+        events = read_cultural_events(args.events)
+
+    started = time.perf_counter()
+    run = run_sharded(args.inventory, buyers, events, args.workers, args.shards, args.end_days,
+                      simulate_trend_spike=args.trend_spike)
+    wall_s = round(time.perf_counter() - started, 3)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        run.redistribution.to_csv(os.path.join(args.out, "redistribution.csv"), index=False)
+        run.near_expiry.assign(log=run.logs).to_csv(os.path.join(args.out, "expiry_log.csv"), index=False)
+        run.recommendations.to_csv(os.path.join(args.out, "recommendations.csv"), index=False)
+
+    print(json.dumps({"shards": len(run.shards), "flagged": len(run.redistribution),
+                      "recommendations": len(run.recommendations), "wall_s": wall_s,
+                      "shard_wall_s": [s["wall_s"] for s in run.shards]}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# 🚚 Transfer Settings
+# ------------------------------
+HUBS_PATH = "data/hubs.csv"         # hub, region, lat, lon
+NATIONWIDE_REGIONS = {"Pan India"}  # forecast rows for these regions cover every hub
+NEIGHBOURS = 8                      # sparse neighbourhood: nearest demand hubs considered per surplus hub
+MAX_TRANSFER_KM = 1_500.0
+EARTH_RADIUS_KM = 6371.0
+
+SURPLUS_COLUMNS = ["hub", "product", "sku_id", "expiry", "qty"]
+DEMAND_COLUMNS = ["hub", "product", "qty"]
+TRANSFER_COLUMNS = ["sku_id", "product", "expiry", "from_hub", "to_hub", "qty", "distance_km"]
+
+# ------------------------------
+# 🗺️ Hubs
+# ------------------------------
+def load_hubs(path=HUBS_PATH):
+    return pd.read_csv(path, dtype={"hub": "object", "region": "object"}).drop_duplicates("hub").set_index("hub", drop=False)
+
+def _unit_vectors(hubs):
+    lat, lon = np.radians(hubs["lat"].to_numpy(dtype=float)), np.radians(hubs["lon"].to_numpy(dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+def _km_to_chord(km):
+    return 2 * np.sin(min(km / (2 * EARTH_RADIUS_KM), np.pi / 2))
+
+def neighbourhoods(src_xyz, dst_xyz, k=NEIGHBOURS, max_km=MAX_TRANSFER_KM):
+    # -> (src idx, dst idx, km) for the k nearest destinations of every source within max_km
+    from scipy.spatial import cKDTree
+
+    k = min(k, len(dst_xyz))
+    if k == 0 or len(src_xyz) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    bound = _km_to_chord(max_km) if max_km is not None else np.inf
+    chord, dst = cKDTree(dst_xyz).query(src_xyz, k=k, distance_upper_bound=bound)
+    chord, dst = chord.reshape(len(src_xyz), k), dst.reshape(len(src_xyz), k)
+    found = np.isfinite(chord)
+    src = np.repeat(np.arange(len(src_xyz)), k).reshape(found.shape)
+    return src[found], dst[found], _chord_to_km(chord[found])
+
+# ------------------------------
+# 📥 Surplus and Demand
+# ------------------------------
+def _spread_over_hubs(rows, hubs):
+    # Region-level quantities split evenly over the region's hubs, remainder to the first hubs
+    nationwide = rows["region"].isin(NATIONWIDE_REGIONS)
+    members = pd.concat([
+        rows[~nationwide].merge(hubs[["hub", "region"]].reset_index(drop=True), on="region"),
+        rows[nationwide].merge(hubs[["hub"]].reset_index(drop=True), how="cross"),
+    ])
+    slot = members.groupby("_row").cumcount().to_numpy()
+    n_hubs = members.groupby("_row")["hub"].transform("size").to_numpy()
+    total = members["qty"].to_numpy()
+    return members.assign(qty=total // n_hubs + (slot < total % n_hubs))
+
+def forecast_positions(recommendations, hubs):
+    # -> (surplus, demand): overstocked rows become surplus, restock gaps become demand
+    rows = pd.DataFrame({
+        "_row": np.arange(len(recommendations)),
+        "region": recommendations["region"].to_numpy(),
+        "product": recommendations["product_name"].to_numpy(),
+        "sku_id": recommendations["sku_id"].to_numpy(),
+        "qty": recommendations["stock_gap"].to_numpy(dtype=np.int64),
+    })
+    spread = _spread_over_hubs(rows.assign(qty=rows["qty"].abs()), hubs)
+    gap = np.sign(rows["qty"].to_numpy())[spread["_row"].to_numpy()]
+    surplus = spread[gap < 0].assign(expiry=pd.NaT)[SURPLUS_COLUMNS]
+    demand = spread[gap > 0][DEMAND_COLUMNS]
+    return surplus[surplus["qty"] > 0].reset_index(drop=True), demand[demand["qty"] > 0].reset_index(drop=True)
+
+def offer_surplus(offers):
+    # Unsold offers (❌ Unsold rows, retry queue items) as surplus lots at their zone
+    offers = pd.DataFrame(offers)
+    if offers.empty:
+        return pd.DataFrame(columns=SURPLUS_COLUMNS)
+    return pd.DataFrame({
+        "hub": offers["zone"].to_numpy(),
+        "product": offers["product"].to_numpy(),
+        "sku_id": offers["sku_id"].to_numpy(),
+        "expiry": pd.to_datetime(offers["expiry"]).to_numpy(),
+        "qty": offers["stock"].to_numpy(dtype=np.int64),
+    })
+
+# ------------------------------
+# 🧮 Transportation Problem (per product)
+# ------------------------------
+# Every allowed arc is worth more than leaving a unit of demand unmet, so the LP
+# moves as much stock as the neighbourhoods allow and, among those plans, the
+# fewest unit-kilometres. Supplies and demands are integers, so HiGHS returns an
+# integral vertex.
+def _solve_product(supply, demand, src, dst, km):
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_matrix, vstack
+
+    arcs = np.arange(len(src))
+    ones = np.ones(len(src))
+    a_ub = vstack([
+        csr_matrix((ones, (src, arcs)), shape=(len(supply), len(src))),
+        csr_matrix((ones, (dst, arcs)), shape=(len(demand), len(src))),
+    ]).tocsr()
+    unmet_value = km.max() + 1.0
+    result = linprog(km - unmet_value, A_ub=a_ub, b_ub=np.concatenate([supply, demand]),
+                     bounds=(0, None), method="highs")
+    if result.status != 0:
+        raise RuntimeError(f"transfer LP failed: {result.message}")
+    return np.rint(result.x).astype(np.int64)
+
+def _net_positions(surplus, demand):
+    # Local demand absorbs a hub's own surplus first; only the remainder travels
+    supplied = surplus.groupby(["hub", "product"], sort=False)["qty"].sum()
+    needed = demand.groupby(["hub", "product"], sort=False)["qty"].sum()
+    local = np.minimum(supplied, needed.reindex(supplied.index, fill_value=0))
+    return supplied - local, needed - local.reindex(needed.index, fill_value=0), local
+
+# ------------------------------
+# 🚀 Transfer Planner
+# ------------------------------
+def plan_transfers(surplus, demand, hubs, k=NEIGHBOURS, max_km=MAX_TRANSFER_KM):
+    started = time.perf_counter()
+    surplus = surplus[surplus["hub"].isin(hubs.index) & (surplus["qty"] > 0)]
+    demand = demand[demand["hub"].isin(hubs.index) & (demand["qty"] > 0)]
+    xyz = pd.DataFrame(_unit_vectors(hubs), index=hubs.index)
+
+    outbound, inbound, local = _net_positions(surplus, demand)
+    outbound, inbound = outbound[outbound > 0], inbound[inbound > 0]
+    report = {"products": 0, "arcs": 0, "shipped": 0, "absorbed_locally": int(local.sum()),
+              "unmet_demand": int(inbound.sum()), "unused_surplus": int(outbound.sum()), "unit_km": 0.0}
+
+    flows = []  # (hub, product, to_hub, qty, km)
+    in_by_product = {p: s.droplevel("product") for p, s in inbound.groupby(level="product", sort=False)}
+    for product, out in outbound.groupby(level="product", sort=False):
+        into = in_by_product.get(product)
+        if into is None:
+            continue
+        out = out.droplevel("product")
+        src, dst, km = neighbourhoods(xyz.loc[out.index].to_numpy(), xyz.loc[into.index].to_numpy(), k, max_km)
+        if len(src) == 0:
+            continue
+        shipped = _solve_product(out.to_numpy(), into.to_numpy(), src, dst, km)
+        used = shipped > 0
+        report["products"] += 1
+        report["arcs"] += len(src)
+        report["shipped"] += int(shipped.sum())
+        report["unit_km"] += float((shipped * km).sum())
+        flows.extend(zip(out.index[src[used]], [product] * int(used.sum()), into.index[dst[used]],
+                         shipped[used].tolist(), km[used].tolist()))
+
+    report["unmet_demand"] -= report["shipped"]
+    report["unused_surplus"] -= report["shipped"]
+    report["unit_km"] = round(report["unit_km"], 1)
+    transfers = _flows_to_lots(surplus, local, flows)
+    report["solve_time_s"] = round(time.perf_counter() - started, 4)
+    return transfers, report
+
+def _flows_to_lots(surplus, local, flows):
+    # Lay every (hub, product) group's lots end to end, earliest expiry first. Local demand keeps
+    # the first `local` units and the group's flows, shortest trip first, cover what follows;
+    # cutting both interval lists at every boundary gives the (lot, flow) pieces.
+    if not flows:
+        return pd.DataFrame(columns=TRANSFER_COLUMNS)
+    lots = surplus.sort_values(["hub", "product", "expiry"], kind="stable").reset_index(drop=True)
+    lot_end = np.cumsum(lots["qty"].to_numpy())
+    lot_start = lot_end - lots["qty"].to_numpy()
+    group_start = pd.Series(lot_start, index=pd.MultiIndex.from_frame(lots[["hub", "product"]]))
+    group_start = group_start[~group_start.index.duplicated()]
+
+    flows = pd.DataFrame(flows, columns=["from_hub", "product", "to_hub", "qty", "distance_km"])
+    flows = flows.sort_values(["from_hub", "product", "distance_km"], kind="stable").reset_index(drop=True)
+    keys = pd.MultiIndex.from_frame(flows[["from_hub", "product"]])
+    offset = group_start.reindex(keys).to_numpy() + local.reindex(keys, fill_value=0).to_numpy()
+    flow_end = offset + flows.groupby(["from_hub", "product"], sort=False)["qty"].cumsum().to_numpy()
+    flow_start = flow_end - flows["qty"].to_numpy()
+    order = np.argsort(flow_start, kind="stable")
+    flow_start, flow_end = flow_start[order], flow_end[order]
+
+    cuts = np.unique(np.concatenate([lot_start, lot_end, flow_start, flow_end]))
+    seg_lo, seg_len = cuts[:-1], np.diff(cuts)
+    flow = np.searchsorted(flow_start, seg_lo, side="right") - 1
+    moving = (flow >= 0) & (seg_lo < flow_end[np.maximum(flow, 0)])
+    pieces = pd.DataFrame({
+        "lot": np.searchsorted(lot_start, seg_lo[moving], side="right") - 1,
+        "flow": order[flow[moving]],
+        "qty": seg_len[moving],
+    }).groupby(["flow", "lot"], sort=True)["qty"].sum().reset_index()
+
+    moved = flows.iloc[pieces["flow"].to_numpy()]
+    return pd.DataFrame({
+        "sku_id": lots["sku_id"].to_numpy()[pieces["lot"].to_numpy()],
+        "product": moved["product"].to_numpy(),
+        "expiry": lots["expiry"].to_numpy()[pieces["lot"].to_numpy()],
+        "from_hub": moved["from_hub"].to_numpy(),
+        "to_hub": moved["to_hub"].to_numpy(),
+        "qty": pieces["qty"].to_numpy(dtype=np.int64),
+        "distance_km": moved["distance_km"].round(1).to_numpy(),
+    })
+
+# ------------------------------
+# ♻️ Feed Back into Inventory
+# ------------------------------
+def transfer_upserts(inventory, transfers):
+    # Inventory rows for IncrementalRedistribution.apply_changes: each moved lot with its stock
+    # reduced, plus one lot per destination (sku_id@hub) that accumulates across runs. Transfers
+    # match inventory lots on (sku_id, product, expiry); forecast surplus has no lot and is skipped.
+    from agents.incremental import INVENTORY_FIELDS, LOT_KEY, lot_index
+
+    lots = inventory.reindex(columns=INVENTORY_FIELDS).drop_duplicates(LOT_KEY, keep="last")
+    lots = lots.set_index(LOT_KEY, drop=False).astype({"location": object, "category": object})
+    moved = transfers.rename(columns={"product": "product_name", "expiry": "expiry_date"})
+    moved = moved[lots.index.get_indexer(lot_index(moved)) >= 0]
+    if moved.empty:
+        return lots.iloc[:0].reset_index(drop=True)
+
+    out_qty = moved.groupby(LOT_KEY, sort=False)["qty"].sum()
+    sources = lots.loc[out_qty.index]
+    sources = sources.assign(stock=np.maximum(sources["stock"].to_numpy() - out_qty.to_numpy(), 0))
+
+    into = moved.groupby(LOT_KEY + ["to_hub"], sort=False)["qty"].sum().reset_index()
+    arrival_ids = into["sku_id"] + "@" + into["to_hub"]
+    already = lots["stock"].reindex(lot_index(into.assign(sku_id=arrival_ids))).fillna(0).to_numpy(dtype=np.int64)
+    arrivals = lots.loc[lot_index(into)].assign(
+        sku_id=arrival_ids.to_numpy(), location=into["to_hub"].to_numpy(),
+        stock=into["qty"].to_numpy() + already,
+    )
+    upserts = pd.concat([sources, arrivals], ignore_index=True)
+    return upserts.astype({"stock": inventory["stock"].dtype})
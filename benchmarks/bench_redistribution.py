@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.expiry_agent import build_redistribution_frame, get_discount_rate, rank_buyers_for_sku, tier_markdown
+
+# ------------------------------
+# 🧪 Synthetic Expiring Inventory
+# ------------------------------
+def make_expiring_items(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    today = pd.to_datetime(datetime.today().date())
+    return pd.DataFrame({
+        "sku_id": np.char.add("SKU", np.arange(n_rows).astype(str)),
+        "product_name": rng.choice(["Milk", "Bread", "Ghee", "Paneer", "Juice"], n_rows),
+        "expiry_date": today + pd.to_timedelta(rng.integers(-3, 3, n_rows), unit="D"),
+        "location": rng.choice(["Zone A", "Zone B", "Zone C", "Zone D"], n_rows),
+        "category": "Dairy",
+        "stock": rng.integers(1, 60, n_rows),
+    }), today
+
+# ------------------------------
+# 🐢 Pre-vectorization Loop (baseline)
+# ------------------------------
+def legacy_redistribution(expiring_items, today, original_prices):
+    results = []
+    for (_, row), original_price in zip(expiring_items.iterrows(), original_prices):
+        days_left = (row['expiry_date'] - today).days
+        discount_rate = get_discount_rate(days_left)
+        new_price = round(original_price * (1 - discount_rate), 2)
+        zone = row['location']
+        top_buyers = rank_buyers_for_sku(zone)
+        best_buyer = top_buyers[0] if top_buyers else None
+        results.append({
+            'sku_id': row['sku_id'],
+            'product': row['product_name'],
+            'expiry': row['expiry_date'].date(),
+            'zone': zone,
+            'category': row['category'],
+            'buyer': best_buyer.name if best_buyer else "None",
+            'channel': best_buyer.channel if best_buyer else "None",
+            'old_price_paise': original_price * 100,
+            'new_price_paise': round(new_price * 100),
+            'stock': row['stock'],
+            'status': 'Pending'
+        })
+    return pd.DataFrame(results)
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+# ------------------------------
+# 🚀 Benchmark Runner
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Columnar vs row-wise redistribution engine")
+    parser.add_argument("--sizes", default="10000,1000000,10000000")
+    parser.add_argument("--legacy-max-rows", type=int, default=1_000_000,
+                        help="skip the iterrows baseline above this size (it takes minutes)")
+    args = parser.parse_args()
+
+    for n_rows in [int(s) for s in args.sizes.split(",")]:
+        expiring_items, today = make_expiring_items(n_rows)
+        random.seed(42)
+        prices = [random.randint(30, 100) for _ in range(n_rows)]
+
+        # The baseline loop is the fixed tier ladder, so compare against the same markdown
+        fast_df, fast_s = timed(build_redistribution_frame, expiring_items, today, prices, tier_markdown)
+        entry = {"rows": n_rows, "vectorized_s": round(fast_s, 4), "rows_per_s": int(n_rows / fast_s)}
+
+        if n_rows <= args.legacy_max_rows:
+            slow_df, slow_s = timed(legacy_redistribution, expiring_items, today, prices)
+            pd.testing.assert_frame_equal(fast_df, slow_df, check_dtype=False)
+            entry.update({"legacy_s": round(slow_s, 4), "speedup": round(slow_s / fast_s, 1)})
+
+        print(json.dumps(entry), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ------------------------------
+# 🧊 Cold-Start Import Benchmark
+# ------------------------------
+# python benchmarks/import_time.py --repeat 5 --out import_time.json
+#
+# Every target is imported in a fresh interpreter under -X importtime; the
+# fastest of --repeat runs is reported with the heaviest top-level packages.
+# Agent modules must stay importable with only pandas/NumPy, and a page module
+# must not pull in another page's heavy dependencies at import time; a target
+# that loads a forbidden package fails the run (exit code 1).
+AGENT_FORBIDDEN = ["streamlit", "matplotlib", "scipy"]
+TARGETS = {
+    **{f"agents.{name[:-3]}": AGENT_FORBIDDEN
+       for name in sorted(os.listdir(os.path.join(ROOT, "agents"))) if name.endswith(".py")},
+    "ui.dashboard": ["matplotlib", "scipy"],
+    "ui.redistribution": ["matplotlib", "scipy"],
+    "ui.forecasting": ["matplotlib", "scipy"],
+    "ui.summary": ["matplotlib", "scipy"],
+    "ui.performance": ["matplotlib", "scipy"],
+}
+TOP_PACKAGES = 8
+
+def parse_importtime(stderr):
+    # -> (total µs, {package: cumulative µs}) from the -X importtime table; a package's figure
+    # includes whatever it imported, so pandas also counts the NumPy it pulls in
+    packages = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith("  "):
+            total += int(cumulative)
+        module = name.strip()
+        if "." not in module:
+            packages[module] = max(packages.get(module, 0), int(cumulative))
+    return total, packages
+
+def loaded_packages(stderr):
+    return {line.rsplit("|", 1)[1].strip().split(".")[0]
+            for line in stderr.splitlines() if line.startswith("import time:") and "imported package" not in line}
+
+def measure(target, repeat):
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"target": target, "error": proc.stderr.strip().splitlines()[-1]}
+        total, packages = parse_importtime(proc.stderr)
+        if best is None or total < best[0]:
+            best = (total, packages, loaded_packages(proc.stderr))
+    total, packages, loaded = best
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP_PACKAGES]
+    return {
+        "target": target,
+        "import_ms": round(total / 1000, 1),
+        "heaviest": [{"package": name, "ms": round(us / 1000, 1)} for name, us in heaviest],
+        "forbidden_loaded": sorted(set(TARGETS.get(target, [])) & loaded),
+    }
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import times per module (JSON report)")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated module names")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per target; the fastest counts")
+    parser.add_argument("--out", help="write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": [],
+    }
+    for target in args.targets.split(","):
+        result = measure(target, args.repeat)
+        report["results"].append(result)
+        print(json.dumps(result), file=sys.stderr, flush=True)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+    failed = [r for r in report["results"] if r.get("error") or r.get("forbidden_loaded")]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
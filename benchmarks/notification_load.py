@@ -0,0 +1,133 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synth
+
+# ------------------------------
+# 📨 Notification Gateway Load Test
+# ------------------------------
+# python benchmarks/notification_load.py --offers 100000 --out notification_load.json
+#
+# The channel stubs run in a separate process (so the gateway's event loop is
+# measured on its own) and every request stays on localhost. Rate limits are
+# lifted by default to find the gateway's ceiling; --respect-limits uses the
+# production CHANNEL_RATE_LIMITS on both sides instead. The naive baseline sends
+# one message per (buyer, offer) on a sample, as the redistribution page does.
+NAIVE_SAMPLE = 5_000
+UNLIMITED = 1_000_000
+
+def _serve(channels, rate_limits, latency_s, ready):
+    from agents.notifications import run_stub_servers
+    run_stub_servers(channels, rate_limits=rate_limits, latency_s=latency_s, on_ready=ready.put)
+
+def make_offers(n_offers, n_zones, seed=0):
+    import numpy as np
+    from agents.records import Offer
+    rng = np.random.default_rng(seed)
+    names = [p for p, _ in synth.PRODUCTS]
+    zones = synth.zone_names(n_zones)
+    today = datetime.today().date()
+    old = rng.integers(3_000, 10_001, n_offers).tolist()
+    discount = rng.choice([0.1, 0.2, 0.3, 0.4, 0.5], n_offers).tolist()
+    product, zone, days, stock = (rng.integers(0, len(names), n_offers).tolist(), rng.integers(0, n_zones, n_offers).tolist(),
+                                  rng.integers(1, 6, n_offers).tolist(), rng.integers(1, 60, n_offers).tolist())
+    return [
+        Offer(f"SKU{i}", names[product[i]], today + timedelta(days=days[i]), zones[zone[i]], "None", "None",
+              old[i], round(old[i] * (1 - discount[i])), stock[i])
+        for i in range(n_offers)
+    ]
+
+def run_case(name, gateway, digests, offers):
+    started = time.perf_counter()
+    report = gateway.send(digests)
+    wall = time.perf_counter() - started
+    messages = sum(m["messages"] for m in report.values())
+    return {
+        "case": name,
+        "offers": offers,
+        "digests": len(digests),
+        "messages_delivered": messages,
+        "offers_delivered": sum(m["offers"] for m in report.values()),
+        "failed": sum(m["failed"] for m in report.values()),
+        "requests": sum(m["requests"] for m in report.values()),
+        "connections_opened": sum(m["connections_opened"] for m in report.values()),
+        "wall_s": round(wall, 3),
+        "messages_per_s": round(messages / wall, 1),
+        "offers_per_s": round(sum(m["offers"] for m in report.values()) / wall, 1),
+        "channels": report,
+    }
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Offline throughput of the notification gateway (JSON report)")
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--buyers", type=int, default=1_000)
+    parser.add_argument("--zones", type=int, default=26)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated provider latency per request")
+    parser.add_argument("--respect-limits", action="store_true", help="use CHANNEL_RATE_LIMITS (slow by design)")
+    parser.add_argument("--naive-sample", type=int, default=NAIVE_SAMPLE, help="0 skips the one-per-offer baseline")
+    parser.add_argument("--out", help="write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    from agents.buyer_index import BuyerIndex
+    from agents.notifications import CHANNEL_RATE_LIMITS, NotificationGateway, build_digests
+
+    buyer_index = BuyerIndex(synth.make_buyer_profiles(args.buyers, args.zones))
+    offers = make_offers(args.offers, args.zones)
+    buyers_for = lambda offer: buyer_index.ranked(offer.zone)
+
+    channels = list(CHANNEL_RATE_LIMITS)
+    limits = CHANNEL_RATE_LIMITS if args.respect_limits else {c: UNLIMITED for c in channels}
+    ready = multiprocessing.Queue()
+    stubs = multiprocessing.Process(target=_serve, args=(channels, limits if args.respect_limits else None,
+                                                         args.latency_ms / 1000, ready), daemon=True)
+    stubs.start()
+    try:
+        endpoints = ready.get(timeout=30)
+        started = time.perf_counter()
+        digests = build_digests(offers, buyers_for)
+        build_s = time.perf_counter() - started
+
+        report = {
+            "meta": {
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "respect_limits": args.respect_limits,
+                "latency_ms": args.latency_ms,
+                "digest_build_s": round(build_s, 3),
+            },
+            "results": [run_case("digest_batched", NotificationGateway(endpoints, limits), digests, len(offers))],
+        }
+        if args.naive_sample:
+            sample = offers[:args.naive_sample]
+            one_each = build_digests(sample, buyers_for, max_offers=1)
+            naive = NotificationGateway(endpoints, limits, batch_sizes={c: 1 for c in channels}, pool_size=1)
+            report["results"].append(run_case("one_per_offer", naive, one_each, len(sample)))
+    finally:
+        stubs.terminate()
+        stubs.join()
+
+    for result in report["results"]:
+        print(json.dumps({k: v for k, v in result.items() if k != "channels"}), file=sys.stderr, flush=True)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synth
+
+# ------------------------------
+# 📐 Scale Presets
+# ------------------------------
+SCALES = {
+    "small": {"skus": 1_000, "buyers": 10, "events": 50},
+    "medium": {"skus": 100_000, "buyers": 1_000, "events": 5_000},
+    "large": {"skus": 1_000_000, "buyers": 10_000, "events": 50_000},
+    "xlarge": {"skus": 10_000_000, "buyers": 100_000, "events": 50_000},
+}
+RANK_LOOKUPS = 100_000
+RETRY_ITEMS_MAX = 200_000
+TRANSFER_ZONES = 5_000
+MONTE_CARLO_TRIALS = 1_000
+TWIN_DAYS = 365
+FORECAST_SERIES_MAX = 100_000
+FORECAST_HISTORY_DAYS = 365
+FORECAST_HORIZON = 90
+
+# ------------------------------
+# 🧰 Case Helpers (run inside the worker process)
+# ------------------------------
+def _install_buyers(data_dir):
+    from agents import expiry_agent
+    from agents.records import Buyer
+    with open(os.path.join(data_dir, "buyers.json")) as f:
+        buyers = [Buyer.from_dict(profile) for profile in json.load(f)]
+    expiry_agent.buyer_profiles[:] = buyers
+    expiry_agent.buyer_index.sync(buyers)
+    return expiry_agent
+
+def _warm_inventory_cache(inventory_path):
+    from agents.inventory_io import inventory_columns
+    inventory_columns(inventory_path)
+
+# Each case: setup(data_dir) -> context, run(context) -> rows processed
+def _setup_redistribution(data_dir):
+    agent = _install_buyers(data_dir)
+    path = os.path.join(data_dir, "inventory.csv")
+    _warm_inventory_cache(path)
+    return agent, path
+
+def _run_redistribution(ctx):
+    agent, path = ctx
+    df, _ = agent.run_redistribution(path)
+    return len(df)
+
+def _run_expiry_agent(ctx):
+    agent, path = ctx
+    near_expiry, _ = agent.run_expiry_agent(path)
+    return len(near_expiry)
+
+def _setup_retry(data_dir):
+    from agents.retry_store import RetryQueue
+    agent, path = _setup_redistribution(data_dir)
+    df, _ = agent.run_redistribution(path)
+    queue = RetryQueue(os.path.join(data_dir, "retry_bench.db"))
+    queue.clear()
+    items = df.head(RETRY_ITEMS_MAX).to_dict("records")
+    queue.push_many(items)
+    return agent, queue, len(items)
+
+def _run_retry(ctx):
+    agent, queue, n_items = ctx
+    results, _ = agent.rerun_retry_logic(batch_size=n_items, queue=queue)
+    return n_items
+
+def _setup_rank(data_dir):
+    agent = _install_buyers(data_dir)
+    return agent, sorted(agent.buyer_index.zones())
+
+def _run_rank(ctx):
+    agent, zones = ctx
+    for i in range(RANK_LOOKUPS):
+        agent.rank_buyers_for_sku(zones[i % len(zones)])
+    return RANK_LOOKUPS
+
+def _setup_forecasting(data_dir):
+    from agents.forecasting import build_sku_recommendations, read_cultural_events
+    return build_sku_recommendations, read_cultural_events(os.path.join(data_dir, "cultural_events.csv"))
+
+def _run_forecasting(ctx):
+    build, events = ctx
+    return len(build(events, simulate_trend_spike=True))
+
+def _setup_dashboard(data_dir):
+    path = os.path.join(data_dir, "inventory.csv")
+    _warm_inventory_cache(path)
+    return path
+
+def _run_dashboard(path):
+    from agents.inventory_io import expiring_page, inventory_overview, inventory_page
+    overview = inventory_overview(path, end_days=2)
+    inventory_page(path, 0, 100)
+    expiring_page(path, 0, 100, end_days=2)
+    return overview.total_rows
+
+def _setup_cache_build(data_dir):
+    from agents import inventory_cache
+    path = os.path.join(data_dir, "inventory.csv")
+    meta = os.path.join(inventory_cache.cache_dir_for(path), "meta.json")
+    if os.path.exists(meta):
+        os.remove(meta)
+    return path
+
+def _run_cache_build(path):
+    from agents.inventory_io import inventory_columns
+    return inventory_columns(path).rows
+
+def _setup_transfers(data_dir):
+    from agents.transfers import plan_transfers
+    hubs = synth.make_hubs(TRANSFER_ZONES).set_index("hub", drop=False)
+    surplus, demand = synth.make_transfer_positions(hubs, TRANSFER_ZONES * 4)
+    return plan_transfers, surplus, demand, hubs
+
+def _run_transfers(ctx):
+    plan, surplus, demand, hubs = ctx
+    plan(surplus, demand, hubs)
+    return len(surplus) + len(demand)
+
+def _setup_monte_carlo(data_dir):
+    from agents.monte_carlo import AcceptanceModel, Scenario, prepare_outreach
+    agent, path = _setup_redistribution(data_dir)
+    df, _ = agent.run_redistribution(path)
+    return prepare_outreach(df, agent.buyer_index), [Scenario("base", AcceptanceModel(), 1.0)]
+
+def _run_monte_carlo(ctx):
+    from agents.monte_carlo import sweep
+    arrays, scenarios = ctx
+    sweep(arrays, scenarios, MONTE_CARLO_TRIALS)
+    return MONTE_CARLO_TRIALS * len(arrays.stock)
+
+def _setup_markdown(data_dir):
+    import numpy as np
+    import pandas as pd
+    from agents.inventory_io import inventory_columns
+    from agents.pricing import optimize_markdowns
+    columns = inventory_columns(os.path.join(data_dir, "inventory.csv"))
+    today = np.datetime64(datetime.today().date(), "D")
+    days_left = (columns.arrays["expiry_date"].astype("datetime64[D]") - today).astype(np.int64)
+    categories = pd.Categorical.from_codes(np.asarray(columns.arrays["category"]), columns.categories["category"])
+    prices = np.asarray(columns.arrays["unit_price"]) * 100
+    return optimize_markdowns, prices, days_left, categories
+
+def _run_markdown(ctx):
+    optimize, prices, days_left, categories = ctx
+    optimize(prices, days_left, categories)
+    return len(prices)
+
+def _setup_digital_twin(data_dir):
+    from agents.digital_twin import DigitalTwin, TwinConfig
+    from agents.forecasting import read_cultural_events
+    agent, path = _setup_redistribution(data_dir)
+    events = read_cultural_events(os.path.join(data_dir, "cultural_events.csv"))
+    hubs = synth.make_hubs(26)
+    return DigitalTwin, TwinConfig(days=TWIN_DAYS), path, events, hubs, agent.buyer_index
+
+def _run_digital_twin(ctx):
+    from agents.inventory_io import inventory_columns
+    twin_cls, config, path, events, hubs, index = ctx
+    start = datetime.today().date()
+    twin = twin_cls(inventory_columns(path), start, config, events, hubs, index)
+    for _ in twin:
+        pass
+    return len(twin.stock) * config.days
+
+def _setup_demand_forecast(data_dir):
+    from agents.forecasting import read_cultural_events
+    from agents.inventory_io import inventory_columns
+    # One series per SKU up to the cap, a year of history ending yesterday
+    n_series = min(inventory_columns(os.path.join(data_dir, "inventory.csv")).rows, FORECAST_SERIES_MAX)
+    events = read_cultural_events(os.path.join(data_dir, "cultural_events.csv"))
+    return synth.make_sales_history(n_series, FORECAST_HISTORY_DAYS, events), events
+
+def _run_demand_forecast(ctx):
+    from agents.demand_model import DemandModel
+    (keys, first_date, units), events = ctx
+    model = DemandModel.fit(keys, first_date, units, events)
+    return model.forecast(FORECAST_HORIZON).size
+
+CASES = {
+    "inventory_cache_build": (_setup_cache_build, _run_cache_build),
+    "run_redistribution": (_setup_redistribution, _run_redistribution),
+    "run_expiry_agent": (_setup_redistribution, _run_expiry_agent),
+    "rerun_retry_logic": (_setup_retry, _run_retry),
+    "rank_buyers_for_sku": (_setup_rank, _run_rank),
+    "forecasting_recommendations": (_setup_forecasting, _run_forecasting),
+    "dashboard_aggregation": (_setup_dashboard, _run_dashboard),
+    "transfer_planner": (_setup_transfers, _run_transfers),
+    "monte_carlo_outreach": (_setup_monte_carlo, _run_monte_carlo),
+    "digital_twin_replay": (_setup_digital_twin, _run_digital_twin),
+    "markdown_optimizer": (_setup_markdown, _run_markdown),
+    "demand_forecast": (_setup_demand_forecast, _run_demand_forecast),
+}
+
+# ------------------------------
+# ⏱️ Isolated Runner
+# ------------------------------
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _case_worker(name, data_dir, out_queue):
+    try:
+        setup, run = CASES[name]
+        ctx = setup(data_dir)
+        started = time.perf_counter()
+        rows = run(ctx)
+        wall = time.perf_counter() - started
+        out_queue.put({"case": name, "rows": rows, "wall_s": round(wall, 4),
+                       "rows_per_s": round(rows / wall, 1) if wall else None, "peak_rss_mb": _peak_rss_mb()})
+    except Exception as exc:
+        out_queue.put({"case": name, "error": f"{type(exc).__name__}: {exc}"})
+
+def run_case(name, data_dir):
+    # A fresh process per case keeps peak RSS attributable to that case alone
+    ctx = multiprocessing.get_context("spawn")
+    out_queue = ctx.Queue()
+    proc = ctx.Process(target=_case_worker, args=(name, data_dir, out_queue))
+    proc.start()
+    result = out_queue.get()
+    proc.join()
+    return result
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def prepare_data(data_dir, skus, buyers, events, seed=0):
+    synth.ensure_dir(data_dir)
+    synth.write_inventory(os.path.join(data_dir, "inventory.csv"), skus, seed=seed)
+    synth.write_cultural_events(os.path.join(data_dir, "cultural_events.csv"), events, seed=seed)
+    with open(os.path.join(data_dir, "buyers.json"), "w") as f:
+        json.dump(synth.make_buyer_profiles(buyers, seed=seed), f)
+
+# ------------------------------
+# 🚀 Entry Point
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="EcoTwin hot-path benchmarks (JSON report)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--skus", type=int, help="override the preset SKU count")
+    parser.add_argument("--buyers", type=int, help="override the preset buyer count")
+    parser.add_argument("--events", type=int, help="override the preset event count")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of cases")
+    parser.add_argument("--data-dir", help="reuse/keep generated data here instead of a temp dir")
+    parser.add_argument("--out", help="write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in ("skus", "buyers", "events"):
+        if getattr(args, key):
+            scale[key] = getattr(args, key)
+
+    with tempfile.TemporaryDirectory(prefix="ecotwin-bench-") as tmp:
+        data_dir = args.data_dir or tmp
+        started_at = datetime.now().isoformat(timespec="seconds")
+        gen_started = time.perf_counter()
+        prepare_data(data_dir, scale["skus"], scale["buyers"], scale["events"])
+        report = {
+            "meta": {
+                "scale": args.scale, **scale,
+                "started_at": started_at,
+                "data_gen_s": round(time.perf_counter() - gen_started, 2),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "git_commit": _git_commit(),
+            },
+            "results": [],
+        }
+        for name in args.cases.split(","):
+            result = run_case(name, data_dir)
+            report["results"].append(result)
+            print(json.dumps(result), file=sys.stderr, flush=True)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import csv
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# 🧪 Synthetic Data at Scale
+# ------------------------------
+PRODUCTS = [
+    ("Ghee", "Dairy"), ("Bread", "Bakery"), ("Paneer", "Dairy"), ("Juice", "Beverage"),
+    ("Yogurt", "Dairy"), ("Tomato Sauce", "Condiment"), ("Bananas", "Fruit"), ("Biscuits", "Snack"),
+    ("Milk", "Dairy"), ("Burger Buns", "Bakery"), ("Fish", "Meat and Seafood"), ("Prawns", "Meat and Seafood"),
+]
+CHANNELS = ["WhatsApp", "Email", "SMS", "Slack"]
+REGIONS = ["Pan India", "North India", "Kerala", "Maharashtra", "West Bengal", "Bihar", "Punjab"]
+CONFIDENCE = ["High", "Medium", "Low"]
+
+def zone_names(n_zones):
+    return [f"Zone {i}" for i in range(n_zones)]
+
+def write_inventory(path, n_skus, n_zones=26, expiry_span_days=30, seed=0, chunk_rows=1_000_000):
+    # Written in chunks so 10M-row files don't need the whole frame in memory
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(datetime.today().date())
+    zones = np.array(zone_names(n_zones))
+    names = np.array([p for p, _ in PRODUCTS])
+    categories = np.array([c for _, c in PRODUCTS])
+
+    for start in range(0, n_skus, chunk_rows):
+        n = min(chunk_rows, n_skus - start)
+        product = rng.integers(0, len(PRODUCTS), n)
+        chunk = pd.DataFrame({
+            "sku_id": np.char.add("SKU", np.arange(start, start + n).astype(str)),
+            "product_name": names[product],
+            "expiry_date": (today + pd.to_timedelta(rng.integers(-2, expiry_span_days, n), unit="D")).strftime("%Y-%m-%d"),
+            "location": zones[rng.integers(0, n_zones, n)],
+            "category": categories[product],
+            "stock": rng.integers(1, 60, n),
+            "unit_price": rng.integers(30, 101, n),
+        })
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path
+
+def make_cultural_events(n_events, skus_per_event=3, horizon_days=120, seed=0, start=None):
+    # Same dicts as forecasting.read_cultural_events; dates fall in [start, start + horizon_days)
+    rng = np.random.default_rng(seed)
+    start = start or datetime.today().date()
+    events = []
+    for i in range(n_events):
+        day = start + timedelta(days=int(rng.integers(0, horizon_days)))
+        skus = [f"SKU{int(rng.integers(0, 5000)):04d} - Item {int(rng.integers(0, 500))}" for _ in range(skus_per_event)]
+        events.append({"event": f"Event {i}", "date": day.isoformat(), "region": REGIONS[i % len(REGIONS)],
+                       "high_demand_skus": skus, "confidence": CONFIDENCE[int(rng.integers(0, len(CONFIDENCE)))]})
+    return events
+
+def write_cultural_events(path, n_events, skus_per_event=3, horizon_days=120, seed=0, start=None):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["event", "date", "region", "high_demand_skus", "confidence"])
+        for e in make_cultural_events(n_events, skus_per_event, horizon_days, seed, start):
+            writer.writerow([e["event"], e["date"], e["region"], "; ".join(e["high_demand_skus"]), e["confidence"]])
+    return path
+
+# Sales history: every SKU an event lists gets a series in that event's region (a random one for
+# Pan India), padded with unlisted SKUs up to n_series. Demand is Poisson around a per-series level
+# × weekday profile × yearly swing × a ramp up to each matching event, steeper for surer events.
+EVENT_UPLIFT = {"High": 1.8, "Medium": 1.4, "Low": 1.15}
+SALES_LEAD_DAYS = 14
+
+def make_sales_history(n_series, days, events=(), end=None, seed=0):
+    # -> (keys frame [sku, region], first day as a date, (n_series, days) float32 unit sales)
+    rng = np.random.default_rng(seed)
+    end = end or datetime.today().date() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    regions = REGIONS[1:]
+    keys = {}
+    for e in events:
+        for sku in e["high_demand_skus"]:
+            region = e["region"] if e["region"] != "Pan India" else regions[int(rng.integers(0, len(regions)))]
+            keys.setdefault((sku, region), None)
+    keys = list(keys)[:n_series]
+    while len(keys) < n_series:
+        keys.append((f"SKU{len(keys):06d} - Filler {len(keys) % 500}", regions[len(keys) % len(regions)]))
+    frame = pd.DataFrame(keys, columns=["sku", "region"])
+    index = {key: i for i, key in enumerate(keys)}
+    by_sku = frame.groupby("sku").indices
+
+    day_numbers = np.arange(days) + (np.datetime64(start, "D") - np.datetime64(0, "D")).astype(np.int64)
+    weekday = rng.uniform(0.7, 1.3, (n_series, 7))
+    weekday /= weekday.mean(axis=1, keepdims=True)
+    yearly = 1 + rng.uniform(0.0, 0.3, n_series)[:, None] * np.sin(2 * np.pi * day_numbers / 365.25
+                                                                   + rng.uniform(0, 2 * np.pi, n_series)[:, None])
+    mean = rng.lognormal(1.5, 0.8, n_series)[:, None] * weekday[:, (day_numbers + 3) % 7] * yearly
+
+    for e in events:
+        offset = (np.datetime64(e["date"], "D") - np.datetime64(start, "D")).astype(np.int64)
+        lo, hi = max(offset - SALES_LEAD_DAYS, 0), min(offset + 1, days)
+        if lo >= hi:
+            continue
+        ramp = (np.arange(lo, hi) - offset + SALES_LEAD_DAYS + 1) / (SALES_LEAD_DAYS + 1)
+        for sku in e["high_demand_skus"]:
+            rows = by_sku.get(sku, []) if e["region"] == "Pan India" else [index.get((sku, e["region"]), -1)]
+            for row in rows:
+                if row >= 0:
+                    mean[row, lo:hi] *= EVENT_UPLIFT.get(e["confidence"].strip(), 1.0) ** ramp
+    return frame, start, rng.poisson(mean).astype(np.float32)
+
+def write_sales_history(path, n_series, days, events=(), end=None, seed=0):
+    # Long format (date, sku, region, units), zero days omitted, as a POS export would be
+    frame, start, units = make_sales_history(n_series, days, events, end, seed)
+    rows, cols = np.nonzero(units)
+    pd.DataFrame({
+        "date": (pd.Timestamp(start) + pd.to_timedelta(cols, unit="D")).strftime("%Y-%m-%d"),
+        "sku": frame["sku"].to_numpy()[rows],
+        "region": frame["region"].to_numpy()[rows],
+        "units": units[rows, cols].astype(np.int64),
+    }).sort_values("date", kind="stable").to_csv(path, index=False)
+    return path
+
+def make_buyer_profiles(n_buyers, n_zones=26, seed=0):
+    rng = np.random.default_rng(seed)
+    today = datetime.today().date()
+    zones = zone_names(n_zones)
+    return [
+        {
+            "name": f"Buyer {i}",
+            "zone": zones[i % n_zones],
+            "channel": CHANNELS[int(rng.integers(0, len(CHANNELS)))],
+            "distance_km": int(rng.integers(1, 15)),
+            "engagement_score": int(rng.integers(1, 11)),
+            "last_engaged": (today - timedelta(days=int(rng.integers(0, 20)))).isoformat(),
+            "capacity": int(rng.integers(5, 40)),
+        }
+        for i in range(n_buyers)
+    ]
+
+def make_hubs(n_zones, seed=0):
+    # Zones scattered over India's bounding box, one region per zone
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "hub": zone_names(n_zones),
+        "region": [REGIONS[i % len(REGIONS)] for i in range(n_zones)],
+        "lat": rng.uniform(8.0, 32.0, n_zones).round(4),
+        "lon": rng.uniform(68.0, 90.0, n_zones).round(4),
+    })
+
+def make_transfer_positions(hubs, n_rows, seed=0):
+    # -> (surplus lots, demand) over the hubs, both n_rows long
+    rng = np.random.default_rng(seed)
+    names = np.array([p for p, _ in PRODUCTS])
+    today = pd.Timestamp(datetime.today().date())
+    surplus = pd.DataFrame({
+        "hub": hubs["hub"].to_numpy()[rng.integers(0, len(hubs), n_rows)],
+        "product": names[rng.integers(0, len(names), n_rows)],
+        "sku_id": np.char.add("SKU", np.arange(n_rows).astype(str)),
+        "expiry": today + pd.to_timedelta(rng.integers(0, 10, n_rows), unit="D"),
+        "qty": rng.integers(1, 50, n_rows),
+    })
+    demand = pd.DataFrame({
+        "hub": hubs["hub"].to_numpy()[rng.integers(0, len(hubs), n_rows)],
+        "product": names[rng.integers(0, len(names), n_rows)],
+        "qty": rng.integers(1, 50, n_rows),
+    })
+    return surplus, demand
+
+def ensure_dir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -1,36 +1,49 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from datetime import datetime
+from agents import perf
+from ui import rendering
 
-def show_dashboard(inventory_path):
+EXPIRY_WINDOW_DAYS = 2
+
+def show_dashboard(inventory_path, memory_budget_mb=None):
     st.header("📦 Warehouse Inventory Overview")
 
-    df = pd.read_csv(inventory_path, parse_dates=['expiry_date'])
+    # Aggregates, pages and the chart are cached per inventory version; nothing is re-read until the file changes
+    version = rendering.file_version(inventory_path)
+    today = pd.Timestamp(datetime.today().date())
+    with perf.span("dashboard_load"):
+        overview = rendering.inventory_overview(inventory_path, version, today, EXPIRY_WINDOW_DAYS, memory_budget_mb)
 
-    st.dataframe(df, use_container_width=True)
+    rendering.paged_table(
+        overview.total_rows,
+        lambda offset, limit: rendering.inventory_page(inventory_path, version, offset, limit),
+        key="inventory",
+    )
 
     # ----------------------------------------
     # 📍 Expiry Timeline
     # ----------------------------------------
     st.markdown("#### 📍 Expiry Timeline")
-    expiring_soon = df[df['expiry_date'] <= pd.to_datetime('today') + pd.Timedelta(days=2)]
-    st.warning(f"{len(expiring_soon)} products expiring soon!", icon="⚠️")
+    st.warning(f"{overview.window_rows} products expiring soon!", icon="⚠️")
 
-    if not expiring_soon.empty:
-        st.dataframe(expiring_soon[['sku_id', 'product_name', 'expiry_date', 'location']])
+    if overview.window_rows:
+        rendering.paged_table(
+            overview.window_rows,
+            lambda offset, limit: rendering.expiring_page(
+                inventory_path, version, today, EXPIRY_WINDOW_DAYS, offset, limit
+            )[['sku_id', 'product_name', 'expiry_date', 'location']],
+            key="expiring",
+        )
 
     # ----------------------------------------
     # 📊 Category-Wise Inventory Summary
     # ----------------------------------------
     st.subheader("📊 Category-Wise Inventory Summary")
 
-    category_summary = df.groupby("category")["stock"].sum().sort_values(ascending=False)
+    category_summary = overview.category_summary.sort_values(ascending=False)
 
     st.markdown("This chart shows total stock levels across each category. Useful for demand planning, restocking & redistribution focus.")
 
-    fig, ax = plt.subplots(figsize=(7, 3))
-    category_summary.plot(kind='bar', ax=ax, color="#36A2EB")
-    ax.set_ylabel("Total Stock")
-    ax.set_xlabel("Category")
-    ax.set_title("Stock by Category")
-    st.pyplot(fig)
+    with perf.span("dashboard_chart"):
+        st.image(rendering.bar_chart_png(category_summary, "Stock by Category", "Category", "Total Stock"))
@@ -1,39 +1,34 @@
+import os
 import streamlit as st
+import numpy as np
 import pandas as pd
-import csv
 from datetime import date, datetime, timedelta
-import hashlib
+
+from agents import perf
+from agents.demand_model import SALES_PATH, load_or_fit
+from agents.event_calendar import EventCalendar
+from agents.expiry_agent import get_retry_queue
+from agents.forecasting import build_sku_recommendations
+from agents.transfers import HUBS_PATH, forecast_positions, load_hubs, offer_surplus, plan_transfers
+from ui.rendering import file_version
 
 # ----------------------------
 # Load Events from CSV
 # ----------------------------
-@st.cache_data
-def load_cultural_events(path="data/cultural_events.csv"):
-    events = []
-    with open(path, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            events.append({
-                "event": row["event"],
-                "date": row["date"],
-                "region": row["region"],
-                "high_demand_skus": [sku.strip() for sku in row["high_demand_skus"].split(";")],
-                "confidence": row["confidence"]
-            })
-    return events
+# Built once per process and shared read-only across sessions
+@st.cache_resource
+@perf.timed("load_cultural_events")
+def load_event_calendar(path="data/cultural_events.csv"):
+    return EventCalendar.from_csv(path)
 
+# Refitted (or incrementally updated from its disk cache) whenever the sales file changes
+@st.cache_resource(max_entries=2, show_spinner="Fitting demand model…")
+def load_demand_model(sales_path, version, events_path="data/cultural_events.csv"):
+    return load_or_fit(sales_path, list(load_event_calendar(events_path)))
 
-# ----------------------------
-# Deterministic SKU-based Stock Generation
-# ----------------------------
-def deterministic_hash(sku_name):
-    return int(hashlib.md5(sku_name.encode()).hexdigest(), 16)
-
-def generate_stock_and_demand(sku_name):
-    hash_val = deterministic_hash(sku_name)
-    current_stock = 80 + (hash_val % 71)  # Range: 80–150
-    expected_demand = 120 + (hash_val % 101)  # Range: 120–220
-    return current_stock, expected_demand
+@st.cache_data
+def load_hub_table(path=HUBS_PATH):
+    return load_hubs(path)
 
 
 # ----------------------------
@@ -43,31 +38,25 @@ def show_forecasting_tab():
     st.title("🧠 Culturally-Aware Demand Forecasting")
     st.markdown("This module simulates how our AI anticipates SKU demand based on upcoming festivals, local events, and regional patterns. It empowers warehouses to stock proactively and avoid shortages.")
 
-    scraped_events = load_cultural_events()
+    calendar = load_event_calendar()
 
     today = datetime.today().date()
     detection_window_days = 45
     window_end = today + timedelta(days=detection_window_days)
 
     # Only show events within 45-day window
-    visible_events = [
-        e for e in scraped_events
-        if today <= datetime.strptime(e["date"], "%Y-%m-%d").date() <= window_end
-    ]
+    visible_positions = calendar.between(today, window_end)
 
     # 📅 Calendar Explorer
     st.subheader("📅 Calendar Explorer")
     selected_date = st.date_input("Open calendar to explore dates:", date.today())
-    matched_events = [
-        e for e in scraped_events
-        if e["date"] == selected_date.strftime("%Y-%m-%d")
-    ]
+    matched_positions = calendar.on(selected_date)
+    matched_events = calendar.take(matched_positions)
 
     # If user selects a valid cultural event manually, add it
-    if matched_events:
-        for event in matched_events:
-            if event not in visible_events:
-                visible_events.append(event)
+    visible_events = calendar.take(np.concatenate([
+        visible_positions, np.setdiff1d(matched_positions, visible_positions)
+    ]))
 
     # 🔍 Show Detected Events
     st.subheader("🔍 Upcoming Events Detected by Scraper")
@@ -79,35 +68,16 @@ def show_forecasting_tab():
         st.info("🤖 No cultural events detected in the upcoming days.")
 
     # 📦 SKU Recommendations
-    sku_recommendations = []
-    for idx, e in enumerate(visible_events):
-        for sku in e["high_demand_skus"]:
-            current_stock, expected_demand = generate_stock_and_demand(sku)
-            sku_recommendations.append({
-                "sku_id": f"SKU{900 + idx}{e['high_demand_skus'].index(sku)}",
-                "product_name": sku,
-                "event": e["event"],
-                "region": e["region"],
-                "confidence": e["confidence"],
-                "current_stock": current_stock,
-                "expected_demand": expected_demand,
-            })
-
     simulate_trend_spike = st.toggle("📈 Simulate Trend Spike (30% Increase in Demand)")
 
-    for rec in sku_recommendations:
-        base_demand = rec["expected_demand"]
-        if simulate_trend_spike:
-            rec["expected_demand"] = int(base_demand * 1.3)
-
-        rec["stock_gap"] = rec["expected_demand"] - rec["current_stock"]
-        rec["action"] = (
-            "⚠️ Restock Needed" if rec["stock_gap"] > 0 else
-            "✅ Overstocked" if rec["stock_gap"] < 0 else
-            "✔️ Just In Time"
-        )
-
-    df_recommend = pd.DataFrame(sku_recommendations)
+    demand_model = load_demand_model(SALES_PATH, file_version(SALES_PATH)) if os.path.exists(SALES_PATH) else None
+    df_recommend = build_sku_recommendations(visible_events, simulate_trend_spike, demand_model=demand_model)
+    if demand_model is None:
+        st.caption(f"No sales history at `{SALES_PATH}`: expected demand is a placeholder.")
+    else:
+        st.caption(f"Expected demand: units forecast over each event's {demand_model.config.lead_days + 1}-day "
+                   f"lead-up by the demand model ({len(demand_model):,} SKU × region series, sales through "
+                   f"**{demand_model.end_date}**).")
 
     # 🎯 Filters
     st.subheader("💕 Filter Recommendations")
@@ -135,10 +105,31 @@ def show_forecasting_tab():
     st.subheader("📦 SKU Stocking Recommendations")
     st.dataframe(filtered_df, use_container_width=True)
 
+    # 🚚 Cross-Hub Transfers: overstocked rows and unsold retry SKUs → forecast restock gaps
+    st.subheader("🚚 Cross-Hub Transfer Plan")
+    if os.path.exists(HUBS_PATH):
+        hubs = load_hub_table()
+        surplus, demand = forecast_positions(df_recommend, hubs)
+        surplus = pd.concat([surplus, offer_surplus(get_retry_queue())], ignore_index=True)
+        transfers, transfer_report = plan_transfers(surplus, demand, hubs)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📦 Units Moved", f"{transfer_report['shipped']:,}")
+        col2.metric("⚠️ Unmet Demand", f"{transfer_report['unmet_demand']:,}")
+        col3.metric("🏷️ Surplus Left", f"{transfer_report['unused_surplus']:,}")
+        if transfers.empty:
+            st.info("No surplus within reach of a restock gap.")
+        else:
+            st.dataframe(transfers, use_container_width=True)
+    else:
+        st.info(f"Add hub coordinates in `{HUBS_PATH}` to plan cross-hub transfers.")
+
     # 📊 Insights
     st.subheader("📊 Forecast Engine Insights")
     st.success("✅ Forecasts updated based on scraper-detected events.")
     st.markdown("- Upcoming festival SKUs flagged based on expected demand & regional trends.")
+    if demand_model is not None:
+        uplift = ", ".join(f"{level} ×{factor:.2f}" for level, factor in demand_model.pooled_uplift.items())
+        st.markdown(f"- Event uplift learned from past sales at the event day: {uplift}.")
     if simulate_trend_spike:
         st.markdown("- 📈 Simulated trend surge applied (30% demand spike).")
 
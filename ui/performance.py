@@ -0,0 +1,59 @@
+import json
+import streamlit as st
+import pandas as pd
+
+from agents import perf
+
+PROFILE_OPTIONS = ["Off", "cprofile", "sampling"]
+
+# ⏱️ Performance page: latest run breakdown plus p50/p95 across recorded runs
+def show_performance_tab():
+    st.header("⏱️ Performance")
+    st.markdown("Per-step timings recorded by the agents and tabs. Set `ECOTWIN_PERF=1` (or `cprofile` / `sampling`) to record from startup.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        enabled = st.toggle("Record timings", value=perf.enabled())
+    with col2:
+        profile = st.selectbox("Profiler", PROFILE_OPTIONS, disabled=not enabled,
+                               index=PROFILE_OPTIONS.index(perf.profile_mode() or "Off"))
+    perf.configure(enabled=enabled, profile=None if profile == "Off" else profile)
+
+    runs = perf.load_runs()
+    if not runs:
+        st.info("No runs recorded yet. Turn on timings and open another page.")
+        return
+
+    # 🔍 Latest Run
+    latest = runs[-1]
+    st.subheader(f"🔍 Latest Run — {latest['label']}")
+    st.caption(f"{latest['started_at']} · {latest['wall_s'] * 1000:.1f} ms total")
+    spans = pd.DataFrame(latest["spans"], columns=["path", "calls", "total_s", "max_s"])
+    if not spans.empty:
+        spans["share"] = (spans["total_s"] / latest["wall_s"]).round(3) if latest["wall_s"] else 0.0
+        depth = spans["path"].str.count("/")
+        top_level = spans[depth == 1]
+        st.bar_chart(top_level.set_index("path")["total_s"])
+        st.dataframe(spans.sort_values("total_s", ascending=False), use_container_width=True)
+        st.caption(f"Outside instrumented steps (rendering etc.): "
+                   f"{max(latest['wall_s'] - top_level['total_s'].sum(), 0) * 1000:.1f} ms")
+
+    if "profile" in latest:
+        st.markdown(f"#### 🔬 Profile ({latest['profile']['mode']})")
+        if "skipped" in latest["profile"]:
+            st.warning(latest["profile"]["skipped"])
+        else:
+            st.dataframe(pd.DataFrame(latest["profile"]["top"]), use_container_width=True)
+
+    # 📊 History
+    st.subheader(f"📊 p50 / p95 over the last {len(runs)} runs")
+    history = pd.DataFrame.from_dict(perf.span_percentiles(runs), orient="index").rename_axis("path")
+    st.dataframe(history.sort_values("p95_s", ascending=False), use_container_width=True)
+
+    with st.expander("📥 Download Run Reports"):
+        st.download_button(
+            label="Download as JSON Lines",
+            data="\n".join(json.dumps(report) for report in runs),
+            file_name="perf_runs.jsonl",
+            mime="application/json"
+        )
@@ -1,15 +1,11 @@
 import streamlit as st
-import base64
-import os
-import time
-import random
-import pandas as pd
-from agents.expiry_agent import run_redistribution, rank_buyers_for_sku
+from datetime import datetime
 
-# 🔧 Convert image file to base64
-def get_image_base64(path):
-    with open(path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+from agents.expiry_agent import run_redistribution, rank_buyers_for_sku
+from agents.outreach import SimulatedResponder, run_outreach
+from agents.pricing import MAX_DISCOUNT, reprice_offers
+from agents.records import format_paise, format_price_columns, offers_from_frame, offers_to_frame
+from ui.rendering import icon_data_uri
 
 # 📦 Notification channel → icon path
 icon_map = {
@@ -19,11 +15,18 @@ icon_map = {
     "SMS": "assets/sms.png"
 }
 
-# 🧠 Simulate buyer response with delay & probability
-def simulate_buyer_response(buyer):
-    delay = random.uniform(0.8, 1.8)
-    time.sleep(delay)
-    return random.random() < 0.3  # 30% accept, 70% decline
+# 🧠 Simulated buyers: 0.8–1.8s reply delay, 30% accept, 70% decline
+buyer_responder = SimulatedResponder(accept_rate=0.3, delay_range=(0.8, 1.8))
+
+def top_buyers_for(offer):
+    return rank_buyers_for_sku(offer.zone)[:3]
+
+def icon_html(channel):
+    # Data-URIs are encoded once per icon file version, not once per buyer row
+    data_uri = icon_data_uri(icon_map.get(channel))
+    if data_uri:
+        return f"<img src='{data_uri}' width='18' style='margin-left: 8px; vertical-align: middle;'/>"
+    return ""
 
 # 🚀 Main redistribution tab
 def show_redistribution_tab(inventory_path):
@@ -33,6 +36,7 @@ def show_redistribution_tab(inventory_path):
     if "final_rows" not in st.session_state:
         st.session_state.final_rows = None
         st.session_state.unsold_skus = None
+        st.session_state.sku_categories = {}
 
     if st.button("🚀 Run Redistribution Agent"):
         df, _ = run_redistribution(inventory_path)
@@ -40,6 +44,7 @@ def show_redistribution_tab(inventory_path):
         if df.empty:
             st.warning("No items expiring within the next 2 days.")
             return
+        st.session_state.sku_categories = dict(zip(df["sku_id"], df["category"]))
 
         st.markdown("### 🤖 Agentic Outreach Simulation")
 
@@ -47,72 +52,66 @@ def show_redistribution_tab(inventory_path):
         stock_saved = 0
         unsold_skus = []
 
-        for _, row in df.iterrows():
-            st.markdown(f"#### 🟢 SKU {row['sku_id']} ({row['product']}) — Expiring on {row['expiry']} — Stock: {row['stock']}")
-            top_buyers = rank_buyers_for_sku(row["zone"])[:3]
-            accepted_buyer = None
+        # Offers for every SKU go out concurrently; each SKU renders as soon as it settles
+        def render_outcome(outcome):
+            nonlocal stock_saved
+            offer = outcome.offer
+            accepted_buyer = outcome.buyer
+            st.markdown(f"#### 🟢 SKU {offer.sku_id} ({offer.product}) — Expiring on {offer.expiry} — Stock: {offer.stock}")
 
-            for buyer in top_buyers:
-                with st.spinner(f"📨 Sending offer to {buyer['name']} via {buyer['channel']}..."):
-                    accepted = simulate_buyer_response(buyer)
-
-                icon_path = icon_map.get(buyer["channel"])
-                img_html = ""
-                if icon_path and os.path.exists(icon_path):
-                    base64_icon = get_image_base64(icon_path)
-                    img_html = f"<img src='data:image/png;base64,{base64_icon}' width='18' style='margin-left: 8px; vertical-align: middle;'/>"
-
-                if accepted:
-                    accepted_buyer = buyer
+            for buyer, status in outcome.attempts:
+                img_html = icon_html(buyer.channel)
+                if status == "accepted" and buyer is accepted_buyer:
                     st.markdown(
-                        f"✅ <b>{buyer['name']}</b> accepted the offer via {buyer['channel']} {img_html}",
+                        f"✅ <b>{buyer.name}</b> accepted the offer via {buyer.channel} {img_html}",
+                        unsafe_allow_html=True
+                    )
+                elif status in ("cancelled", "superseded"):
+                    st.markdown(
+                        f"⏹️ Offer to <i>{buyer.name}</i> via {buyer.channel} withdrawn {img_html}",
                         unsafe_allow_html=True
                     )
-                    break
                 else:
                     st.markdown(
-                        f"⚠️ No response from <i>{buyer['name']}</i> via {buyer['channel']} {img_html}",
+                        f"⚠️ No response from <i>{buyer.name}</i> via {buyer.channel} {img_html}",
                         unsafe_allow_html=True
                     )
 
-            row_data = row.to_dict()
             if accepted_buyer:
                 st.markdown(
-                    f"**🧾 Finalized Deal**: SKU {row['sku_id']} routed to *{accepted_buyer['name']}* at **{row['new_price']}** (was {row['old_price']})"
+                    f"**🧾 Finalized Deal**: SKU {offer.sku_id} routed to *{accepted_buyer.name}* at **{format_paise(offer.new_price_paise)}** (was {format_paise(offer.old_price_paise)})"
                 )
-                row_data.update({
-                    "buyer": accepted_buyer["name"],
-                    "channel": accepted_buyer["channel"],
-                    "status": "✅ Routed"
-                })
-                stock_saved += row["stock"]
+                offer.buyer = accepted_buyer.name
+                offer.channel = accepted_buyer.channel
+                offer.status = "✅ Routed"
+                stock_saved += offer.stock
             else:
                 st.error("❗ No buyers responded. Item remains unsold.")
-                row_data.update({
-                    "buyer": "—",
-                    "channel": "—",
-                    "status": "❌ Unsold"
-                })
-                unsold_skus.append(row_data)
-
-            final_rows.append(row_data)
+                offer.buyer = "—"
+                offer.channel = "—"
+                offer.status = "❌ Unsold"
+                unsold_skus.append(offer)
+
+            final_rows.append(offer)
             st.markdown("---")
 
+        with st.spinner(f"📨 Sending offers for {len(df)} SKUs..."):
+            run_outreach(offers_from_frame(df), top_buyers_for, on_result=render_outcome,
+                         responder=buyer_responder)
+
         st.session_state.final_rows = final_rows
         st.session_state.unsold_skus = unsold_skus
 
     # Show results after routing simulation
     if st.session_state.final_rows:
-        routed_count = sum(1 for r in st.session_state.final_rows if r['status'] == '✅ Routed')
-        saved_count = sum(r['stock'] for r in st.session_state.final_rows if r['status'] == '✅ Routed')
+        routed_count = sum(1 for r in st.session_state.final_rows if r.status == '✅ Routed')
+        saved_count = sum(r.stock for r in st.session_state.final_rows if r.status == '✅ Routed')
 
         st.success(f"✅ {routed_count} items routed successfully!")
         st.metric("📦 Total Stock Saved", f"{saved_count} units")
         st.progress(min(saved_count / 100, 1.0))
 
-        display_df = pd.DataFrame(st.session_state.final_rows)[[
-            "sku_id", "product", "expiry", "zone", "buyer", "channel", "old_price", "new_price", "stock", "status"
-        ]]
+        display_df = format_price_columns(offers_to_frame(st.session_state.final_rows))
         st.markdown("### 📋 Final Redistribution Report")
         st.dataframe(display_df, use_container_width=True)
 
@@ -120,61 +119,48 @@ def show_redistribution_tab(inventory_path):
     if st.session_state.unsold_skus:
         st.markdown("## 🔁 Retry Unsold SKUs with Higher Discount")
 
-        discount_options = [10, 20, 30, 40]
+        # "Optimized" re-runs the markdown optimizer with a penalty for the declined round
+        discount_options = ["Optimized", 10, 20, 30, 40]
         selected_discount = st.selectbox("🔻 Choose Retry Discount Escalation", discount_options, index=0)
 
         if st.button("🔄 Retry with Selected Discount"):
             retry_results = []
             retry_saved = 0
 
-            for sku in st.session_state.unsold_skus:
-                original_price = float(str(sku["old_price"]).replace("₹", ""))
-                current_price = float(str(sku["new_price"]).replace("₹", ""))
-                current_discount_pct = round((1 - current_price / original_price) * 100)
-
-                new_discount_pct = min(current_discount_pct + selected_discount, 90)
-                new_price = round(original_price * (1 - new_discount_pct / 100), 2)
-                sku["new_price"] = f"₹{new_price}"
-
-                st.markdown(f"### 🟡 Retrying: {sku['sku_id']} ({sku['product']}) @ {sku['new_price']} ({new_discount_pct}% off)")
-                top_buyers = rank_buyers_for_sku(sku["zone"])[:3]
-                accepted = False
-
-                for buyer in top_buyers:
-                    with st.spinner(f"📨 Retrying with {buyer['name']} via {buyer['channel']}..."):
-                        accepted = simulate_buyer_response(buyer)
-
-                    if accepted:
-                        st.success(f"✅ {buyer['name']} accepted the new offer at {sku['new_price']}")
-                        sku["buyer"] = buyer["name"]
-                        sku["channel"] = buyer["channel"]
-                        sku["status"] = "✅ Routed"
-                        retry_saved += sku["stock"]
-                        retry_results.append(sku)
-                        break
-                    else:
-                        st.warning(f"❌ No response from {buyer['name']}")
-
-                if not accepted:
+            if selected_discount == "Optimized":
+                reprice_offers(st.session_state.unsold_skus, datetime.today().date(),
+                               st.session_state.get("sku_categories"))
+            else:
+                cap = round(MAX_DISCOUNT * 100)
+                for sku in st.session_state.unsold_skus:
+                    new_discount_pct = min(sku.discount_pct + selected_discount, cap)
+                    sku.new_price_paise = round(sku.old_price_paise * (1 - new_discount_pct / 100))
+            discount_pct = {sku.sku_id: sku.discount_pct for sku in st.session_state.unsold_skus}
+
+            def render_retry(outcome):
+                nonlocal retry_saved
+                sku = outcome.offer
+                accepted_buyer = outcome.buyer
+                st.markdown(f"### 🟡 Retrying: {sku.sku_id} ({sku.product}) @ {format_paise(sku.new_price_paise)} ({discount_pct[sku.sku_id]}% off)")
+
+                for buyer, status in outcome.attempts:
+                    if status in ("declined", "timeout", "error"):
+                        st.warning(f"❌ No response from {buyer.name}")
+
+                if accepted_buyer:
+                    st.success(f"✅ {accepted_buyer.name} accepted the new offer at {format_paise(sku.new_price_paise)}")
+                    sku.buyer = accepted_buyer.name
+                    sku.channel = accepted_buyer.channel
+                    sku.status = "✅ Routed"
+                    retry_saved += sku.stock
+                else:
                     st.error("🚫 Still unsold.")
-                    retry_results.append(sku)
+                retry_results.append(sku)
+
+            with st.spinner(f"📨 Retrying {len(st.session_state.unsold_skus)} SKUs..."):
+                run_outreach(st.session_state.unsold_skus, top_buyers_for, on_result=render_retry,
+                             responder=buyer_responder)
 
             st.success(f"🎉 Retry Completed — Additional Stock Saved: {retry_saved} units")
-            retry_df = pd.DataFrame(retry_results)[[
-                "sku_id", "product", "expiry", "zone", "buyer", "channel", "old_price", "new_price", "stock", "status"
-            ]]
+            retry_df = format_price_columns(offers_to_frame(retry_results))
             st.dataframe(retry_df, use_container_width=True)
-
-# 📈 Agent Summary block
-def show_agent_summary(df, buyer_stats, next_expiring_df):
-    st.header("📊 Redistribution Summary")
-    st.markdown(f"""
-    - **SKUs flagged:** {len(df)}
-    - **Matched Buyers:** {buyer_stats['matched']}
-    - **Deals finalized:** {buyer_stats['accepted']}
-    - **Unsold SKUs:** {buyer_stats['unsold']}
-    - **Total stock saved:** {buyer_stats['stock_saved']} units
-    """)
-    st.markdown("---")
-    st.markdown("### ⏳ Upcoming Expiries (Next 3–5 Days)")
-    st.dataframe(next_expiring_df, use_container_width=True)
@@ -0,0 +1,89 @@
+import base64
+import functools
+import io
+import os
+import streamlit as st
+
+from agents import inventory_io
+from agents.inventory_cache import source_signature
+
+# ------------------------------
+# 🧊 Cached Rendering Helpers
+# ------------------------------
+# Everything here is keyed by the source file's version (mtime + size, as in
+# the inventory cache), so a rerun reuses aggregates, pages, chart images and
+# icon data-URIs until the file actually changes. Tables are served one page
+# at a time; the browser never receives the whole inventory.
+PAGE_SIZES = [50, 100, 250, 1000]
+MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".svg": "image/svg+xml"}
+
+def file_version(path):
+    signature = source_signature(path)
+    return signature["mtime_ns"], signature["size"]
+
+# ------------------------------
+# 🖼️ Icons
+# ------------------------------
+@functools.lru_cache(maxsize=64)
+def _data_uri(path, version):
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    mime = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+    return f"data:{mime};base64,{encoded}"
+
+def icon_data_uri(path):
+    if not path or not os.path.exists(path):
+        return None
+    return _data_uri(path, file_version(path))
+
+# ------------------------------
+# 📊 Inventory Aggregates and Pages
+# ------------------------------
+@st.cache_data(max_entries=16, show_spinner=False)
+def inventory_overview(path, version, today, end_days=2, memory_budget_mb=None):
+    return inventory_io.inventory_overview(path, end_days=end_days, today=today, memory_budget_mb=memory_budget_mb)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def inventory_page(path, version, offset, limit):
+    return inventory_io.inventory_page(path, offset, limit)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def expiring_page(path, version, today, end_days, offset, limit):
+    return inventory_io.expiring_page(path, offset, limit, end_days=end_days, today=today)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def bar_chart_png(series, title, xlabel, ylabel, color="#36A2EB"):
+    # Rendered once per distinct series; reruns only ship the cached PNG bytes
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(7, 3))
+    series.plot(kind="bar", ax=ax, color=color)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=120)
+    plt.close(fig)
+    return buffer.getvalue()
+
+# ------------------------------
+# 📑 Paged Table
+# ------------------------------
+def paged_table(total_rows, fetch_page, key, default_size=100):
+    # fetch_page(offset, limit) -> DataFrame; only the current page is sent to the browser
+    if total_rows == 0:
+        st.caption("No rows.")
+        return
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(default_size),
+                                 key=f"{key}_size")
+    pages = (total_rows + page_size - 1) // page_size
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"{key}_page")
+    offset = (page - 1) * page_size
+    st.dataframe(fetch_page(offset, page_size), use_container_width=True)
+    st.caption(f"Rows {offset + 1:,}–{min(offset + page_size, total_rows):,} of {total_rows:,}")
@@ -0,0 +1,122 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+
+from agents.expiry_agent import buyer_index, run_redistribution  # Agent simulation logic
+from agents.monte_carlo import AcceptanceModel, prepare_outreach, simulate_outreach
+from agents.records import format_paise
+from agents.expiry_scheduler import ExpiryScheduler, event_to_dict
+from agents.inventory_io import load_expiring_items, read_inventory
+from ui.rendering import file_version
+
+# ------------------------------
+# Helper: Load inventory (only the rows inside an expiry window, streamed in chunks)
+# ------------------------------
+@st.cache_data
+def load_inventory(path, today, start_days, end_days):
+    return load_expiring_items(path, start_days=start_days, end_days=end_days, today=today)
+
+# ------------------------------
+# Helper: Get upcoming expiry data (next 3–5 days)
+# ------------------------------
+def get_next_expiring_items(path):
+    expiry_col = "expiry_date"
+    today = pd.to_datetime(datetime.now().date())
+
+    start_date = today + timedelta(days=3)
+    end_date = today + timedelta(days=5)
+
+    st.caption(f"📅 Showing SKUs expiring between **{start_date.date()}** and **{end_date.date()}**")
+
+    filtered = load_inventory(path, today, 3, 5)
+
+    return filtered[["sku_id", "product_name", expiry_col, "stock", "location"]].rename(
+        columns={
+            expiry_col: "expiry",
+            "product_name": "product",
+            "location": "zone"
+        }
+    ).sort_values("expiry")
+
+# ------------------------------
+# Helper: Background tier-transition scheduler (one per inventory file, kept across reruns)
+# ------------------------------
+# Nothing here consumes the event queue, so the page keeps only the bounded audit trail
+@st.cache_resource
+def get_expiry_scheduler(path):
+    return {"scheduler": ExpiryScheduler(queue_events=False).start(), "version": None}
+
+def sync_expiry_scheduler(path):
+    state = get_expiry_scheduler(path)
+    version = file_version(path)
+    if state["version"] != version:
+        state["scheduler"].sync_frame(read_inventory(path))
+        state["version"] = version
+    return state["scheduler"]
+
+def show_tier_transitions(scheduler):
+    st.markdown("### ⏰ Discount Tier Transitions")
+    next_wakeup = scheduler.next_wakeup()
+    st.caption(f"Tracking **{len(scheduler):,}** SKUs · next transition at "
+               f"**{next_wakeup:%Y-%m-%d %H:%M}**" if next_wakeup else "No pending transitions.")
+    recent = list(scheduler.audit)[-200:][::-1]
+    if recent:
+        st.dataframe(pd.DataFrame([event_to_dict(e) for e in recent]), use_container_width=True)
+
+# ------------------------------
+# Helper: Outreach outcome distribution (Monte Carlo, seeded so reruns agree)
+# ------------------------------
+SUMMARY_TRIALS = 5000
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def simulate_outcomes(path, version, today, trials=SUMMARY_TRIALS):
+    redis_df, _ = run_redistribution(path)
+    if redis_df.empty:
+        return redis_df, None, 0
+    matched = int((prepare_outreach(redis_df, buyer_index).candidates >= 0).sum())
+    return redis_df, simulate_outreach(redis_df, buyer_index, AcceptanceModel(), trials).summary, matched
+
+def _estimate(stat, fmt="{:,.1f}", scale=1):
+    show = lambda value: fmt.format(value / scale)
+    low, high = stat["mean_ci"]
+    return f"{show(stat['mean'])} (95% CI {show(low)}–{show(high)}; p5–p95 {show(stat['p5'])}–{show(stat['p95'])})"
+
+# 📈 Agent Summary block
+def show_agent_summary(df, buyer_stats, next_expiring_df):
+    st.header("📊 Redistribution Summary")
+    st.markdown(f"""
+    - **SKUs flagged:** {len(df)}
+    - **Matched Buyers:** {buyer_stats['matched']}
+    - **Deals finalized:** {buyer_stats['accepted']}
+    - **Unsold SKUs:** {buyer_stats['unsold']}
+    - **Total stock saved:** {buyer_stats['stock_saved']} units
+    - **Revenue recovered:** {buyer_stats['revenue']}
+    """)
+    if buyer_stats.get("trials"):
+        st.caption(f"Expected outcomes over {buyer_stats['trials']:,} simulated outreach rounds.")
+    st.markdown("---")
+    st.markdown("### ⏳ Upcoming Expiries (Next 3–5 Days)")
+    st.dataframe(next_expiring_df, use_container_width=True)
+
+# 📊 Agent Summary page
+def show_summary_page(inventory_path):
+    st.title("📊 Agent Summary")
+
+    redis_df, outcomes, matched = simulate_outcomes(inventory_path, file_version(inventory_path),
+                                                    datetime.now().date())
+    next_expiring = get_next_expiring_items(inventory_path)
+
+    if outcomes is None:
+        buyer_stats = {"matched": 0, "accepted": 0, "unsold": 0, "stock_saved": 0, "revenue": format_paise(0)}
+    else:
+        buyer_stats = {
+            "matched": matched,
+            "accepted": _estimate(outcomes["sold"]),
+            "unsold": _estimate(outcomes["unsold"]),
+            "stock_saved": _estimate(outcomes["stock_saved"]),
+            "revenue": _estimate(outcomes["revenue_paise"], "₹{:,.0f}", scale=100),
+            "trials": outcomes["trials"],
+        }
+
+    show_agent_summary(redis_df, buyer_stats, next_expiring)
+    show_tier_transitions(sync_expiry_scheduler(inventory_path))